@@ -0,0 +1,10 @@
+"""Point d'entrée `python -m src` (voir cli.py)."""
+import os
+import sys
+
+# Les modules de src/ s'importent entre eux par leur nom (from load_data import …)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+sys.exit(main())
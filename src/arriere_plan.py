@@ -0,0 +1,126 @@
+import logging
+import os
+import threading
+import time
+
+from calculator import pipeline_global
+from configuration import chemins_config, utiliser_config
+
+logger = logging.getLogger(__name__)
+
+# Un seul calcul à la fois par classeur : chemin absolu -> dernier EtatCalcul lancé
+_verrou = threading.Lock()
+_calculs = {}
+
+
+class EtatCalcul:
+    """
+    Suivi d'un `pipeline_global` exécuté en arrière-plan.
+
+    Attributs :
+        nom_fichier (str): chemin absolu du classeur source.
+        options (dict): arguments passés à `pipeline_global` (incremental, parallele…).
+        etape (str): libellé de l'étape en cours.
+        avancement (float): avancement entre 0 et 1.
+        debut / fin (float): horodatages (`time.time()`) ; `fin` vaut None tant que le calcul tourne.
+        erreur (str | None): message de l'exception si le calcul a échoué.
+        demandes (int): nombre de demandes regroupées sur ce calcul.
+    """
+
+    __slots__ = ("nom_fichier", "options", "etape", "avancement", "debut", "fin", "erreur", "demandes")
+
+    def __init__(self, nom_fichier: str, options: dict):
+        self.nom_fichier = nom_fichier
+        self.options = options
+        self.etape = "En attente"
+        self.avancement = 0.0
+        self.debut = time.time()
+        self.fin = None
+        self.erreur = None
+        self.demandes = 1
+
+    @property
+    def en_cours(self) -> bool:
+        return self.fin is None
+
+    def _progresser(self, etape: str, avancement: float):
+        self.etape = etape
+        self.avancement = min(max(float(avancement), 0.0), 1.0)
+
+
+def _executer(etat: EtatCalcul, chemins: tuple):
+    try:
+        # Configuration capturée au lancement (`utiliser_config` est propre à chaque thread)
+        with utiliser_config(*chemins):
+            pipeline_global(etat.nom_fichier, progression=etat._progresser, **etat.options)
+    except Exception as e:
+        logger.exception("Échec du calcul en arrière-plan : %s", etat.nom_fichier)
+        etat.erreur = str(e)
+        etat.etape = "Échec"
+    finally:
+        etat.fin = time.time()
+
+
+def lancer_calcul(nom_fichier, **options) -> EtatCalcul:
+    """
+    Lance `pipeline_global(nom_fichier, **options)` dans un thread et rend
+    la main aussitôt.
+
+    Si un calcul est déjà en cours sur ce classeur (quelle que soit la
+    session qui l'a demandé), aucune nouvelle exécution n'est lancée : la
+    demande rejoint le calcul en cours, dont l'état est retourné. Le
+    classeur de résultats n'est remplacé qu'à la fin, d'un seul coup
+    (voir `SessionClasseur.enregistrer`). Le calcul utilise la
+    configuration active au moment de l'appel (`chemins_config`), même si
+    un bloc `utiliser_config` est ouvert ensuite dans un autre thread.
+
+    Returns:
+        EtatCalcul: état du calcul (nouveau ou en cours).
+    """
+    chemin = os.path.abspath(nom_fichier)
+    with _verrou:
+        etat = _calculs.get(chemin)
+        if etat is not None and etat.en_cours:
+            etat.demandes += 1
+            return etat
+        etat = EtatCalcul(chemin, options)
+        _calculs[chemin] = etat
+        threading.Thread(target=_executer, args=(etat, chemins_config()), name=f"calcul:{os.path.basename(chemin)}",
+                         daemon=True).start()
+    return etat
+
+
+def etat_calcul(nom_fichier):
+    """Dernier calcul lancé sur ce classeur (None s'il n'y en a jamais eu)."""
+    return _calculs.get(os.path.abspath(nom_fichier))
+
+
+def afficher_suivi(nom_fichier):
+    """
+    Affiche (Streamlit) l'avancement du calcul en arrière-plan de `nom_fichier`.
+
+    Le suivi est un fragment réexécuté chaque seconde, sans bloquer le reste
+    de la page. Quand un calcul se termine, les caches de données sont vidés
+    et la page est réexécutée une fois pour afficher les nouveaux résultats.
+    """
+    import streamlit as st
+    from cache_donnees import invalider
+
+    @st.fragment(run_every=1)
+    def _suivi():
+        etat = etat_calcul(nom_fichier)
+        if etat is None:
+            return
+        if etat.en_cours:
+            st.progress(etat.avancement, text=f"⏳ {etat.etape}")
+            return
+        if st.session_state.get("calcul_affiche") != etat.fin:
+            st.session_state["calcul_affiche"] = etat.fin
+            invalider()
+            st.rerun()
+        if etat.erreur:
+            st.error(f"❌ Erreur: {etat.erreur}")
+        else:
+            st.success("✅ Calculs terminés avec succès!")
+
+    _suivi()
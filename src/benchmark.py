@@ -0,0 +1,357 @@
+"""
+Benchmarks de la chaîne de calcul sur des classeurs synthétiques.
+
+Les classeurs générés ont la même structure que Fichier_de_donnes.xlsx
+(mêmes feuilles, colonne 'date', une colonne par composante) et sont
+accompagnés d'un weights.json / categories.json générés. Les feuilles
+Grand_Alger et national portent `composantes` colonnes ; les autres gardent
+leur taille d'origine (3 ou 8 composantes).
+
+Exemples :
+    python src/benchmark.py                              # grille réduite
+    python src/benchmark.py --mois 300 3000 --composantes 8 2000 --grille-complete
+    python src/benchmark.py --sortie bench.json --comparer bench_precedent.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import load_data
+from load_data import charger_classeur, SessionClasseur, DOSSIER_CACHE
+from configuration import utiliser_config
+from calculator import (
+    calculer_ipc, calculer_inflation_mom, calculer_inflation_yoy,
+    calculer_inflation_elements_mom, calculer_inflation_elements_yoy,
+    calculer_contributions_pp_mom, calculer_contributions_pp_yoy,
+    calculer_ipc_core_noncore, calculer_contributions_core_noncore_mom,
+    calculer_contributions_core_noncore_yoy,
+    pipeline_calculs, pipeline_global,
+    extraire_inflation_mom, extraire_inflation_yoy, get_kpis,
+)
+
+# --- 1. Structure des classeurs synthétiques
+FEUILLES_FIXES = {
+    "categories": ["Biens_alimentaires", "Biens_manufacturés", "Services"],
+    "core": ["Produits_alimentaires_industriels", "Biens_manufacturés", "Services"],
+    "Produits_agricoles_frais": [f"Produit_frais_{i}" for i in range(1, 9)],
+    "Alimentations_Boissons_non_alco": [f"Aliment_{i}" for i in range(1, 16)],
+}
+FEUILLES_MESUREES = ("Grand_Alger", "national")
+MOIS_DEFAUT = (300, 1000, 3000)
+COMPOSANTES_DEFAUT = (8, 100, 500, 2000)
+
+
+def _series_prix(rng, mois: int, colonnes: int) -> np.ndarray:
+    """Indices élémentaires : marches aléatoires log-normales partant de 100."""
+    variations = rng.normal(0.003, 0.01, size=(mois, colonnes))
+    return np.round(100 * np.exp(np.cumsum(variations, axis=0)), 2)
+
+
+def generer_jeu(dossier: str, mois: int, composantes: int, graine: int = 0) -> dict:
+    """
+    Écrit dans `dossier` un classeur synthétique et sa configuration.
+
+    Args:
+        dossier (str): dossier de destination (créé si besoin).
+        mois (int): nombre de périodes mensuelles (à partir de 2002-01, 3 000 au plus).
+        composantes (int): nombre de composantes des feuilles Grand_Alger et national.
+        graine (int): graine du générateur aléatoire.
+
+    Returns:
+        dict: chemins {"classeur", "poids", "categories"}.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    rng = np.random.default_rng(graine)
+    dates = pd.date_range("2002-01-01", periods=mois, freq="MS")
+
+    colonnes = {f: [f"Composante_{i:04d}" for i in range(1, composantes + 1)] for f in FEUILLES_MESUREES}
+    colonnes.update(FEUILLES_FIXES)
+    ordre = ["Grand_Alger", "Produits_agricoles_frais", "Alimentations_Boissons_non_alco",
+             "categories", "national", "core"]
+
+    classeur = os.path.join(dossier, "Fichier_de_donnes.xlsx")
+    with pd.ExcelWriter(classeur, engine="openpyxl") as writer:
+        for feuille in ordre:
+            df = pd.DataFrame(_series_prix(rng, mois, len(colonnes[feuille])), columns=colonnes[feuille])
+            df.insert(0, "date", dates)
+            df.to_excel(writer, sheet_name=feuille, index=False)
+
+    poids = {f: {c: round(float(w), 2) for c, w in zip(cols, rng.uniform(1, 100, len(cols)))}
+             for f, cols in colonnes.items() if f != "Alimentations_Boissons_non_alco"}
+    categories = {f: {c: [] for c in cols} for f, cols in poids.items()}
+
+    chemins = {"classeur": classeur,
+               "poids": os.path.join(dossier, "weights.json"),
+               "categories": os.path.join(dossier, "categories.json")}
+    with open(chemins["poids"], "w", encoding="utf-8") as f:
+        json.dump(poids, f, ensure_ascii=False, indent=2)
+    with open(chemins["categories"], "w", encoding="utf-8") as f:
+        json.dump(categories, f, ensure_ascii=False, indent=2)
+    return chemins
+
+
+# --- 2. Mesures
+def _oublier_caches(classeur: str):
+    """Repart d'un état froid : caches mémoire et copies disque (.npz) du classeur."""
+    load_data._classeurs.clear()
+    shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(classeur)), DOSSIER_CACHE), ignore_errors=True)
+
+
+def _reinitialiser(classeur: str):
+    """Supprime le classeur de résultats, son état et les caches (recalcul complet)."""
+    base, ext = os.path.splitext(classeur)
+    if os.path.exists(base + "_et_calculs" + ext):
+        os.remove(base + "_et_calculs" + ext)
+    _oublier_caches(classeur)
+
+
+def mesurer(fonction, repetitions: int = 3, preparation=None) -> dict:
+    """
+    Exécute `fonction()` `repetitions` fois (après `preparation()` à chaque
+    fois, non chronométrée) et retourne {"min", "mediane", "repetitions"} en secondes.
+    """
+    durees = []
+    for _ in range(repetitions):
+        if preparation is not None:
+            preparation()
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return {"min": min(durees), "mediane": statistics.median(durees), "repetitions": repetitions}
+
+
+def _pic_memoire(fonction, preparation=None) -> int:
+    """Pic d'allocation Python (tracemalloc, octets) pendant `fonction()`."""
+    if preparation is not None:
+        preparation()
+    tracemalloc.start()
+    try:
+        fonction()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _etapes_calcul(fichier_calculs: str, feuille: str, debut: str, fin: str) -> dict:
+    """Chronomètre chaque calculer_* d'une feuille, dans l'ordre de la chaîne, sur une session en mémoire."""
+    etapes = {}
+    with SessionClasseur(fichier_calculs) as session:
+        session.lire_feuille(feuille)  # chargement hors chronométrage
+        for nom, fonction in (
+            ("calculer_ipc", calculer_ipc),
+            ("calculer_inflation_elements_mom", calculer_inflation_elements_mom),
+            ("calculer_inflation_mom", calculer_inflation_mom),
+            ("calculer_inflation_elements_yoy", calculer_inflation_elements_yoy),
+            ("calculer_inflation_yoy", calculer_inflation_yoy),
+            ("calculer_contributions_pp_mom", calculer_contributions_pp_mom),
+            ("calculer_contributions_pp_yoy", calculer_contributions_pp_yoy),
+        ):
+            debut_etape = time.perf_counter()
+            fonction(fichier_calculs, feuille, debut, fin, session=session)
+            etapes[nom] = time.perf_counter() - debut_etape
+
+        for nom, fonction in (
+            ("calculer_ipc_core_noncore", calculer_ipc_core_noncore),
+            ("calculer_contributions_core_noncore_mom", calculer_contributions_core_noncore_mom),
+            ("calculer_contributions_core_noncore_yoy", calculer_contributions_core_noncore_yoy),
+        ):
+            arguments = ("core", "Produits_agricoles_frais") if nom == "calculer_ipc_core_noncore" \
+                else ("core", "Produits_agricoles_frais", "categories")
+            debut_etape = time.perf_counter()
+            fonction(fichier_calculs, *arguments, debut, fin, session=session)
+            etapes[nom] = time.perf_counter() - debut_etape
+        session.fermer(enregistrer=False)  # mesure seulement : ne pas enregistrer
+    return etapes
+
+
+def _chemin_donnees_graphique(fichier_calculs: str, feuille: str, colonne: str, debut: str, fin: str):
+    """
+    Partie « données » de `visualizer.tracer_graphique` (sans Plotly) :
+    feuille indexée, bornes de dates, découpage et libellés de l'axe X.
+    """
+    df = charger_classeur(fichier_calculs).feuille_indexee(feuille)
+    real_start = max(df.first_valid_index(), pd.to_datetime(debut))
+    df = df.loc[real_start:pd.to_datetime(fin) + pd.offsets.MonthEnd(1)]
+    x = df.index.to_period("M").to_timestamp(how="start")
+    return df[colonne].to_numpy(), x.strftime("%b %Y")
+
+
+def executer_cas(dossier: str, mois: int, composantes: int, repetitions: int = 3,
+                 memoire: bool = False) -> dict:
+    """Génère un jeu de données et mesure toutes les étapes ; retourne le résultat (sérialisable en JSON)."""
+    debut_generation = time.perf_counter()
+    chemins = generer_jeu(dossier, mois, composantes)
+    generation = time.perf_counter() - debut_generation
+    classeur = chemins["classeur"]
+    base, ext = os.path.splitext(classeur)
+    fichier_calculs = base + "_et_calculs" + ext
+    debut, fin = "2002-01", (pd.Period("2002-01", freq="M") + (mois - 1)).strftime("%Y-%m")
+    date_ref = pd.Period(fin, freq="M").to_timestamp().strftime("%Y-%m-%d")
+    mesures = {}
+
+    # Les messages des pipelines sont masqués pendant les mesures
+    with utiliser_config(chemins["poids"], chemins["categories"]), \
+            open(os.devnull, "w") as muet, redirect_stdout(muet):
+        # Lecture du classeur source (froide, puis servie par la copie .npz)
+        mesures["charger_classeur (froid)"] = mesurer(lambda: charger_classeur(classeur), repetitions,
+                                                      preparation=lambda: _oublier_caches(classeur))
+        mesures["charger_classeur (copie .npz)"] = mesurer(lambda: charger_classeur(classeur), repetitions,
+                                                           preparation=load_data._classeurs.clear)
+
+        # Pipelines complets
+        mesures["pipeline_global"] = mesurer(lambda: pipeline_global(classeur), repetitions,
+                                             preparation=lambda: _reinitialiser(classeur))
+        mesures["pipeline_global (flux)"] = mesurer(lambda: pipeline_global(classeur, flux=True), repetitions,
+                                                    preparation=lambda: _reinitialiser(classeur))
+        mesures["pipeline_global (incrémental, sans changement)"] = mesurer(
+            lambda: pipeline_global(classeur, incremental=True), repetitions)
+        mesures["pipeline_calculs (Grand_Alger)"] = mesurer(
+            lambda: pipeline_calculs(classeur, "Grand_Alger", debut, fin), repetitions)
+
+        # Étapes calculer_* (session en mémoire, sans enregistrement)
+        etapes = [_etapes_calcul(fichier_calculs, "Grand_Alger", debut, fin) for _ in range(repetitions)]
+        for nom in etapes[0]:
+            durees = [e[nom] for e in etapes]
+            mesures[nom] = {"min": min(durees), "mediane": statistics.median(durees), "repetitions": repetitions}
+
+        # Lectures de KPI et données des graphiques
+        load_data._classeurs.clear()
+        mesures["extraire_inflation_mom"] = mesurer(
+            lambda: extraire_inflation_mom(fichier_calculs, "categories", date_ref), repetitions)
+        mesures["extraire_inflation_yoy"] = mesurer(
+            lambda: extraire_inflation_yoy(fichier_calculs, "categories", date_ref), repetitions)
+        mesures["get_kpis (3 feuilles)"] = mesurer(
+            lambda: get_kpis(fichier_calculs, date_ref, "yoy", ["categories", "core", "Produits_agricoles_frais"]),
+            repetitions)
+        mesures["tracer_* (données, froid)"] = mesurer(
+            lambda: _chemin_donnees_graphique(fichier_calculs, "Grand_Alger", "Inflation (%, yoy)", debut, fin),
+            repetitions, preparation=lambda: _oublier_caches(fichier_calculs))
+        mesures["tracer_* (données, en mémoire)"] = mesurer(
+            lambda: _chemin_donnees_graphique(fichier_calculs, "Grand_Alger", "Inflation (%, yoy)", debut, fin),
+            repetitions)
+
+        memoires = {}
+        if memoire:
+            memoires["pipeline_global"] = _pic_memoire(lambda: pipeline_global(classeur),
+                                                       preparation=lambda: _reinitialiser(classeur))
+            memoires["pipeline_global (flux)"] = _pic_memoire(lambda: pipeline_global(classeur, flux=True),
+                                                              preparation=lambda: _reinitialiser(classeur))
+
+    return {
+        "mois": mois,
+        "composantes": composantes,
+        "cellules_source": mois * (2 * composantes + sum(len(c) for c in FEUILLES_FIXES.values())),
+        "taille_classeur_resultats": os.path.getsize(fichier_calculs),
+        "generation": generation,
+        "mesures": mesures,
+        "pic_memoire": memoires,
+    }
+
+
+# --- 3. Rapport et comparaison
+def _meta() -> dict:
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "openpyxl": openpyxl.__version__,
+    }
+
+
+def _cle(resultat: dict) -> str:
+    return f"{resultat['mois']}x{resultat['composantes']}"
+
+
+def afficher(resultats: list):
+    """Tableau des durées médianes (secondes) : une ligne par mesure, une colonne par taille."""
+    noms = list(dict.fromkeys(n for r in resultats for n in r["mesures"]))
+    tailles = [_cle(r) for r in resultats]
+    largeur = max(len(n) for n in noms)
+    print(f"{'mesure':<{largeur}}  " + "  ".join(f"{t:>12}" for t in tailles))
+    for nom in noms:
+        valeurs = [r["mesures"].get(nom, {}).get("mediane") for r in resultats]
+        print(f"{nom:<{largeur}}  " + "  ".join(f"{v:>12.4f}" if v is not None else f"{'-':>12}" for v in valeurs))
+    for nom in dict.fromkeys(n for r in resultats for n in r["pic_memoire"]):
+        valeurs = [r["pic_memoire"].get(nom) for r in resultats]
+        libelle = f"pic mémoire {nom} (Mo)"
+        print(f"{libelle:<{largeur}}  " + "  ".join(f"{v / 2**20:>12.1f}" if v is not None else f"{'-':>12}"
+                                                       for v in valeurs))
+
+
+def comparer(ancien: dict, nouveau: dict):
+    """Rapport nouveau / ancien des durées médianes, pour les tailles et mesures communes."""
+    anciens = {_cle(r): r for r in ancien["resultats"]}
+    for resultat in nouveau["resultats"]:
+        reference = anciens.get(_cle(resultat))
+        if reference is None:
+            continue
+        print(f"\n📊 {_cle(resultat)} (nouveau / ancien)")
+        for nom, mesure in resultat["mesures"].items():
+            if nom in reference["mesures"]:
+                avant = reference["mesures"][nom]["mediane"]
+                apres = mesure["mediane"]
+                print(f"  {nom:<50} {avant:>10.4f} → {apres:>10.4f}  x{apres / avant if avant else float('nan'):.2f}")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks IPC sur classeurs synthétiques")
+    parser.add_argument("--mois", type=int, nargs="+", default=list(MOIS_DEFAUT))
+    parser.add_argument("--composantes", type=int, nargs="+", default=list(COMPOSANTES_DEFAUT))
+    parser.add_argument("--grille-complete", action="store_true",
+                        help="toutes les combinaisons mois × composantes (par défaut : "
+                             "tailles de mois avec le plus petit panier, puis paniers avec le plus petit nombre de mois)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--memoire", action="store_true", help="mesurer aussi le pic mémoire (tracemalloc, lent)")
+    parser.add_argument("--sortie", default="benchmark.json", help="fichier JSON des résultats")
+    parser.add_argument("--comparer", help="JSON d'une exécution précédente à comparer")
+    parser.add_argument("--dossier", help="dossier de travail (par défaut : dossier temporaire supprimé à la fin)")
+    args = parser.parse_args(arguments)
+
+    if max(args.mois) > 3000:
+        parser.error("3 000 mois au plus (limite des dates pandas)")
+    if args.grille_complete:
+        cas = [(m, c) for m in args.mois for c in args.composantes]
+    else:
+        cas = list(dict.fromkeys([(m, min(args.composantes)) for m in args.mois]
+                                 + [(min(args.mois), c) for c in args.composantes]))
+
+    dossier = args.dossier or tempfile.mkdtemp(prefix="bench_ipc_")
+    resultats = []
+    try:
+        for mois, composantes in cas:
+            print(f"➡️ {mois} mois × {composantes} composantes", file=sys.stderr)
+            resultats.append(executer_cas(os.path.join(dossier, f"{mois}x{composantes}"), mois, composantes,
+                                          args.repetitions, args.memoire))
+    finally:
+        if not args.dossier:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+    rapport = {"meta": _meta(), "resultats": resultats}
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"💾 Résultats enregistrés dans {args.sortie}", file=sys.stderr)
+
+    afficher(resultats)
+    if args.comparer:
+        with open(args.comparer, "r", encoding="utf-8") as f:
+            comparer(json.load(f), rapport)
+    return rapport
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from load_data import charger_classeur, ClasseurCharge
+
+
+def signature_fichier(nom_fichier) -> tuple:
+    """
+    Clé des caches Streamlit d'un classeur : (chemin absolu, date de
+    modification en ns, taille). Quand `pipeline_global` réécrit le fichier,
+    la signature change et les entrées précédentes ne sont plus servies.
+    """
+    chemin = os.path.abspath(nom_fichier)
+    infos = os.stat(chemin)
+    return chemin, infos.st_mtime_ns, infos.st_size
+
+
+# --- 1. Classeur complet : une ressource partagée par toutes les sessions et réexécutions
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _classeur(chemin: str, mtime_ns: int, taille: int) -> ClasseurCharge:
+    return charger_classeur(chemin)
+
+
+def classeur(nom_fichier) -> ClasseurCharge:
+    """
+    Toutes les feuilles du classeur (voir `charger_classeur`), chargées une
+    seule fois par version du fichier. L'objet est partagé : ses DataFrames
+    ne doivent pas être modifiés en place (`feuille()` renvoie une copie).
+    """
+    return _classeur(*signature_fichier(nom_fichier))
+
+
+def lire_feuille(nom_fichier, feuille: str) -> pd.DataFrame:
+    """Équivalent de `lire_feuille_brute`, servi par le cache Streamlit."""
+    return classeur(nom_fichier).feuille(feuille)
+
+
+# --- 2. Petites données dérivées (copiées à chaque lecture par st.cache_data)
+@st.cache_data(max_entries=32, show_spinner=False)
+def _bornes_dates(chemin: str, mtime_ns: int, taille: int, feuille: str) -> tuple:
+    infos = _classeur(chemin, mtime_ns, taille).catalogue.get(feuille)
+    if infos is None:
+        raise ValueError(f"Worksheet named '{feuille}' not found")
+    if pd.isna(infos["date_min"]) or pd.isna(infos["date_max"]):
+        return None  # feuille vide ou première colonne sans date
+    return infos["date_min"].date(), infos["date_max"].date()
+
+
+def bornes_dates(nom_fichier, feuille: str):
+    """
+    Première et dernière date (datetime.date) de la feuille, lues dans le
+    catalogue du classeur : c'est tout ce dont les filtres de période ont besoin.
+    None si la feuille n'a aucune date valide (feuille vide, première colonne
+    illisible) : la page affiche alors un message au lieu des graphiques.
+    """
+    return _bornes_dates(*signature_fichier(nom_fichier), feuille)
+
+
+def invalider():
+    """Vide les caches Streamlit (à appeler après une réécriture des classeurs)."""
+    _classeur.clear()
+    _bornes_dates.clear()
@@ -1,34 +1,53 @@
 import pandas as pd
 import numpy as np
+import hashlib
 import json
 import os
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from openpyxl import load_workbook
 import locale
 
-from load_data import lire_feuille_wide, extraire_poids  # import direct
+from load_data import (lire_feuille_wide, lire_feuille_indexee,  # import direct
+                       charger_classeur, ClasseurCharge, SessionClasseur, SessionFlux, SessionMemoire,
+                       DOSSIER_CACHE)
+from moteur_ipc import (indice_pondere, contributions_pp, decaler, calculer_tout, calculer_panneau,
+                        PanneauRegional, calculer_scenarios, calculer_exclusions, colonnes_tronquees,
+                        mesures_tronquees)
+from configuration import charger_config, chemins_config, utiliser_config, extraire_toutes_categories
+from instrumentation import (etape, compter, activer, desactiver, est_active, reinitialiser,
+                             afficher_resume)
 
-def extraire_toutes_categories(d):
-    """Extrait récursivement toutes les clés terminales d'un dict JSON hiérarchique."""
-    result = set()
-    if isinstance(d, dict):
-        for k, v in d.items():
-            result.add(k)
-            result |= extraire_toutes_categories(v)
-    elif isinstance(d, list):
-        for v in d:
-            result |= extraire_toutes_categories(v)
-    return result
+# Mois d'historique lus avant la période demandée : variations MoM (t-1) et YoY (t-12)
+RECUL_MOM = 1
+RECUL_YOY = 12
 
-def calculer_ipc(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+
+def _avec_recul(df: pd.DataFrame, date_debut, date_fin, recul: int) -> pd.DataFrame:
+    """
+    Lignes de `df` (indexé par Period M) de `recul` mois avant `date_debut`
+    jusqu'à `date_fin`. Les variations du début de la période sont ainsi
+    calculées sur le vrai mois précédent ; l'appelant restreint ensuite le
+    résultat à la période (`.loc[date_debut:]`).
+    """
+    return df.loc[pd.Period(date_debut, freq="M") - recul:pd.Period(date_fin, freq="M")]
+
+def calculer_ipc(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                 session: SessionClasseur = None):
     """
     Calcule l'IPC global d'un panier en utilisant les poids de config/weights.json
     et insère/réécrit les résultats dans une colonne fixe 'IPC (%)'.
+    Si une `session` est fournie, lecture et écriture se font en mémoire et
+    l'enregistrement est laissé à l'appelant.
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- Charger la feuille en wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- S'assurer que la colonne 'date' est bien au format YYYY-MM
     if "date" in df.columns:
@@ -44,87 +63,46 @@ def calculer_ipc(nom_fichier: str, feuille: str, date_debut: str, date_fin: str)
     # --- Filtrer la période
     df = df.loc[date_debut:date_fin]
 
-    # --- Charger les poids
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
+    # --- Charger les poids (modèle compilé, relu seulement si weights.json change)
+    panier = charger_config().panier(feuille)
 
-    poids_feuille = extraire_poids(all_weights.get(feuille, {}))
-
-    if not poids_feuille:
-        raise ValueError(f"Aucun poids trouvé pour la feuille {feuille} dans weights.json")
-
-    colonnes_valides = [col for col in df.columns if col in poids_feuille]
+    colonnes_valides = [col for col in df.columns if col in panier.index]
     if not colonnes_valides:
         raise ValueError("Aucune correspondance entre colonnes du fichier Excel et weights.json")
 
-    # --- Calcul de l’IPC (moyenne pondérée)
-    numerateur = sum(df[col] * poids_feuille[col] for col in colonnes_valides)
-    denominateur = sum(poids_feuille[col] for col in colonnes_valides)
-
-    df["IPC (%)"] = (numerateur / denominateur).round(2)
-
-    # --- Insérer dans Excel avec openpyxl en réécrivant toujours dans 'IPC (%)'
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    # Trouver ou créer la colonne "IPC (%)"
-    header_row = 1
-    col_index_ipc = None
-    for col in range(1, ws.max_column + 1):
-        if ws.cell(row=header_row, column=col).value == "IPC (%)":
-            col_index_ipc = col
-            break
-
-    if col_index_ipc is None:
-        col_index_ipc = ws.max_column + 1
-        ws.cell(row=header_row, column=col_index_ipc, value="IPC (%)")
-
-    # Construire un dictionnaire {periode: valeur}
-    ipc_dict = df["IPC (%)"].to_dict()
-
-    # Écrire les valeurs au bon endroit
-    for row in range(2, ws.max_row + 1):
-        cell_date = ws.cell(row=row, column=1).value  # on suppose la date est en première colonne
-        if cell_date is None:
-            continue
-
-        try:
-            periode = pd.to_datetime(cell_date).to_period("M")
-        except Exception:
-            continue
+    # --- Calcul de l’IPC (moyenne pondérée, produit matrice–vecteur)
+    poids = panier.compiler(colonnes_valides)
+    df["IPC (%)"] = indice_pondere(df, poids).round(2)
 
-        if periode in ipc_dict:
-            ws.cell(row=row, column=col_index_ipc, value=float(ipc_dict[periode]))
+    # --- Insérer dans Excel en réécrivant toujours dans 'IPC (%)'
+    session.ecrire_colonne(feuille, "IPC (%)", df["IPC (%)"].to_dict())
 
-    wb.save(nom_fichier)
-    wb.close()
+    if session_locale:
+        session.enregistrer()
 
     return df
 
 def calculer_ipc_core_noncore(nom_fichier: str, feuille_core: str, feuille_non_core: str,
-                              date_debut: str, date_fin: str):
+                              date_debut: str, date_fin: str,
+                              session: SessionClasseur = None):
     """
     Calcule l'IPC core et l'IPC non-core et les insère dans les colonnes
     'IPC Core (%)' et 'IPC Non Core (%)' des feuilles correspondantes.
     Si la colonne existe déjà, elle est réécrite (pas de nouvelle colonne ajoutée).
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
-    # --- Charger config/weights.json ---
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
+    # --- Charger config/weights.json (modèle compilé) ---
+    config = charger_config()
 
     # --------------------------------------------------
     # Fonction interne pour calculer et insérer un IPC
     # --------------------------------------------------
     def traiter_feuille(feuille: str, nom_colonne: str):
         # Lire feuille wide
-        df = lire_feuille_wide(nom_fichier, feuille)
+        df = session.lire_feuille(feuille)
 
         # Normaliser les dates
         if "date" in df.columns:
@@ -139,54 +117,19 @@ def calculer_ipc_core_noncore(nom_fichier: str, feuille_core: str, feuille_non_c
         df = df.loc[d_debut:d_fin]
 
         # Extraire les poids
-        poids_feuille = extraire_poids(all_weights.get(feuille, {}))
-        if not poids_feuille:
-            raise ValueError(f"Aucun poids trouvé pour la feuille {feuille} dans weights.json")
+        panier = config.panier(feuille)
 
         # Colonnes valides
-        colonnes_valides = [col for col in df.columns if col in poids_feuille]
+        colonnes_valides = [col for col in df.columns if col in panier.index]
         if not colonnes_valides:
             raise ValueError(f"Aucune correspondance entre colonnes Excel et poids pour {feuille}")
 
         # Calcul IPC pondéré
-        numerateur = sum(df[col] * poids_feuille[col] for col in colonnes_valides)
-        denominateur = sum(poids_feuille[col] for col in colonnes_valides)
-        df[nom_colonne] = (numerateur / denominateur).round(2)
-
-        # Insérer dans Excel
-        wb = load_workbook(nom_fichier)
-        ws = wb[feuille]
-
-        # Vérifier si la colonne existe déjà
-        header_row = 1
-        col_index = None
-        for col in range(1, ws.max_column + 1):
-            if ws.cell(row=header_row, column=col).value == nom_colonne:
-                col_index = col
-                break
-
-        # Si pas trouvée → créer à la fin
-        if col_index is None:
-            col_index = ws.max_column + 1
-            ws.cell(row=header_row, column=col_index, value=nom_colonne)
-
-        # Construire dict {periode: valeur}
-        ipc_dict = df[nom_colonne].to_dict()
-
-        # Écrire dans la bonne colonne
-        for row in range(2, ws.max_row + 1):
-            cell_date = ws.cell(row=row, column=1).value
-            if cell_date is None:
-                continue
-            try:
-                periode = pd.to_datetime(cell_date).to_period("M")
-            except Exception:
-                continue
-            if periode in ipc_dict:
-                ws.cell(row=row, column=col_index, value=float(ipc_dict[periode]))
-
-        wb.save(nom_fichier)
-        wb.close()
+        poids = panier.compiler(colonnes_valides)
+        df[nom_colonne] = indice_pondere(df, poids).round(2)
+
+        # Insérer dans Excel (colonne réécrite si elle existe déjà)
+        session.ecrire_colonne(feuille, nom_colonne, df[nom_colonne].to_dict())
 
         return df
 
@@ -194,16 +137,23 @@ def calculer_ipc_core_noncore(nom_fichier: str, feuille_core: str, feuille_non_c
     df_core = traiter_feuille(feuille_core, "IPC Core (%)")
     df_non_core = traiter_feuille(feuille_non_core, "IPC Non Core (%)")
 
+    if session_locale:
+        session.enregistrer()
+
     return df_core, df_non_core
 
-def calculer_inflation_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def calculer_inflation_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                           session: SessionClasseur = None):
     """
     Calcule l'inflation en glissement mensuel (mom) à partir des valeurs d'IPC d'une feuille
     et insère/réécrit les résultats dans une colonne fixe 'Inflation (%, mom)'.
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- Charger la feuille en wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Assurer que la colonne 'date' est bien au format YYYY-MM
     if "date" in df.columns:
@@ -216,8 +166,8 @@ def calculer_inflation_mom(nom_fichier: str, feuille: str, date_debut: str, date
     date_debut = pd.Period(date_debut, freq="M")
     date_fin = pd.Period(date_fin, freq="M")
 
-    # --- Filtrer la période
-    df = df.loc[date_debut:date_fin]
+    # --- Filtrer la période, avec 1 mois de recul pour la première variation
+    df = _avec_recul(df, date_debut, date_fin, RECUL_MOM)
 
     # --- Chercher la colonne IPC de référence
     for col in ["IPC (%)", "IPC Core (%)", "IPC Non Core (%)"]:
@@ -227,56 +177,32 @@ def calculer_inflation_mom(nom_fichier: str, feuille: str, date_debut: str, date
     else:
         raise ValueError("Aucune colonne IPC trouvée (IPC (%), IPC Core (%), ou IPC Non Core (%)).")
 
-    # --- Calcul de l’inflation mom : (IPC_t / IPC_t-1 - 1) * 100
+    # --- Calcul de l’inflation mom : (IPC_t / IPC_t-1 - 1) * 100, puis retrait du recul
     df["Inflation (%, mom)"] = ((df[col_ipc] / df[col_ipc].shift(1) - 1) * 100).round(2)
+    df = df.loc[date_debut:]
 
-    # --- Insérer dans Excel avec openpyxl
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    # Trouver ou créer la colonne "Inflation (%, mom)"
-    header_row = 1
-    col_index_inflation = None
-    for col in range(1, ws.max_column + 1):
-        if ws.cell(row=header_row, column=col).value == "Inflation (%, mom)":
-            col_index_inflation = col
-            break
-
-    if col_index_inflation is None:
-        col_index_inflation = ws.max_column + 1
-        ws.cell(row=header_row, column=col_index_inflation, value="Inflation (%, mom)")
-
-    # Construire un dictionnaire {periode: valeur}
-    infl_dict = df["Inflation (%, mom)"].to_dict()
+    # --- Insérer dans Excel (colonne "Inflation (%, mom)" trouvée ou créée)
+    session.ecrire_colonne(feuille, "Inflation (%, mom)",
+                           df["Inflation (%, mom)"].to_dict(), ignorer_nan=True)
 
-    # Écrire les valeurs au bon endroit
-    for row in range(2, ws.max_row + 1):
-        cell_date = ws.cell(row=row, column=1).value  # date supposée en première colonne
-        if cell_date is None:
-            continue
-
-        try:
-            periode = pd.to_datetime(cell_date).to_period("M")
-        except Exception:
-            continue
-
-        if periode in infl_dict and pd.notna(infl_dict[periode]):
-            ws.cell(row=row, column=col_index_inflation, value=float(infl_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+    if session_locale:
+        session.enregistrer()
 
     return df
 
 
-def calculer_inflation_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def calculer_inflation_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                           session: SessionClasseur = None):
     """
     Calcule l'inflation en glissement annuel (yoy) à partir des valeurs d'IPC d'une feuille
     et insère/réécrit les résultats dans une colonne fixe 'Inflation (%, yoy)'.
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- Charger la feuille en wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Assurer que la colonne 'date' est bien au format YYYY-MM
     if "date" in df.columns:
@@ -289,8 +215,8 @@ def calculer_inflation_yoy(nom_fichier: str, feuille: str, date_debut: str, date
     date_debut = pd.Period(date_debut, freq="M")
     date_fin = pd.Period(date_fin, freq="M")
 
-    # --- Filtrer la période
-    df = df.loc[date_debut:date_fin]
+    # --- Filtrer la période, avec 12 mois de recul pour la première variation
+    df = _avec_recul(df, date_debut, date_fin, RECUL_YOY)
 
     # --- Chercher la colonne IPC de référence
     for col in ["IPC (%)", "IPC Core (%)", "IPC Non Core (%)"]:
@@ -300,56 +226,32 @@ def calculer_inflation_yoy(nom_fichier: str, feuille: str, date_debut: str, date
     else:
         raise ValueError("Aucune colonne IPC trouvée (IPC (%), IPC Core (%), ou IPC Non Core (%)).")
 
-    # --- Calcul de l’inflation yoy : (IPC_t / IPC_t-12 - 1) * 100
+    # --- Calcul de l’inflation yoy : (IPC_t / IPC_t-12 - 1) * 100, puis retrait du recul
     df["Inflation (%, yoy)"] = ((df[col_ipc] / df[col_ipc].shift(12) - 1) * 100).round(2)
+    df = df.loc[date_debut:]
 
-    # --- Insérer dans Excel avec openpyxl
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    # Trouver ou créer la colonne "Inflation (%, yoy)"
-    header_row = 1
-    col_index_inflation = None
-    for col in range(1, ws.max_column + 1):
-        if ws.cell(row=header_row, column=col).value == "Inflation (%, yoy)":
-            col_index_inflation = col
-            break
+    # --- Insérer dans Excel (colonne "Inflation (%, yoy)" trouvée ou créée)
+    session.ecrire_colonne(feuille, "Inflation (%, yoy)",
+                           df["Inflation (%, yoy)"].to_dict(), ignorer_nan=True)
 
-    if col_index_inflation is None:
-        col_index_inflation = ws.max_column + 1
-        ws.cell(row=header_row, column=col_index_inflation, value="Inflation (%, yoy)")
-
-    # Construire un dictionnaire {periode: valeur}
-    infl_dict = df["Inflation (%, yoy)"].to_dict()
-
-    # Écrire les valeurs au bon endroit
-    for row in range(2, ws.max_row + 1):
-        cell_date = ws.cell(row=row, column=1).value  # date supposée en première colonne
-        if cell_date is None:
-            continue
-
-        try:
-            periode = pd.to_datetime(cell_date).to_period("M")
-        except Exception:
-            continue
-
-        if periode in infl_dict and pd.notna(infl_dict[periode]):
-            ws.cell(row=row, column=col_index_inflation, value=float(infl_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+    if session_locale:
+        session.enregistrer()
 
     return df
 
-def calculer_inflation_elements_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def calculer_inflation_elements_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                    session: SessionClasseur = None):
     """
     Calcule l'inflation mensuelle (MoM, %) uniquement pour les colonnes
     définies dans categories.json + weights.json, et insère les résultats
     dans la feuille Excel (Inflation_<élément>_MoM (%)).
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- Charger la feuille wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Normaliser date -> Period M
     if "date" in df.columns:
@@ -358,42 +260,25 @@ def calculer_inflation_elements_mom(nom_fichier: str, feuille: str, date_debut:
     else:
         df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- Périodes demandées
+    # --- Périodes demandées, avec 1 mois de recul pour les premières variations
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df = df.loc[d_debut:d_fin].copy()
-
-    # --- Charger poids et catégories
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    CATEG_PATH = BASE_DIR / "config" / "categories.json"
-
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-    with open(CATEG_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)
+    df = _avec_recul(df, d_debut, date_fin, RECUL_MOM).copy()
 
-    poids_feuille = extraire_poids(all_weights.get(feuille, {}))
+    # --- Charger poids et catégories (modèle compilé)
+    config = charger_config()
+    poids_feuille = config.poids(feuille)
     if not poids_feuille:
         raise ValueError(f"Aucun poids trouvé pour la feuille '{feuille}' dans weights.json")
 
-    # --- Normalisation des noms pour comparer
-    poids_set = {k.strip().lower() for k in poids_feuille.keys()}
-    categ_set = {c.strip().lower() for c in extraire_toutes_categories(categories)}
-    df_cols_set = {c.strip().lower() for c in df.columns}
-
-    # Colonnes valides = intersection
-    colonnes_valides = [
-        col for col in df.columns
-        if col.strip().lower() in poids_set and col.strip().lower() in categ_set
-    ]
+    # Colonnes valides = intersection (noms normalisés)
+    colonnes_valides = config.colonnes_elements(feuille, df.columns)
 
     if not colonnes_valides:
         raise ValueError(
             f"Aucune colonne valide trouvée.\n"
             f"Colonnes Excel = {sorted(df.columns.tolist())}\n"
             f"Colonnes weights.json = {sorted(poids_feuille.keys())}\n"
-            f"Colonnes categories.json = {sorted(list(categ_set))}"
+            f"Colonnes categories.json = {sorted(config.noms_categories)}"
         )
 
     # --- Calcul inflation MoM uniquement pour colonnes valides
@@ -402,54 +287,30 @@ def calculer_inflation_elements_mom(nom_fichier: str, feuille: str, date_debut:
         prev1 = df[col].shift(1)  # <-- MoM = (t - t-1) / t-1
         infl = ((df[col] - prev1) / prev1) * 100
         df_infl[f"Inflation_MoM (%)_{col}"] = infl.replace([np.inf, -np.inf], np.nan).round(2)
+    df_infl = df_infl.loc[d_debut:]
 
-    # --- Écriture dans Excel
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    # Dictionnaire colonnes existantes
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c
-               for c in range(1, ws.max_column + 1)}
-
+    # --- Écriture dans Excel (une colonne par élément)
     for col_name in df_infl.columns:
-        # Trouver ou créer la colonne
-        if col_name in col_map:
-            col_index = col_map[col_name]
-        else:
-            col_index = ws.max_column + 1
-            ws.cell(row=header_row, column=col_index, value=col_name)
-            col_map[col_name] = col_index
-
-        # Écrire les valeurs
-        infl_dict = df_infl[col_name].to_dict()
-        for r in range(2, ws.max_row + 1):
-            cell_date = ws.cell(row=r, column=1).value
-            if cell_date is None:
-                continue
-            try:
-                periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-            except Exception:
-                continue
-            if periode in infl_dict:
-                val = infl_dict[periode]
-                if pd.notna(val):
-                    ws.cell(row=r, column=col_index, value=float(val))
-
-    wb.save(nom_fichier)
-    wb.close()
+        session.ecrire_colonne(feuille, col_name, df_infl[col_name].to_dict(), ignorer_nan=True)
+
+    if session_locale:
+        session.enregistrer()
 
     return df_infl
 
-def calculer_inflation_elements_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def calculer_inflation_elements_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                    session: SessionClasseur = None):
     """
     Calcule l'inflation annuelle (YoY, %) uniquement pour les colonnes
     définies dans categories.json + weights.json, et insère les résultats
     dans la feuille Excel (Inflation_<élément> (%)).
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- Charger la feuille wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Normaliser date -> Period M
     if "date" in df.columns:
@@ -458,42 +319,25 @@ def calculer_inflation_elements_yoy(nom_fichier: str, feuille: str, date_debut:
     else:
         df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- Périodes demandées
+    # --- Périodes demandées, avec 12 mois de recul pour les premières variations
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df = df.loc[d_debut:d_fin].copy()
-
-    # --- Charger poids et catégories
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    CATEG_PATH = BASE_DIR / "config" / "categories.json"
+    df = _avec_recul(df, d_debut, date_fin, RECUL_YOY).copy()
 
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-    with open(CATEG_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)
-
-    poids_feuille = extraire_poids(all_weights.get(feuille, {}))
+    # --- Charger poids et catégories (modèle compilé)
+    config = charger_config()
+    poids_feuille = config.poids(feuille)
     if not poids_feuille:
         raise ValueError(f"Aucun poids trouvé pour la feuille '{feuille}' dans weights.json")
 
-    # --- Normalisation des noms pour comparer
-    poids_set = {k.strip().lower() for k in poids_feuille.keys()}
-    categ_set = {c.strip().lower() for c in extraire_toutes_categories(categories)}
-    df_cols_set = {c.strip().lower() for c in df.columns}
-
-    # Colonnes valides = intersection
-    colonnes_valides = [
-        col for col in df.columns
-        if col.strip().lower() in poids_set and col.strip().lower() in categ_set
-    ]
+    # Colonnes valides = intersection (noms normalisés)
+    colonnes_valides = config.colonnes_elements(feuille, df.columns)
 
     if not colonnes_valides:
         raise ValueError(
             f"Aucune colonne valide trouvée.\n"
             f"Colonnes Excel = {sorted(df.columns.tolist())}\n"
             f"Colonnes weights.json = {sorted(poids_feuille.keys())}\n"
-            f"Colonnes categories.json = {sorted(list(categ_set))}"
+            f"Colonnes categories.json = {sorted(config.noms_categories)}"
         )
 
     # --- Calcul inflation YoY uniquement pour colonnes valides
@@ -502,46 +346,77 @@ def calculer_inflation_elements_yoy(nom_fichier: str, feuille: str, date_debut:
         prev12 = df[col].shift(12)
         infl = ((df[col] - prev12) / prev12) * 100
         df_infl[f"Inflation_YoY (%)_{col}"] = infl.replace([np.inf, -np.inf], np.nan).round(2)
+    df_infl = df_infl.loc[d_debut:]
 
-    # --- Écriture dans Excel
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    # Dictionnaire colonnes existantes
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c
-               for c in range(1, ws.max_column + 1)}
-
+    # --- Écriture dans Excel (une colonne par élément)
     for col_name in df_infl.columns:
-        # Trouver ou créer la colonne
-        if col_name in col_map:
-            col_index = col_map[col_name]
-        else:
-            col_index = ws.max_column + 1
-            ws.cell(row=header_row, column=col_index, value=col_name)
-            col_map[col_name] = col_index
-
-        # Écrire les valeurs
-        infl_dict = df_infl[col_name].to_dict()
-        for r in range(2, ws.max_row + 1):
-            cell_date = ws.cell(row=r, column=1).value
-            if cell_date is None:
-                continue
-            try:
-                periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-            except Exception:
-                continue
-            if periode in infl_dict:
-                val = infl_dict[periode]
-                if pd.notna(val):
-                    ws.cell(row=r, column=col_index, value=float(val))
-
-    wb.save(nom_fichier)
-    wb.close()
+        session.ecrire_colonne(feuille, col_name, df_infl[col_name].to_dict(), ignorer_nan=True)
+
+    if session_locale:
+        session.enregistrer()
 
     return df_infl
 
-def calculer_contributions_pp_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def _calculer_inflation_tronquee(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                 session: SessionClasseur, decalage: int, mode: str):
+    """Corps de `calculer_inflation_tronquee_mom` / `_yoy` (mesures de `mesures_tronquees`)."""
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
+
+    # --- Charger la feuille wide, date -> Period M, période demandée et `decalage` mois de recul
+    df = session.lire_feuille(feuille)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.to_period("M")
+    df.set_index("date", inplace=True)
+    d_debut = pd.Period(date_debut, freq="M")
+    df = _avec_recul(df, d_debut, date_fin, decalage).copy()
+
+    # --- Composantes pondérées de la feuille
+    panier = charger_config().panier(feuille)
+    colonnes = [col for col in df.columns if col in panier.index]
+    if not colonnes:
+        raise ValueError("Aucune correspondance entre colonnes du fichier Excel et weights.json")
+    poids = panier.compiler(colonnes)
+
+    # --- Variations des composantes, puis toutes les périodes en une passe
+    prix = df[colonnes].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taux = (prix / decaler(prix, decalage) - 1) * 100
+    df_tronquees = pd.DataFrame(mesures_tronquees(taux, poids.vecteur), index=df.index,
+                                columns=colonnes_tronquees(mode)).loc[d_debut:]
+
+    # --- Écriture dans Excel (une colonne par mesure)
+    for col_name in df_tronquees.columns:
+        session.ecrire_colonne(feuille, col_name, df_tronquees[col_name].to_dict(), ignorer_nan=True)
+
+    if session_locale:
+        session.enregistrer()
+
+    return df_tronquees
+
+
+def calculer_inflation_tronquee_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                    session: SessionClasseur = None):
+    """
+    Calcule les moyennes tronquées pondérées (5, 10 et 15 % retirés de
+    chaque queue) et la médiane pondérée des variations mensuelles des
+    composantes de la feuille, et les écrit à côté de 'Inflation (%, mom)'.
+    """
+    return _calculer_inflation_tronquee(nom_fichier, feuille, date_debut, date_fin, session, 1, "mom")
+
+
+def calculer_inflation_tronquee_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                    session: SessionClasseur = None):
+    """
+    Calcule les moyennes tronquées pondérées et la médiane pondérée des
+    variations annuelles des composantes de la feuille, et les écrit à côté
+    de 'Inflation (%, yoy)'.
+    """
+    return _calculer_inflation_tronquee(nom_fichier, feuille, date_debut, date_fin, session, 12, "yoy")
+
+
+def calculer_contributions_pp_mom(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                  session: SessionClasseur = None):
     """
     Calcule les contributions mensuelles (MoM, en pp) pour CHAQUE élément du panier
     (selon categories.json) et écrit une colonne par élément dans Excel.
@@ -550,8 +425,11 @@ def calculer_contributions_pp_mom(nom_fichier: str, feuille: str, date_debut: st
       df_contrib : DataFrame avec toutes les colonnes Contrib_<élément>_MoM
       ipc_info   : DataFrame avec IPC_level et IPC_mom
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
     # --- Charger la feuille wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Normaliser date -> Period M
     if "date" in df.columns:
@@ -560,85 +438,46 @@ def calculer_contributions_pp_mom(nom_fichier: str, feuille: str, date_debut: st
     else:
         df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- Périodes demandées
+    # --- Périodes demandées, avec 1 mois de recul pour les premières contributions
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df = df.loc[d_debut:d_fin].copy()
+    df = _avec_recul(df, d_debut, date_fin, RECUL_MOM).copy()
 
-    # --- Charger poids et catégories
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    CATEG_PATH = BASE_DIR / "config" / "categories.json"
-
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-    with open(CATEG_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)
-
-    poids_feuille = extraire_poids(all_weights.get(feuille, {}))
-    if not poids_feuille:
+    # --- Charger poids et catégories (modèle compilé)
+    config = charger_config()
+    if not config.poids(feuille):
         raise ValueError(f"Aucun poids trouvé pour la feuille '{feuille}' dans weights.json")
+    panier = config.panier(feuille)
 
-    colonnes_valides = [col for col in df.columns if col in poids_feuille]
+    colonnes_valides = [col for col in df.columns if col in panier.index]
     if not colonnes_valides:
         raise ValueError("Aucune colonne du fichier Excel ne correspond aux poids du panier.")
 
     # --- IPC global
-    numer = sum(df[col].astype(float) * float(poids_feuille[col]) for col in colonnes_valides)
-    denom = sum(float(poids_feuille[col]) for col in colonnes_valides)
-    ipc_level = (numer / denom).rename("IPC_level")
+    poids = panier.compiler(colonnes_valides)
+    ipc_level = indice_pondere(df, poids).rename("IPC_level")
     ipc_info = ipc_level.to_frame()
     ipc_info["IPC_prev1"] = ipc_info["IPC_level"].shift(1)
     ipc_info["IPC_mom_pct"] = ((ipc_info["IPC_level"] - ipc_info["IPC_prev1"])
                                 / ipc_info["IPC_prev1"]) * 100
 
-    # --- Calcul contributions détaillées (MoM)
-    df_contrib = pd.DataFrame(index=df.index)
-    for col in colonnes_valides:
-        poids_i = float(poids_feuille[col])
-        delta = df[col] - df[col].shift(1)  # <-- MoM
-        contrib = (delta / ipc_info["IPC_prev1"]) * (poids_i / denom) * 100
-        df_contrib[f"Contrib_MoM_{col} (pp)"] = contrib.replace([np.inf, -np.inf], np.nan).fillna(0.0).round(3)
+    # --- Calcul contributions détaillées (MoM), toutes composantes à la fois
+    df_contrib = contributions_pp(df, poids, ipc_info["IPC_prev1"], 1, "Contrib_MoM_")
+    df_contrib, ipc_info = df_contrib.loc[d_debut:], ipc_info.loc[d_debut:]
 
     # --- Écriture Excel (une colonne par élément, ordre de categories.json)
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c for c in range(1, ws.max_column + 1)}
-
-    # Parcours hiérarchique des catégories pour garder l’ordre
-    for cat, elements in categories.items():
+    for elements in config.hierarchie.values():
         for elem in elements:
             col_name = f"Contrib_MoM_{elem} (pp)"
             if col_name in df_contrib.columns:
-                # Trouver ou créer la colonne
-                if col_name in col_map:
-                    col_index = col_map[col_name]
-                else:
-                    col_index = ws.max_column + 1
-                    ws.cell(row=header_row, column=col_index, value=col_name)
-                    col_map[col_name] = col_index
-
-                contrib_dict = df_contrib[col_name].to_dict()
-
-                for r in range(2, ws.max_row + 1):
-                    cell_date = ws.cell(row=r, column=1).value
-                    if cell_date is None:
-                        continue
-                    try:
-                        periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-                    except Exception:
-                        continue
-                    if periode in contrib_dict:
-                        ws.cell(row=r, column=col_index, value=float(contrib_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+                session.ecrire_colonne(feuille, col_name, df_contrib[col_name].to_dict())
+
+    if session_locale:
+        session.enregistrer()
 
     return df_contrib, ipc_info
 
-def calculer_contributions_pp_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str):
+def calculer_contributions_pp_yoy(nom_fichier: str, feuille: str, date_debut: str, date_fin: str,
+                                  session: SessionClasseur = None):
     """
     Calcule les contributions en pp pour CHAQUE élément du panier
     (selon categories.json) et écrit une colonne par élément dans Excel.
@@ -647,8 +486,11 @@ def calculer_contributions_pp_yoy(nom_fichier: str, feuille: str, date_debut: st
       df_contrib : DataFrame avec toutes les colonnes Contrib_<élément>
       ipc_info   : DataFrame avec IPC_level et IPC_yoy
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
     # --- Charger la feuille wide
-    df = lire_feuille_wide(nom_fichier, feuille)
+    df = session.lire_feuille(feuille)
 
     # --- Normaliser date -> Period M
     if "date" in df.columns:
@@ -657,81 +499,41 @@ def calculer_contributions_pp_yoy(nom_fichier: str, feuille: str, date_debut: st
     else:
         df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- Périodes demandées
+    # --- Périodes demandées, avec 12 mois de recul pour les premières contributions
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df = df.loc[d_debut:d_fin].copy()
-
-    # --- Charger poids et catégories
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    CATEG_PATH = BASE_DIR / "config" / "categories.json"
-
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-    with open(CATEG_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)
+    df = _avec_recul(df, d_debut, date_fin, RECUL_YOY).copy()
 
-    poids_feuille = extraire_poids(all_weights.get(feuille, {}))
-    if not poids_feuille:
+    # --- Charger poids et catégories (modèle compilé)
+    config = charger_config()
+    if not config.poids(feuille):
         raise ValueError(f"Aucun poids trouvé pour la feuille '{feuille}' dans weights.json")
+    panier = config.panier(feuille)
 
-    colonnes_valides = [col for col in df.columns if col in poids_feuille]
+    colonnes_valides = [col for col in df.columns if col in panier.index]
     if not colonnes_valides:
         raise ValueError("Aucune colonne du fichier Excel ne correspond aux poids du panier.")
 
     # --- IPC global
-    numer = sum(df[col].astype(float) * float(poids_feuille[col]) for col in colonnes_valides)
-    denom = sum(float(poids_feuille[col]) for col in colonnes_valides)
-    ipc_level = (numer / denom).rename("IPC_level")
+    poids = panier.compiler(colonnes_valides)
+    ipc_level = indice_pondere(df, poids).rename("IPC_level")
     ipc_info = ipc_level.to_frame()
     ipc_info["IPC_prev12"] = ipc_info["IPC_level"].shift(12)
     ipc_info["IPC_yoy_pct"] = ((ipc_info["IPC_level"] - ipc_info["IPC_prev12"])
                                 / ipc_info["IPC_prev12"]) * 100
 
-    # --- Calcul contributions détaillées
-    df_contrib = pd.DataFrame(index=df.index)
-    for col in colonnes_valides:
-        poids_i = float(poids_feuille[col])
-        delta = df[col] - df[col].shift(12)
-        contrib = (delta / ipc_info["IPC_prev12"]) * (poids_i / denom) * 100
-        df_contrib[f"Contrib_YoY_{col} (pp)"] = contrib.replace([np.inf, -np.inf], np.nan).fillna(0.0).round(3)
+    # --- Calcul contributions détaillées (YoY), toutes composantes à la fois
+    df_contrib = contributions_pp(df, poids, ipc_info["IPC_prev12"], 12, "Contrib_YoY_")
+    df_contrib, ipc_info = df_contrib.loc[d_debut:], ipc_info.loc[d_debut:]
 
     # --- Écriture Excel (une colonne par élément, ordre de categories.json)
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille]
-
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c for c in range(1, ws.max_column + 1)}
-
-    # Parcours hiérarchique des catégories pour garder l’ordre
-    for cat, elements in categories.items():
+    for elements in config.hierarchie.values():
         for elem in elements:
             col_name = f"Contrib_YoY_{elem} (pp)"
             if col_name in df_contrib.columns:
-                # Trouver ou créer la colonne
-                if col_name in col_map:
-                    col_index = col_map[col_name]
-                else:
-                    col_index = ws.max_column + 1
-                    ws.cell(row=header_row, column=col_index, value=col_name)
-                    col_map[col_name] = col_index
-
-                contrib_dict = df_contrib[col_name].to_dict()
-
-                for r in range(2, ws.max_row + 1):
-                    cell_date = ws.cell(row=r, column=1).value
-                    if cell_date is None:
-                        continue
-                    try:
-                        periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-                    except Exception:
-                        continue
-                    if periode in contrib_dict:
-                        ws.cell(row=r, column=col_index, value=float(contrib_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+                session.ecrire_colonne(feuille, col_name, df_contrib[col_name].to_dict())
+
+    if session_locale:
+        session.enregistrer()
 
     return df_contrib, ipc_info
 
@@ -741,7 +543,8 @@ def calculer_contributions_core_noncore_mom(nom_fichier: str,
                                             feuille_noncore: str,
                                             feuille_categories: str,
                                             date_debut: str,
-                                            date_fin: str):
+                                            date_fin: str,
+                                            session: SessionClasseur = None):
     """
     Calcule la contribution mensuelle (MoM, en pp) du Core et du Non-Core
     dans l'inflation globale (feuille 'categories').
@@ -751,11 +554,14 @@ def calculer_contributions_core_noncore_mom(nom_fichier: str,
         df_contrib : DataFrame avec Contrib_Core_MoM et Contrib_Non_Core_MoM
         ipc_info   : DataFrame avec IPC_level et IPC_mom_pct
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- 1. Charger les 3 feuilles
-    df_core = lire_feuille_wide(nom_fichier, feuille_core)
-    df_noncore = lire_feuille_wide(nom_fichier, feuille_noncore)
-    df_cat = lire_feuille_wide(nom_fichier, feuille_categories)
+    df_core = session.lire_feuille(feuille_core)
+    df_noncore = session.lire_feuille(feuille_noncore)
+    df_cat = session.lire_feuille(feuille_categories)
 
     # --- 2. Normaliser les dates
     for df in (df_core, df_noncore, df_cat):
@@ -765,22 +571,17 @@ def calculer_contributions_core_noncore_mom(nom_fichier: str,
         else:
             df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- 3. Restreindre à la période demandée
+    # --- 3. Restreindre à la période demandée, avec 1 mois de recul
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df_core = df_core.loc[d_debut:d_fin].copy()
-    df_noncore = df_noncore.loc[d_debut:d_fin].copy()
-    df_cat = df_cat.loc[d_debut:d_fin].copy()
+    df_core = _avec_recul(df_core, d_debut, date_fin, RECUL_MOM).copy()
+    df_noncore = _avec_recul(df_noncore, d_debut, date_fin, RECUL_MOM).copy()
+    df_cat = _avec_recul(df_cat, d_debut, date_fin, RECUL_MOM).copy()
 
     # --- 4. Charger les poids
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-
-    poids_core = extraire_poids(all_weights.get(feuille_core, {}))
-    poids_noncore = extraire_poids(all_weights.get(feuille_noncore, {}))
-    poids_cat = extraire_poids(all_weights.get(feuille_categories, {}))
+    config = charger_config()
+    poids_core = config.poids(feuille_core)
+    poids_noncore = config.poids(feuille_noncore)
+    poids_cat = config.poids(feuille_categories)
 
     # --- 5. Colonnes valides
     colonnes_core = [c for c in df_core.columns if c in poids_core]
@@ -791,19 +592,19 @@ def calculer_contributions_core_noncore_mom(nom_fichier: str,
         raise ValueError("Colonnes manquantes ou incohérence entre Excel et weights.json")
 
     # --- 6. IPC global
-    numer_cat = sum(df_cat[col] * poids_cat[col] for col in colonnes_cat)
-    denom_cat = sum(poids_cat[col] for col in colonnes_cat)
-    ipc_level = (numer_cat / denom_cat).rename("IPC_level")
+    vect_cat = config.panier(feuille_categories).compiler(colonnes_cat)
+    denom_cat = vect_cat.total
+    ipc_level = indice_pondere(df_cat, vect_cat).rename("IPC_level")
     ipc_prev1 = ipc_level.shift(1)
 
     # --- 7. IPC Core et Non-Core
-    numer_core = sum(df_core[col] * poids_core[col] for col in colonnes_core)
-    denom_core = sum(poids_core[col] for col in colonnes_core)
-    ipc_core = numer_core / denom_core
+    vect_core = config.panier(feuille_core).compiler(colonnes_core)
+    denom_core = vect_core.total
+    ipc_core = indice_pondere(df_core, vect_core)
 
-    numer_noncore = sum(df_noncore[col] * poids_noncore[col] for col in colonnes_noncore)
-    denom_noncore = sum(poids_noncore[col] for col in colonnes_noncore)
-    ipc_noncore = numer_noncore / denom_noncore
+    vect_noncore = config.panier(feuille_noncore).compiler(colonnes_noncore)
+    denom_noncore = vect_noncore.total
+    ipc_noncore = indice_pondere(df_noncore, vect_noncore)
 
     # --- 8. Contributions MoM (pp)
     contrib_core = ((ipc_core - ipc_core.shift(1)) / ipc_prev1) * (denom_core / denom_cat) * 100
@@ -820,35 +621,14 @@ def calculer_contributions_core_noncore_mom(nom_fichier: str,
         "IPC_level": ipc_level,
         "IPC_mom_pct": ipc_mom_pct
     })
+    df_contrib, ipc_info = df_contrib.loc[d_debut:], ipc_info.loc[d_debut:]
 
     # --- 10. Écriture dans Excel
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille_categories]
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c for c in range(1, ws.max_column + 1)}
-
     for col_name in df_contrib.columns:
-        if col_name in col_map:
-            col_index = col_map[col_name]
-        else:
-            col_index = ws.max_column + 1
-            ws.cell(row=header_row, column=col_index, value=col_name)
-            col_map[col_name] = col_index
-
-        contrib_dict = df_contrib[col_name].to_dict()
-        for r in range(2, ws.max_row + 1):
-            cell_date = ws.cell(row=r, column=1).value
-            if cell_date is None:
-                continue
-            try:
-                periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-            except Exception:
-                continue
-            if periode in contrib_dict:
-                ws.cell(row=r, column=col_index, value=float(contrib_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+        session.ecrire_colonne(feuille_categories, col_name, df_contrib[col_name].to_dict())
+
+    if session_locale:
+        session.enregistrer()
 
     return df_contrib, ipc_info
 
@@ -859,7 +639,8 @@ def calculer_contributions_core_noncore_yoy(nom_fichier: str,
                                         feuille_noncore: str,
                                         feuille_categories: str,
                                         date_debut: str,
-                                        date_fin: str):
+                                        date_fin: str,
+                                        session: SessionClasseur = None):
     """
     Calcule la contribution en points de pourcentage (pp) du Core et du Non-Core
     dans l'inflation globale (feuille 'categories').
@@ -868,11 +649,14 @@ def calculer_contributions_core_noncore_yoy(nom_fichier: str,
         df_contrib : DataFrame avec Contrib_Core et Contrib_Non_Core
         ipc_info   : DataFrame avec IPC_level et IPC_yoy_pct
     """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(nom_fichier)
 
     # --- 1. Charger les 3 feuilles
-    df_core = lire_feuille_wide(nom_fichier, feuille_core)
-    df_noncore = lire_feuille_wide(nom_fichier, feuille_noncore)
-    df_cat = lire_feuille_wide(nom_fichier, feuille_categories)
+    df_core = session.lire_feuille(feuille_core)
+    df_noncore = session.lire_feuille(feuille_noncore)
+    df_cat = session.lire_feuille(feuille_categories)
 
     # --- 2. Normaliser les dates
     for df in (df_core, df_noncore, df_cat):
@@ -882,22 +666,17 @@ def calculer_contributions_core_noncore_yoy(nom_fichier: str,
         else:
             df.index = pd.to_datetime(df.index, errors="coerce").to_period("M")
 
-    # --- 3. Restreindre à la période demandée
+    # --- 3. Restreindre à la période demandée, avec 12 mois de recul
     d_debut = pd.Period(date_debut, freq="M")
-    d_fin = pd.Period(date_fin, freq="M")
-    df_core = df_core.loc[d_debut:d_fin].copy()
-    df_noncore = df_noncore.loc[d_debut:d_fin].copy()
-    df_cat = df_cat.loc[d_debut:d_fin].copy()
+    df_core = _avec_recul(df_core, d_debut, date_fin, RECUL_YOY).copy()
+    df_noncore = _avec_recul(df_noncore, d_debut, date_fin, RECUL_YOY).copy()
+    df_cat = _avec_recul(df_cat, d_debut, date_fin, RECUL_YOY).copy()
 
     # --- 4. Charger les poids
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    CONFIG_PATH = BASE_DIR / "config" / "weights.json"
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        all_weights = json.load(f)
-
-    poids_core = extraire_poids(all_weights.get(feuille_core, {}))
-    poids_noncore = extraire_poids(all_weights.get(feuille_noncore, {}))
-    poids_cat = extraire_poids(all_weights.get(feuille_categories, {}))
+    config = charger_config()
+    poids_core = config.poids(feuille_core)
+    poids_noncore = config.poids(feuille_noncore)
+    poids_cat = config.poids(feuille_categories)
 
     # --- 5. Colonnes valides
     colonnes_core = [c for c in df_core.columns if c in poids_core]
@@ -908,19 +687,19 @@ def calculer_contributions_core_noncore_yoy(nom_fichier: str,
         raise ValueError("Colonnes manquantes ou incohérence entre Excel et weights.json")
 
     # --- 6. IPC global
-    numer_cat = sum(df_cat[col] * poids_cat[col] for col in colonnes_cat)
-    denom_cat = sum(poids_cat[col] for col in colonnes_cat)
-    ipc_level = (numer_cat / denom_cat).rename("IPC_level")
+    vect_cat = config.panier(feuille_categories).compiler(colonnes_cat)
+    denom_cat = vect_cat.total
+    ipc_level = indice_pondere(df_cat, vect_cat).rename("IPC_level")
     ipc_prev12 = ipc_level.shift(12)
 
     # --- 7. IPC Core et Non-Core
-    numer_core = sum(df_core[col] * poids_core[col] for col in colonnes_core)
-    denom_core = sum(poids_core[col] for col in colonnes_core)
-    ipc_core = numer_core / denom_core
+    vect_core = config.panier(feuille_core).compiler(colonnes_core)
+    denom_core = vect_core.total
+    ipc_core = indice_pondere(df_core, vect_core)
 
-    numer_noncore = sum(df_noncore[col] * poids_noncore[col] for col in colonnes_noncore)
-    denom_noncore = sum(poids_noncore[col] for col in colonnes_noncore)
-    ipc_noncore = numer_noncore / denom_noncore
+    vect_noncore = config.panier(feuille_noncore).compiler(colonnes_noncore)
+    denom_noncore = vect_noncore.total
+    ipc_noncore = indice_pondere(df_noncore, vect_noncore)
 
     # --- 8. Contribution Core et Non-Core
     contrib_core = ((ipc_core - ipc_core.shift(12)) / ipc_prev12) * (denom_core / denom_cat) * 100
@@ -937,44 +716,40 @@ def calculer_contributions_core_noncore_yoy(nom_fichier: str,
         "IPC_level": ipc_level,
         "IPC_yoy_pct": ipc_yoy_pct
     })
+    df_contrib, ipc_info = df_contrib.loc[d_debut:], ipc_info.loc[d_debut:]
 
     # --- 10. Écriture Excel
-    wb = load_workbook(nom_fichier)
-    ws = wb[feuille_categories]
-    header_row = 1
-    col_map = {ws.cell(row=header_row, column=c).value: c for c in range(1, ws.max_column + 1)}
-
     for col_name in df_contrib.columns:
-        if col_name in col_map:
-            col_index = col_map[col_name]
-        else:
-            col_index = ws.max_column + 1
-            ws.cell(row=header_row, column=col_index, value=col_name)
-            col_map[col_name] = col_index
-
-        contrib_dict = df_contrib[col_name].to_dict()
-        for r in range(2, ws.max_row + 1):
-            cell_date = ws.cell(row=r, column=1).value
-            if cell_date is None:
-                continue
-            try:
-                periode = pd.to_datetime(cell_date, errors="coerce").to_period("M")
-            except Exception:
-                continue
-            if periode in contrib_dict:
-                ws.cell(row=r, column=col_index, value=float(contrib_dict[periode]))
-
-    wb.save(nom_fichier)
-    wb.close()
+        session.ecrire_colonne(feuille_categories, col_name, df_contrib[col_name].to_dict())
+
+    if session_locale:
+        session.enregistrer()
 
     return df_contrib, ipc_info
 
+def chemin_fichier_calculs(nom_fichier: str) -> str:
+    """Chemin de la copie de travail "*_et_calculs.xlsx" du fichier source."""
+    base, ext = os.path.splitext(nom_fichier)
+    return base + "_et_calculs" + ext
+
+
+def preparer_fichier_calculs(nom_fichier: str) -> str:
+    """
+    Retourne le chemin de la copie de travail "*_et_calculs.xlsx",
+    en la créant à partir du fichier source si elle n'existe pas encore.
+    """
+    fichier_calculs = chemin_fichier_calculs(nom_fichier)
+    if not os.path.exists(fichier_calculs):
+        shutil.copyfile(nom_fichier, fichier_calculs)
+    return fichier_calculs
+
 def pipeline_core_noncore(nom_fichier: str,
                           feuille_core: str,
                           feuille_non_core: str,
                           feuille_categories: str,
                           date_debut: str,
-                          date_fin: str):
+                          date_fin: str,
+                          session: SessionClasseur = None):
     """
     Exécute la chaîne complète Core / Non-Core en travaillant sur une copie
     du fichier source ("*_et_calculs.xlsx").
@@ -984,39 +759,51 @@ def pipeline_core_noncore(nom_fichier: str,
       3) Inflation YoY Core / Non-Core
       4) Contributions MoM Core / Non-Core
       5) Contributions YoY Core / Non-Core
+
+    Toutes les étapes partagent une même session (un seul chargement et un seul
+    enregistrement du classeur). Si `session` est fournie, l'enregistrement est
+    laissé à l'appelant.
     """
 
     # --- 0. Créer ou utiliser la copie unique ---
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-    if not os.path.exists(fichier_calculs):
-        shutil.copyfile(nom_fichier, fichier_calculs)
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(preparer_fichier_calculs(nom_fichier))
+    fichier_calculs = session.nom_fichier
 
     # --- 1. IPC Core / Non-Core ---
-    df_ipc_core_noncore = calculer_ipc_core_noncore(
-        fichier_calculs, feuille_core, feuille_non_core,
-        date_debut, date_fin
-    )
+    with etape("ipc"):
+        df_ipc_core_noncore = calculer_ipc_core_noncore(
+            fichier_calculs, feuille_core, feuille_non_core,
+            date_debut, date_fin, session=session
+        )
 
     # --- 2. Inflation MoM Core / Non-Core ---
-    df_infl_core_mom = calculer_inflation_mom(fichier_calculs, feuille_core, date_debut, date_fin)
-    df_infl_noncore_mom = calculer_inflation_mom(fichier_calculs, feuille_non_core, date_debut, date_fin)
+    with etape("inflation_mom"):
+        df_infl_core_mom = calculer_inflation_mom(fichier_calculs, feuille_core, date_debut, date_fin, session=session)
+        df_infl_noncore_mom = calculer_inflation_mom(fichier_calculs, feuille_non_core, date_debut, date_fin, session=session)
 
     # --- 3. Inflation YoY Core / Non-Core ---
-    df_infl_core_yoy = calculer_inflation_yoy(fichier_calculs, feuille_core, date_debut, date_fin)
-    df_infl_noncore_yoy = calculer_inflation_yoy(fichier_calculs, feuille_non_core, date_debut, date_fin)
+    with etape("inflation_yoy"):
+        df_infl_core_yoy = calculer_inflation_yoy(fichier_calculs, feuille_core, date_debut, date_fin, session=session)
+        df_infl_noncore_yoy = calculer_inflation_yoy(fichier_calculs, feuille_non_core, date_debut, date_fin, session=session)
 
     # --- 4. Contributions MoM Core / Non-Core ---
-    df_contrib_core_noncore_mom, ipc_info_mom = calculer_contributions_core_noncore_mom(
-        fichier_calculs, feuille_core, feuille_non_core, feuille_categories,
-        date_debut, date_fin
-    )
+    with etape("contributions_mom"):
+        df_contrib_core_noncore_mom, ipc_info_mom = calculer_contributions_core_noncore_mom(
+            fichier_calculs, feuille_core, feuille_non_core, feuille_categories,
+            date_debut, date_fin, session=session
+        )
 
     # --- 5. Contributions YoY Core / Non-Core ---
-    df_contrib_core_noncore_yoy, ipc_info_yoy = calculer_contributions_core_noncore_yoy(
-        fichier_calculs, feuille_core, feuille_non_core, feuille_categories,
-        date_debut, date_fin
-    )
+    with etape("contributions_yoy"):
+        df_contrib_core_noncore_yoy, ipc_info_yoy = calculer_contributions_core_noncore_yoy(
+            fichier_calculs, feuille_core, feuille_non_core, feuille_categories,
+            date_debut, date_fin, session=session
+        )
+
+    if session_locale:
+        session.enregistrer()
 
     return {
         "ipc": df_ipc_core_noncore,
@@ -1030,85 +817,624 @@ def pipeline_core_noncore(nom_fichier: str,
         "ipc_yoy": ipc_info_yoy,
     }
 
+def _preparer_feuille(session, feuille: str, date_debut: str, date_fin: str, config):
+    """
+    Lit la feuille (dates -> Period M), la restreint à la période précédée de
+    12 mois de recul (variations YoY du début de la période) et retourne
+    (df, colonnes pondérées, colonnes des éléments).
+    """
+    with etape("lecture"):
+        df = session.lire_feuille(feuille)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.to_period("M")
+        df.set_index("date", inplace=True)
+        df = _avec_recul(df, date_debut, date_fin, RECUL_YOY).copy()
+        compter(lignes_lues=len(df), cellules_lues=df.size)
+
+    panier = config.panier(feuille)
+    colonnes_valides = [col for col in df.columns if col in panier.index]
+    if not colonnes_valides:
+        raise ValueError("Aucune correspondance entre colonnes du fichier Excel et weights.json")
+
+    # Éléments = colonnes présentes à la fois dans weights.json et categories.json
+    colonnes_elements = config.colonnes_elements(feuille, df.columns)
+    if not colonnes_elements:
+        raise ValueError(f"Aucune colonne valide trouvée pour la feuille '{feuille}'.")
+    return df, colonnes_valides, colonnes_elements
+
+
+def _ecrire_resultats(session, feuille: str, res, config):
+    """Écrit les séries de `res` (ResultatsFeuille) dans le même ordre de colonnes que la chaîne historique."""
+    with etape("ecriture"):
+        session.ecrire_colonne(feuille, "IPC (%)", res.ipc_arrondi.to_dict())
+        for col_name in res.elements_mom.columns:
+            session.ecrire_colonne(feuille, col_name, res.elements_mom[col_name].to_dict(), ignorer_nan=True)
+        session.ecrire_colonne(feuille, "Inflation (%, mom)", res.inflation_mom.to_dict(), ignorer_nan=True)
+        for col_name in res.tronquees_mom.columns:
+            session.ecrire_colonne(feuille, col_name, res.tronquees_mom[col_name].to_dict(), ignorer_nan=True)
+        for col_name in res.elements_yoy.columns:
+            session.ecrire_colonne(feuille, col_name, res.elements_yoy[col_name].to_dict(), ignorer_nan=True)
+        session.ecrire_colonne(feuille, "Inflation (%, yoy)", res.inflation_yoy.to_dict(), ignorer_nan=True)
+        for col_name in res.tronquees_yoy.columns:
+            session.ecrire_colonne(feuille, col_name, res.tronquees_yoy[col_name].to_dict(), ignorer_nan=True)
+
+        # Contributions : une colonne par élément, ordre de categories.json
+        for df_contrib, tag in ((res.contrib_mom, "MoM"), (res.contrib_yoy, "YoY")):
+            for elements in config.hierarchie.values():
+                for elem in elements:
+                    col_name = f"Contrib_{tag}_{elem} (pp)"
+                    if col_name in df_contrib.columns:
+                        session.ecrire_colonne(feuille, col_name, df_contrib[col_name].to_dict())
+
+
+def _sorties_calculs(df: pd.DataFrame, res) -> dict:
+    """Résultats retournés par `pipeline_calculs` (mêmes clés que la chaîne historique)."""
+    df_ipc = df.assign(**{"IPC (%)": res.ipc_arrondi})
+    return {
+        "ipc": df_ipc,
+        "infl_elem_mom": res.elements_mom,
+        "infl_mom": df_ipc.assign(**{"Inflation (%, mom)": res.inflation_mom}),
+        "infl_elem_yoy": res.elements_yoy,
+        "infl_yoy": df_ipc.assign(**{"Inflation (%, yoy)": res.inflation_yoy}),
+        "tronquees_mom": res.tronquees_mom,
+        "tronquees_yoy": res.tronquees_yoy,
+        "contrib_mom": res.contrib_mom,
+        "ipc_mom": res.ipc_info_mom,
+        "contrib_yoy": res.contrib_yoy,
+        "ipc_yoy": res.ipc_info_yoy,
+        "resultats": res,
+    }
+
+
 def pipeline_calculs(nom_fichier: str,
                      feuille: str,
                      date_debut: str,
-                     date_fin: str):
+                     date_fin: str,
+                     session: SessionClasseur = None):
     """
     Exécute la chaîne complète des calculs IPC et inflation
     en travaillant sur une copie unique ("fichier_de_donnes_et_calculs.xlsx").
+
+    La feuille est lue une seule fois et toutes les séries (IPC, inflation
+    globale et par élément, contributions) sont produites par `calculer_tout`,
+    puis écrites dans le même ordre que les étapes calculer_ipc →
+    calculer_contributions_pp_yoy. Les 12 mois qui précèdent `date_debut`
+    sont lus pour les variations du début de la période, mais seules les
+    périodes de `date_debut` à `date_fin` sont écrites et retournées. Si
+    `session` est fournie, l'enregistrement est laissé à l'appelant.
     """
 
     # --- 0. Créer ou utiliser la copie unique
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-    if not os.path.exists(fichier_calculs):
-        shutil.copyfile(nom_fichier, fichier_calculs)
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(preparer_fichier_calculs(nom_fichier))
 
-    # --- 1. IPC
-    df_ipc = calculer_ipc(fichier_calculs, feuille, date_debut, date_fin)
+    # --- 1. Charger la feuille, poids et catégories (modèle compilé, relu seulement si les fichiers changent)
+    config = charger_config()
+    df, colonnes_valides, colonnes_elements = _preparer_feuille(session, feuille, date_debut, date_fin, config)
+
+    # --- 2. Tous les calculs en une passe, puis retrait des mois de recul
+    d_debut = pd.Period(date_debut, freq="M")
+    with etape("calcul"):
+        res = calculer_tout(df, config.panier(feuille).compiler(colonnes_valides), colonnes_elements)
+        res = res.depuis(d_debut)
 
-    # --- 2. Inflation éléments MoM
-    df_infl_elem_mom = calculer_inflation_elements_mom(fichier_calculs, feuille, date_debut, date_fin)
+    # --- 3. Écriture (même ordre de colonnes que la chaîne historique)
+    _ecrire_resultats(session, feuille, res, config)
 
-    # --- 3. Inflation globale MoM
-    df_infl_mom = calculer_inflation_mom(fichier_calculs, feuille, date_debut, date_fin)
+    if session_locale:
+        session.enregistrer()
+
+    return _sorties_calculs(df.loc[d_debut:], res)
+
+
+def pipeline_regions(nom_fichier: str,
+                     feuilles,
+                     date_debut: str,
+                     date_fin: str,
+                     session: SessionClasseur = None) -> dict:
+    """
+    `pipeline_calculs` pour plusieurs régions de même structure (Grand_Alger
+    et national) à la fois.
+
+    Les feuilles sont rangées dans un seul tableau (région × période ×
+    composante) et chaque série est calculée une seule fois pour toutes les
+    régions (`calculer_panneau`) ; les résultats de chaque région sont des
+    vues sur ce tableau. Les cellules écrites sont les mêmes qu'avec
+    `pipeline_calculs` feuille par feuille, qui est utilisé si les régions
+    n'ont pas les mêmes périodes ou les mêmes composantes.
+
+    Returns:
+        dict: {feuille: résultats de `pipeline_calculs`}.
+    """
+    session_locale = session is None
+    if session_locale:
+        session = SessionClasseur(preparer_fichier_calculs(nom_fichier))
+
+    # --- 1. Lecture de toutes les régions
+    config = charger_config()
+    lues = {feuille: _preparer_feuille(session, feuille, date_debut, date_fin, config) for feuille in feuilles}
+    df_ref, valides_ref, elements_ref = next(iter(lues.values()))
+    compatibles = all(valides == valides_ref and elements == elements_ref and df.index.equals(df_ref.index)
+                      for df, valides, elements in lues.values())
+
+    # --- 2. Calculs : une passe pour toutes les régions, ou une par feuille (sans les mois de recul)
+    d_debut = pd.Period(date_debut, freq="M")
+    with etape("calcul"):
+        if compatibles:
+            colonnes = list(dict.fromkeys(valides_ref + elements_ref))
+            panneau = PanneauRegional.depuis_feuilles({f: lu[0] for f, lu in lues.items()}, colonnes)
+            poids = [config.panier(f).compiler(valides_ref) for f in lues]
+            res_panneau = calculer_panneau(panneau, poids, elements_ref)
+            resultats = {f: res_panneau.region(f).depuis(d_debut) for f in lues}
+        else:
+            print("ℹ️ Régions de structures différentes : calcul feuille par feuille")
+            resultats = {f: calculer_tout(df, config.panier(f).compiler(valides), elements).depuis(d_debut)
+                         for f, (df, valides, elements) in lues.items()}
 
-    # --- 4. Inflation éléments YoY
-    df_infl_elem_yoy = calculer_inflation_elements_yoy(fichier_calculs, feuille, date_debut, date_fin)
+    # --- 3. Écriture, région par région
+    for feuille, res in resultats.items():
+        _ecrire_resultats(session, feuille, res, config)
 
-    # --- 5. Inflation globale YoY
-    df_infl_yoy = calculer_inflation_yoy(fichier_calculs, feuille, date_debut, date_fin)
+    if session_locale:
+        session.enregistrer()
 
-    # --- 6. Contributions MoM
-    df_contrib_mom, ipc_info_mom = calculer_contributions_pp_mom(fichier_calculs, feuille, date_debut, date_fin)
+    return {feuille: _sorties_calculs(lues[feuille][0].loc[d_debut:], res) for feuille, res in resultats.items()}
 
-    # --- 7. Contributions YoY
-    df_contrib_yoy, ipc_info_yoy = calculer_contributions_pp_yoy(fichier_calculs, feuille, date_debut, date_fin)
+
+def calculer_arbre(nom_fichier: str, date_debut: str, date_fin: str, classeur: ClasseurCharge = None,
+                   racines=None, priorite_observees: bool = True) -> pd.DataFrame:
+    """
+    Indices de tous les niveaux de weights.json (sous-groupe → groupe →
+    indice d'ensemble, pour chaque panier) en une seule passe.
+
+    Le classeur est analysé une seule fois (`charger_classeur`) ; chaque
+    feuille utilisée est lue une fois, les séries de toutes les feuilles sont
+    rangées dans une seule matrice et les nœuds internes sont agrégés de bas
+    en haut, un niveau par opération (voir `ConfigIPC.arbre` et
+    `ArbreAgregation`). Ajouter un niveau à weights.json ne coûte aucune
+    lecture supplémentaire.
+
+    Args:
+        nom_fichier (str): classeur source.
+        date_debut, date_fin (str): période ("AAAA-MM").
+        classeur (ClasseurCharge): classeur déjà chargé.
+        racines (iterable): paniers à agréger (défaut : tous ceux qui ont une feuille).
+        priorite_observees (bool): un groupe publié dans la feuille de son
+            panier (ex. "Alimentations_Boissons_non_alcoolisées" dans
+            Grand_Alger) garde sa série publiée ; si False, il est recalculé à
+            partir de ses sous-groupes.
+
+    Returns:
+        pd.DataFrame: périodes (Period M) × nœuds ("panier/composante/…").
+        L'indice d'ensemble d'un panier est la colonne au nom du panier (non
+        arrondi : "IPC (%)" en est l'arrondi à 2 décimales).
+    """
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+    arbre, periodes, valeurs = _valeurs_arbre(classeur, date_debut, date_fin, racines, priorite_observees)
+    return pd.DataFrame(valeurs, index=periodes, columns=list(arbre.noeuds))
+
+
+def _valeurs_arbre(classeur: ClasseurCharge, date_debut: str, date_fin: str, racines=None,
+                   priorite_observees: bool = True) -> tuple:
+    """Corps de `calculer_arbre` : (ArbreAgregation, périodes, valeurs périodes × nœuds)."""
+    d_debut, d_fin = pd.Period(date_debut, freq="M"), pd.Period(date_fin, freq="M")
+
+    feuilles = {}
+    for nom in classeur.feuilles:
+        df = classeur.feuille_wide(nom)
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce").dt.to_period("M"))
+        df = df.dropna(subset=["date"]).drop_duplicates("date").set_index("date")
+        feuilles[nom] = df.loc[d_debut:d_fin]
+
+    arbre = charger_config().arbre({nom: list(df.columns) for nom, df in feuilles.items()}, racines)
+
+    # --- Séries observées de tous les nœuds, dans une seule matrice
+    utilisees = {s[0] for s in arbre.sources if s is not None}
+    periodes = pd.PeriodIndex(sorted(set().union(*(feuilles[f].index for f in utilisees))), freq="M")
+    observees = np.full((len(periodes), len(arbre)), np.nan)
+    for i, source in enumerate(arbre.sources):
+        if source is not None:
+            feuille, colonne = source
+            observees[:, i] = feuilles[feuille][colonne].reindex(periodes).to_numpy(dtype=float)
+
+    return arbre, periodes, arbre.agreger(observees, priorite_observees)
+
+
+DATE_DEBUT = "2002-01"  # début fixe des calculs
+
+# Prix des paniers pour les scénarios, cache LRU : (chemin, feuille, début, fin) -> (empreinte du classeur, df)
+_prix_scenarios = OrderedDict()
+MAX_PRIX_SCENARIOS = 8
+
+
+def _prix_panier(classeur: ClasseurCharge, feuille: str, date_debut: str, date_fin: str) -> pd.DataFrame:
+    """
+    Feuille indexée par période (Period M) et restreinte à la période,
+    construite une seule fois par version du classeur. Seules les
+    `MAX_PRIX_SCENARIOS` dernières utilisées sont conservées.
+    """
+    cle = (os.path.abspath(classeur.nom_fichier), feuille, date_debut, date_fin)
+    entree = _prix_scenarios.get(cle)
+    if entree is not None and entree[0] == classeur.empreinte:
+        _prix_scenarios.move_to_end(cle)
+        return entree[1]
+    df = classeur.feuille_wide(feuille)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.to_period("M")
+    df = df.set_index("date").loc[pd.Period(date_debut, freq="M"):pd.Period(date_fin, freq="M")]
+    _prix_scenarios[cle] = (classeur.empreinte, df)
+    _prix_scenarios.move_to_end(cle)
+    while len(_prix_scenarios) > MAX_PRIX_SCENARIOS:
+        _prix_scenarios.popitem(last=False)
+    return df
+
+
+def scenarios_poids(nom_fichier: str, scenarios, feuille: str = "Grand_Alger",
+                    date_debut: str = DATE_DEBUT, date_fin: str = None,
+                    classeur: ClasseurCharge = None) -> dict:
+    """
+    IPC et inflation globale (MoM, YoY) d'une feuille sous des jeux de poids
+    alternatifs, sans modifier weights.json ni écrire dans le classeur.
+
+    Les K scénarios sont calculés ensemble par un seul produit matriciel
+    (`calculer_scenarios`) sur les prix de la feuille, lus une seule fois
+    par version du classeur.
+
+    Args:
+        nom_fichier (str): classeur source.
+        scenarios: jeux de poids, sous l'une des formes :
+            - {nom: {composante: poids}} ou liste de {composante: poids} :
+              les composantes absentes gardent leur poids de weights.json ;
+            - matrice K × N (ou liste de vecteurs) alignée sur les composantes
+              pondérées de la feuille, dans l'ordre de ses colonnes (voir la
+              clé "poids" du résultat).
+        feuille (str): feuille du panier (Grand_Alger, national…).
+        date_debut, date_fin (str): période ("AAAA-MM" ; fin par défaut : dernière date de la feuille) ;
+            les 12 mois précédents sont lus pour l'inflation du début de la période.
+        classeur (ClasseurCharge): classeur déjà chargé.
+
+    Returns:
+        dict: "ipc", "ipc_arrondi", "inflation_mom", "inflation_yoy"
+        (DataFrames périodes × scénarios) et "poids" (scénarios × composantes).
+    """
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+    if date_fin is None:
+        date_fin = classeur.date_max(feuille).strftime("%Y-%m")
+    d_debut = pd.Period(date_debut, freq="M")
+    df = _prix_panier(classeur, feuille, (d_debut - RECUL_YOY).strftime("%Y-%m"), date_fin)
+
+    panier = charger_config().panier(feuille)
+    reference = panier.compiler([col for col in df.columns if col in panier.index])
+    colonnes = list(reference.colonnes)
+
+    # --- Matrice des poids (K × N)
+    if isinstance(scenarios, np.ndarray):
+        # Matrice déjà alignée : pas de conversion ligne par ligne (vérifiée par calculer_scenarios)
+        matrice = scenarios
+        noms = [f"scenario_{k + 1}" for k in range(len(np.atleast_2d(matrice)))]
+    else:
+        if isinstance(scenarios, dict):
+            noms, lignes = list(scenarios), list(scenarios.values())
+        else:
+            lignes = list(scenarios)
+            noms = [f"scenario_{k + 1}" for k in range(len(lignes))]
+        matrice = np.empty((len(lignes), len(colonnes)))
+        for k, ligne in enumerate(lignes):
+            if isinstance(ligne, dict):
+                inconnues = set(ligne) - set(colonnes)
+                if inconnues:
+                    raise ValueError(f"Scénario {noms[k]!r} : composante(s) sans colonne dans "
+                                     f"'{feuille}' : {sorted(inconnues)}")
+                matrice[k] = [float(ligne.get(c, w)) for c, w in zip(colonnes, reference.vecteur)]
+            else:
+                ligne = np.asarray(ligne, dtype=float)
+                if ligne.shape != (len(colonnes),):
+                    raise ValueError(f"Scénario {noms[k]!r} : {len(colonnes)} poids attendus "
+                                     f"({', '.join(colonnes)}), {ligne.size} reçus")
+                matrice[k] = ligne
+    if not len(noms):
+        raise ValueError("Aucun scénario de poids.")
+
+    res = calculer_scenarios(df[colonnes].to_numpy(dtype=float), colonnes, matrice)
+
+    def tableau(valeurs):
+        return pd.DataFrame(valeurs, index=df.index, columns=noms, copy=False).loc[d_debut:]
 
     return {
-        "ipc": df_ipc,
-        "infl_elem_mom": df_infl_elem_mom,
-        "infl_mom": df_infl_mom,
-        "infl_elem_yoy": df_infl_elem_yoy,
-        "infl_yoy": df_infl_yoy,
-        "contrib_mom": df_contrib_mom,
-        "ipc_mom": ipc_info_mom,
-        "contrib_yoy": df_contrib_yoy,
-        "ipc_yoy": ipc_info_yoy,
+        "ipc": tableau(res.ipc),
+        "ipc_arrondi": tableau(res.ipc_arrondi),
+        "inflation_mom": tableau(res.inflation_mom),
+        "inflation_yoy": tableau(res.inflation_yoy),
+        "poids": pd.DataFrame(res.poids, index=noms, columns=colonnes),
     }
 
 
+def _resoudre_composante(nom: str, chemins: list, panier: str) -> int:
+    """Position de la composante `nom` (chemin sous le panier, ou dernier segment s'il est unique)."""
+    if nom in chemins:
+        return chemins.index(nom)
+    candidats = [i for i, chemin in enumerate(chemins) if chemin.rsplit("/", 1)[-1] == nom]
+    if len(candidats) != 1:
+        raise ValueError(f"Composante {'ambiguë' if candidats else 'inconnue'} dans '{panier}' : {nom!r}"
+                         + (f" ({', '.join(chemins[i] for i in candidats)})" if candidats else ""))
+    return candidats[0]
+
+
+def _noms_hors(chemins: list) -> list:
+    """Noms "hors <composante>" (dernier segment du chemin, ou chemin complet s'il est ambigu)."""
+    derniers = [chemin.rsplit("/", 1)[-1] for chemin in chemins]
+    return [f"hors {d if derniers.count(d) == 1 else c}" for d, c in zip(derniers, chemins)]
+
+
+def noms_mesures_exclusion(nom_fichier: str, panier: str = "Grand_Alger",
+                           classeur: ClasseurCharge = None) -> list:
+    """
+    Noms des colonnes de `mesures_exclusion(…, sans_chaque=True)` ("IPC" puis
+    "hors <composante>"), lus dans l'arbre de weights.json et les en-têtes du
+    classeur, sans aucun calcul.
+    """
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+    colonnes = {nom: infos["colonnes"] for nom, infos in classeur.catalogue.items()}
+    arbre = charger_config().arbre(colonnes, racines=[panier])
+    return ["IPC"] + _noms_hors([noeud.split("/", 1)[1] for noeud in arbre.noeuds[1:]])
+
+
+def mesures_exclusion(nom_fichier: str, panier: str = "Grand_Alger", exclusions: dict = None,
+                      sans_chaque: bool = True, date_debut: str = DATE_DEBUT, date_fin: str = None,
+                      classeur: ClasseurCharge = None) -> dict:
+    """
+    Indices et inflation hors composantes d'un panier : chaque composante de
+    weights.json retirée seule (groupes et sous-groupes) et des ensembles
+    d'exclusions au choix, en une seule passe (`calculer_exclusions`).
+
+    L'indice d'ensemble et les séries des composantes sont ceux de l'arbre
+    d'agrégation (`calculer_arbre`). Une composante pèse sa part effective
+    dans l'indice (poids du groupe × part du sous-groupe dans le groupe) ;
+    retirer un sous-groupe retire donc cette part de sa propre série.
+
+    Args:
+        nom_fichier (str): classeur source.
+        panier (str): panier de weights.json (Grand_Alger, national…).
+        exclusions (dict): {nom de la mesure: composantes exclues}. Une
+            composante est désignée par son chemin sous le panier
+            ("Alimentations_Boissons_non_alcoolisées/Légumes") ou, s'il est
+            unique, par son seul nom ("Légumes"). Un groupe exclu emporte ses
+            sous-groupes.
+        sans_chaque (bool): inclure une mesure "hors <composante>" par composante.
+        date_debut, date_fin (str): période ("AAAA-MM" ; fin par défaut : dernière date du panier) ;
+            les 12 mois précédents sont lus pour l'inflation du début de la période.
+        classeur (ClasseurCharge): classeur déjà chargé.
+
+    Returns:
+        dict: "ipc", "ipc_arrondi", "inflation_mom", "inflation_yoy"
+        (DataFrames périodes × mesures, la première colonne "IPC" étant
+        l'indice d'ensemble) et "parts" (part de l'indice retirée par mesure).
+    """
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+    config = charger_config()
+    feuille = config.feuille_du_panier(panier, classeur.feuilles)
+    if feuille is None:
+        raise ValueError(f"Aucune feuille pour le panier '{panier}'")
+    if date_fin is None:
+        date_fin = classeur.date_max(feuille).strftime("%Y-%m")
+
+    d_debut = pd.Period(date_debut, freq="M")
+    arbre, periodes, valeurs = _valeurs_arbre(classeur, (d_debut - RECUL_YOY).strftime("%Y-%m"), date_fin,
+                                              racines=[panier])
+    composantes = np.arange(1, len(arbre))  # racine unique en 0, puis ses descendants
+    chemins = [arbre.noeuds[i].split("/", 1)[1] for i in composantes]
+    parts = arbre.parts()[composantes]
+
+    # --- Ensembles d'exclusions (un groupe et l'un de ses sous-groupes ne comptent qu'une fois)
+    noms_ensembles, ensembles = list(exclusions or {}), None
+    if noms_ensembles:
+        ensembles = np.zeros((len(noms_ensembles), len(composantes)))
+        for k, nom in enumerate(noms_ensembles):
+            for composante in exclusions[nom]:
+                ensembles[k, _resoudre_composante(composante, chemins, panier)] = 1.0
+            for j in np.flatnonzero(ensembles[k]):
+                ensembles[k, [i for i, chemin in enumerate(chemins)
+                              if chemin.startswith(chemins[j] + "/")]] = 0.0
+
+    # --- Indice d'ensemble (exclusion vide) + toutes les mesures en une passe
+    vide = np.zeros((1, len(composantes)))
+    ensembles = vide if ensembles is None else np.vstack([vide, ensembles])
+    res = calculer_exclusions(valeurs[:, 0], valeurs[:, composantes], parts, ensembles, sans_chaque)
+
+    # --- Colonnes : "IPC", puis "hors <composante>", puis les ensembles
+    individuelles = _noms_hors(chemins)
+    n = len(composantes) if sans_chaque else 0
+    ordre = [n] + list(range(n)) + list(range(n + 1, res.ipc.shape[1]))
+    noms = ["IPC"] + individuelles[:n] + noms_ensembles
+
+    def tableau(valeurs_mesures):
+        return pd.DataFrame(valeurs_mesures[:, ordre], index=periodes, columns=noms).loc[d_debut:]
+
+    return {
+        "ipc": tableau(res.ipc),
+        "ipc_arrondi": tableau(res.ipc_arrondi),
+        "inflation_mom": tableau(res.inflation_mom),
+        "inflation_yoy": tableau(res.inflation_yoy),
+        "parts": pd.Series(res.retirees[ordre], index=noms, name="part retirée"),
+    }
+
 import pandas as pd
 
 
-def get_max_date(nom_fichier: str, feuille: str) -> pd.Timestamp:
+def get_max_date(nom_fichier: str, feuille: str, classeur: ClasseurCharge = None) -> pd.Timestamp:
     """
-    Récupère la date maximale (plus récente) dans l'index d'une feuille Excel.
+    Récupère la date maximale (plus récente) dans l'index d'une feuille Excel,
+    depuis le catalogue du classeur (chargé une seule fois si `classeur` est fourni).
     """
-    df = pd.read_excel(nom_fichier, sheet_name=feuille, index_col=0, parse_dates=True)
-    return df.index.max()
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+    return classeur.date_max(feuille)
 
 
-def pipeline_global(Fichier_de_donnees: str):
+def _executer_pipeline(tache):
     """
-    Fonction globale qui exécute les différents pipelines de calculs
-    (Grand Alger, Categories, National, Core/Non-Core).
+    Exécute un pipeline dans un processus de travail, sur des feuilles fournies
+    en mémoire, et retourne le journal des écritures (à rejouer sur le classeur).
+    """
+    type_pipeline, arguments, feuilles, chemins = tache
+    session = SessionMemoire(feuilles)
+    # Même configuration que le processus principal (y compris sous `utiliser_config`)
+    with utiliser_config(*chemins):
+        executer_tache(None, type_pipeline, arguments, session)
+    return session.journal
 
-    Paramètres
-    ----------
-    Fichier_de_donnees : str
-        Chemin vers le fichier Excel contenant toutes les feuilles.
+
+def executer_tache(nom_fichier: str, type_pipeline: str, arguments: tuple, session):
+    """Exécute une tâche de `taches_pipelines` sur `session`."""
+    if type_pipeline == "calculs":
+        return pipeline_calculs(nom_fichier, *arguments, session=session)
+    if type_pipeline == "regions":
+        return pipeline_regions(nom_fichier, *arguments, session=session)
+    return pipeline_core_noncore(nom_fichier, *arguments, session=session)
+
+
+def feuilles_principales(tache) -> tuple:
+    """Feuilles principales d'une tâche (plusieurs pour une tâche "regions")."""
+    premiere = tache[2][0]
+    return tuple(premiere) if isinstance(premiere, (tuple, list)) else (premiere,)
+
+
+def restreindre_taches(taches: list, feuilles) -> list:
+    """
+    Tâches dont une feuille principale figure dans `feuilles` ; une tâche
+    "regions" est réduite aux régions demandées (ValueError pour une feuille
+    sans pipeline).
     """
+    feuilles = set(feuilles)
+    inconnues = feuilles - {f for t in taches for f in feuilles_principales(t)}
+    if inconnues:
+        raise ValueError(f"Aucun pipeline pour la (les) feuille(s) : {sorted(inconnues)}")
+    retenues = []
+    for libelle, type_pipeline, arguments, lues in taches:
+        principales = feuilles_principales((libelle, type_pipeline, arguments, lues))
+        gardees = [f for f in principales if f in feuilles]
+        if not gardees:
+            continue
+        if type_pipeline == "regions" and len(gardees) < len(principales):
+            libelle = " / ".join(LIBELLES_REGIONS.get(f, f) for f in gardees)
+            if len(gardees) == 1:
+                type_pipeline, arguments = "calculs", (gardees[0],) + arguments[1:]
+            else:
+                arguments = (tuple(gardees),) + arguments[1:]
+            lues = [f for f in lues if f in gardees]
+        retenues.append((libelle, type_pipeline, arguments, lues))
+    return retenues
 
-    # --- 1) Dates de référence
-    date_debut = "2002-01"  # fixe
+
+def _empreinte_config() -> str:
+    """Empreinte (SHA-256) de weights.json et categories.json (voir `chemins_config`)."""
+    h = hashlib.sha256()
+    for chemin in chemins_config():
+        h.update(chemin.read_bytes())
+    return h.hexdigest()
+
+
+def _chemin_etat(fichier_calculs: str) -> Path:
+    """Fichier d'état de la dernière exécution, rangé avec les caches de feuilles."""
+    chemin = Path(fichier_calculs)
+    return chemin.parent / DOSSIER_CACHE / f"{chemin.stem}.etat.json"
+
+
+def _lire_etat(fichier_calculs: str) -> dict:
+    try:
+        with open(_chemin_etat(fichier_calculs), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_etat(fichier_calculs: str, etat: dict):
+    chemin = _chemin_etat(fichier_calculs)
+    chemin.parent.mkdir(exist_ok=True)
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(etat, f, indent=2)
+
+
+def _signature_classeur(fichier_calculs: str) -> list:
+    """[taille, date de modification (ns)] du classeur, telle qu'enregistrée dans l'état."""
+    infos = os.stat(fichier_calculs)
+    return [infos.st_size, infos.st_mtime_ns]
+
+
+def entetes_calcules(nom_fichier: str, classeur: ClasseurCharge, feuilles=None) -> dict:
+    """
+    En-têtes des colonnes calculées que `pipeline_global` écrit dans chaque
+    feuille, obtenus en exécutant les pipelines en mémoire (`SessionMemoire`)
+    sur le dernier mois commun à toutes les feuilles (et ses 12 mois de
+    recul) : le résultat suit le code et la configuration courants.
+
+    Returns:
+        dict: {feuille: set des en-têtes}.
+    """
+    dernier_mois = min(get_max_date(None, f, classeur)
+                       for f in ("Grand_Alger", "categories", "national", "core", "Produits_agricoles_frais"))
+    taches = taches_pipelines(classeur, dernier_mois.strftime("%Y-%m"))
+    if feuilles is not None:
+        taches = restreindre_taches(taches, feuilles)
+    session = SessionMemoire({f: classeur.feuille_wide(f) for _, _, _, noms in taches for f in noms})
+    with open(os.devnull, "w") as muet, redirect_stdout(muet):
+        for _, type_pipeline, arguments, _ in taches:
+            executer_tache(nom_fichier, type_pipeline, arguments, session)
+    return session.colonnes_ecrites
+
+
+def _raison_recalcul_complet(nom_fichier: str, fichier_calculs: str, cree: bool,
+                             empreinte_config: str, classeur: ClasseurCharge, feuilles):
+    """
+    Raison pour laquelle le mode incrémental doit tout recalculer, ou None
+    si l'état de la dernière exécution correspond au classeur de résultats.
+    """
+    if cree:
+        return "Classeur de résultats créé à partir du fichier source"
+    etat = _lire_etat(fichier_calculs)
+    if etat.get("config") != empreinte_config:
+        return "Pas d'exécution précédente avec cette configuration"
+    if etat.get("classeur") != _signature_classeur(fichier_calculs):
+        return "Classeur de résultats remplacé ou modifié depuis la dernière exécution"
+    ecrites = etat.get("entetes", {})
+    manquantes = [(f, c) for f, colonnes in entetes_calcules(nom_fichier, classeur, feuilles).items()
+                  for c in colonnes if c not in ecrites.get(f, ())]
+    if manquantes:
+        return f"{len(manquantes)} colonne(s) calculée(s) absente(s) du classeur de résultats"
+    return None
+
+
+def periodes_a_recalculer(modifiees: set) -> set:
+    """
+    Périodes dont les séries dérivées changent lorsque les périodes `modifiees`
+    changent : elles-mêmes, le mois suivant (MoM) et le même mois un an plus
+    tard (YoY).
+    """
+    return {p + k for p in modifiees for k in (0, 1, 12)}
+
+
+LIBELLES_REGIONS = {"Grand_Alger": "Grand Alger", "national": "National"}  # libellés des pipelines
+
+
+def taches_pipelines(classeur: ClasseurCharge, date_debut: str = DATE_DEBUT) -> list:
+    """
+    Pipelines exécutés par `pipeline_global`, dans l'ordre :
+    (libellé, type "calculs" | "regions" | "core_noncore", arguments, feuilles lues).
+
+    Chaque pipeline va jusqu'à la date max de sa feuille ; Core / Non-Core
+    va jusqu'à la plus récente de toutes. Grand_Alger et national, qui ont
+    les mêmes composantes, sont calculés ensemble (`pipeline_regions`)
+    lorsqu'elles s'arrêtent au même mois.
+    """
     # On va chercher la date max dans chaque feuille
-    date_fin_grand_alger = get_max_date(Fichier_de_donnees, "Grand_Alger")
-    date_fin_categories = get_max_date(Fichier_de_donnees, "categories")
-    date_fin_national = get_max_date(Fichier_de_donnees, "national")
-    date_fin_core = get_max_date(Fichier_de_donnees, "core")
-    date_fin_non_core = get_max_date(Fichier_de_donnees, "Produits_agricoles_frais")
+    date_fin_grand_alger = get_max_date(None, "Grand_Alger", classeur)
+    date_fin_categories = get_max_date(None, "categories", classeur)
+    date_fin_national = get_max_date(None, "national", classeur)
+    date_fin_core = get_max_date(None, "core", classeur)
+    date_fin_non_core = get_max_date(None, "Produits_agricoles_frais", classeur)
 
     # La date de fin globale = la plus récente parmi toutes
     date_fin_globale = max(date_fin_grand_alger,
@@ -1117,106 +1443,308 @@ def pipeline_global(Fichier_de_donnees: str):
                            date_fin_core,
                            date_fin_non_core)
 
-    # --- 2) Pipelines individuels
-    print("➡️ Pipeline Grand Alger")
-    pipeline_calculs(Fichier_de_donnees, "Grand_Alger", date_debut, date_fin_grand_alger.strftime("%Y-%m"))
+    if date_fin_grand_alger.strftime("%Y-%m") == date_fin_national.strftime("%Y-%m"):
+        regions = [
+            ("Grand Alger / National", "regions",
+             (("Grand_Alger", "national"), date_debut, date_fin_grand_alger.strftime("%Y-%m")),
+             ["Grand_Alger", "national"]),
+        ]
+    else:
+        regions = [
+            ("Grand Alger", "calculs",
+             ("Grand_Alger", date_debut, date_fin_grand_alger.strftime("%Y-%m")),
+             ["Grand_Alger"]),
+            ("National", "calculs",
+             ("national", date_debut, date_fin_national.strftime("%Y-%m")),
+             ["national"]),
+        ]
+
+    return regions + [
+        ("Categories", "calculs",
+         ("categories", date_debut, date_fin_categories.strftime("%Y-%m")),
+         ["categories"]),
+        ("Core / Non-Core", "core_noncore",
+         ("core", "Produits_agricoles_frais", "categories",
+          date_debut, date_fin_globale.strftime("%Y-%m")),  # on prend la plus récente
+         ["core", "Produits_agricoles_frais", "categories"]),
+    ]
 
-    print("➡️ Pipeline Categories")
-    pipeline_calculs(Fichier_de_donnees, "categories", date_debut, date_fin_categories.strftime("%Y-%m"))
 
-    print("➡️ Pipeline National")
-    pipeline_calculs(Fichier_de_donnees, "national", date_debut, date_fin_national.strftime("%Y-%m"))
+def pipeline_global(Fichier_de_donnees: str, parallele: bool = False, max_workers: int = None,
+                    incremental: bool = False, flux: bool = False, progression=None,
+                    instrumentation=None, feuilles=None):
+    """
+    Fonction globale qui exécute les différents pipelines de calculs
+    (Grand Alger, Categories, National, Core/Non-Core).
 
-    # --- 3) Pipeline Core vs Non-Core
-    print("➡️ Pipeline Core / Non-Core")
-    pipeline_core_noncore(
-        nom_fichier=Fichier_de_donnees,
-        feuille_core="core",
-        feuille_non_core="Produits_agricoles_frais",
-        feuille_categories="categories",
-        date_debut=date_debut,
-        date_fin=date_fin_globale.strftime("%Y-%m")  # on prend la plus récente
-    )
+    Paramètres
+    ----------
+    Fichier_de_donnees : str
+        Chemin vers le fichier Excel contenant toutes les feuilles.
+    parallele : bool
+        Si True, les pipelines sont calculés simultanément dans un pool de
+        processus (chacun reçoit ses feuilles et retourne ses écritures) ;
+        le processus principal écrit ensuite tous les résultats dans le
+        classeur, dans le même ordre que l'exécution séquentielle.
+    max_workers : int
+        Nombre maximal de processus en mode parallèle (défaut : un par pipeline).
+    incremental : bool
+        Si True, seules les périodes nouvelles ou modifiées du fichier source
+        (par rapport à la copie "*_et_calculs.xlsx") sont reportées puis
+        recalculées : les calculs partent de la première de ces périodes
+        (chaque pipeline lit les 12 mois de recul dont il a besoin) et
+        seules les cellules des périodes concernées (et des mois qui en
+        dépendent, M+1 et M+12) sont réécrites. Un recalcul complet a lieu
+        si weights.json / categories.json ont changé, s'il n'y a pas eu
+        d'exécution précédente, si le classeur de résultats vient d'être créé
+        ou diffère de celui enregistré par la dernière exécution, ou s'il lui
+        manque des colonnes que le code actuel calcule (`entetes_calcules`).
+    flux : bool
+        Si True, le classeur de résultats est réécrit en flux (`SessionFlux` :
+        lecture `read_only`, écriture `write_only`) au lieu d'être chargé et
+        modifié en mémoire ; seuls les valeurs et formats de nombre sont conservés.
+    progression : callable
+        Si fourni, appelé au début de chaque étape avec (libellé de l'étape,
+        avancement entre 0 et 1), par exemple pour afficher une barre de progression.
+    instrumentation : bool | str
+        Si vrai, chaque étape (lecture, calcul, écriture des cellules,
+        enregistrement…) est mesurée pour cette exécution : temps réel, temps
+        CPU, pic mémoire, lignes / cellules lues et écrites (voir le module
+        `instrumentation`). Une chaîne est le chemin du fichier JSON lines à
+        compléter. Les mesures sont aussi actives si la variable
+        d'environnement IPC_INSTRUMENTATION est définie. Un tableau
+        récapitulatif est imprimé à la fin de l'exécution.
+    feuilles : iterable
+        Si fourni, seuls les pipelines dont la feuille principale figure dans
+        la liste sont exécutés ("Grand_Alger", "categories", "national",
+        "core" pour Core / Non-Core). Par défaut : tous.
+    """
+    # Mesures activées pour cette seule exécution (sauf si elles l'étaient déjà)
+    mesures_locales = bool(instrumentation) and not est_active()
+    if mesures_locales:
+        activer(instrumentation if isinstance(instrumentation, str) else None)
+    if est_active():
+        reinitialiser()
+    try:
+        with etape("pipeline_global"):
+            _pipeline_global(Fichier_de_donnees, parallele, max_workers, incremental, flux, progression,
+                             feuilles)
+    finally:
+        if est_active():
+            afficher_resume()
+        if mesures_locales:
+            desactiver()
+
+
+def _pipeline_global(Fichier_de_donnees: str, parallele: bool, max_workers: int,
+                     incremental: bool, flux: bool, progression, feuilles):
+    """Corps de `pipeline_global` (voir sa documentation)."""
+    signaler = progression or (lambda etape, avancement: None)
 
+    # --- 1) Dates de référence
+    signaler("Lecture des données", 0.0)
+    # Le fichier source est analysé une seule fois (toutes les feuilles + catalogue)
+    with etape("lecture_source"):
+        classeur = charger_classeur(Fichier_de_donnees)
+    date_debut = DATE_DEBUT
+
+    # --- 2) Une seule session partagée : un chargement, un enregistrement
+    fichier_calculs = chemin_fichier_calculs(Fichier_de_donnees)
+    cree = not os.path.exists(fichier_calculs)
+    preparer_fichier_calculs(Fichier_de_donnees)
+    empreinte_config = _empreinte_config()
+    with etape("ouverture_session"):
+        session = (SessionFlux if flux else SessionClasseur)(fichier_calculs)
+    with session:
+
+        # --- 3) Mode incrémental : reporter les périodes nouvelles / modifiées
+        periodes = None
+        if incremental:
+            with etape("verification_etat"):
+                raison = _raison_recalcul_complet(Fichier_de_donnees, fichier_calculs, cree,
+                                                  empreinte_config, classeur, feuilles)
+            if raison is not None:
+                print(f"ℹ️ {raison} : recalcul complet")
+            else:
+                signaler("Recherche des périodes modifiées", 0.05)
+                modifiees = set()
+                with etape("synchronisation"):
+                    for feuille in session.noms_feuilles():
+                        modifiees |= session.synchroniser_source(feuille, classeur.feuille_wide(feuille))
+                if not modifiees:
+                    print("✅ Aucune période nouvelle ou modifiée : rien à recalculer.")
+                    signaler("Aucune période à recalculer", 1.0)
+                    return
+                periodes = periodes_a_recalculer(modifiees)
+                # Les pipelines lisent eux-mêmes les 12 mois de recul des variations MoM et YoY
+                date_debut = max(min(modifiees), pd.Period(DATE_DEBUT, freq="M")).strftime("%Y-%m")
+                print(f"➡️ Mise à jour incrémentale : {len(modifiees)} période(s) "
+                      f"nouvelle(s) ou modifiée(s), calculs à partir de {date_debut}")
+
+        # --- 4) Pipelines à exécuter
+        taches = taches_pipelines(classeur, date_debut)
+        if feuilles is not None:
+            taches = restreindre_taches(taches, feuilles)
+
+        # En incrémental, seules les périodes à recalculer sont réécrites
+        ecriture = session.restreindre(periodes) if periodes is not None else nullcontext()
+        with ecriture:
+            if parallele:
+                print(f"➡️ Pipelines en parallèle ({len(taches)} processus)")
+                signaler(f"Pipelines en parallèle ({len(taches)} processus)", 0.1)
+                # Les processus de travail ne sont pas mesurés étape par étape
+                with etape("pipelines_paralleles"):
+                    envois = [(type_pipeline, arguments, {f: session.lire_feuille(f) for f in feuilles},
+                               chemins_config())
+                              for _, type_pipeline, arguments, feuilles in taches]
+                    with ProcessPoolExecutor(max_workers=max_workers or len(taches)) as pool:
+                        journaux = list(pool.map(_executer_pipeline, envois))
+
+                # Un seul écrivain, dans l'ordre de l'exécution séquentielle
+                signaler("Report des résultats", 0.8)
+                with etape("report"):
+                    for journal in journaux:
+                        session.rejouer(journal)
+            else:
+                for i, (libelle, type_pipeline, arguments, _) in enumerate(taches):
+                    print(f"➡️ Pipeline {libelle}")
+                    signaler(f"Pipeline {libelle}", 0.1 + 0.75 * i / len(taches))
+                    with etape(f"pipeline {libelle}"):
+                        executer_tache(Fichier_de_donnees, type_pipeline, arguments, session)
+
+        # Le classeur est enregistré (remplacement atomique) à la sortie de la session
+        signaler("Enregistrement du classeur", 0.9)
+
+    # L'état identifie le classeur enregistré et les colonnes qu'il contient.
+    # Après une exécution partielle (feuilles synchronisées mais pas toutes
+    # recalculées), le prochain passage incrémental refait tout
+    if feuilles is None:
+        ecrites = session.colonnes_ecrites
+        if periodes is not None:
+            for feuille, colonnes in _lire_etat(fichier_calculs).get("entetes", {}).items():
+                ecrites.setdefault(feuille, set()).update(colonnes)
+        _ecrire_etat(fichier_calculs, {"config": empreinte_config,
+                                       "classeur": _signature_classeur(fichier_calculs),
+                                       "entetes": {f: sorted(c) for f, c in sorted(ecrites.items())}})
+    else:
+        _ecrire_etat(fichier_calculs, {})
     print("✅ Tous les pipelines ont été exécutés avec succès.")
+    signaler("Terminé", 1.0)
 
 
-def extraire_inflation_mom(nom_fichier: str, nom_feuille: str, date_ref: str):
-    """
-    Récupère la valeur de l'inflation mensuelle (Inflation (%, mom))
-    à une date donnée (année-mois), ainsi que son évolution par rapport
-    au mois précédent.
+# --- KPI : inflation à une date et évolution, via un index {période: valeur}
 
-    Paramètres
-    ----------
-    nom_fichier : str
-        Chemin du fichier Excel
-    nom_feuille : str
-        Nom de la feuille dans le fichier Excel
-    date_ref : str
-        Date de référence au format 'YYYY-MM-DD' (seuls année et mois sont pris en compte)
-
-    Retour
-    ------
-    tuple (str, str)
-        - taux_actuel : valeur formatée à la date donnée (ex: '0.85%')
-        - evolution : différence vs mois précédent (ex: '+0.23' ou '-0.45')
-    """
+# Écarts de comparaison (en mois) et colonnes par mode
+_MODES_KPI = {"mom": (1, "Inflation (%, mom)"), "yoy": (12, "Inflation (%, yoy)")}
 
-    # Charger les données
-    df = pd.read_excel(nom_fichier, sheet_name=nom_feuille, index_col=0, parse_dates=True)
 
-    col_inflation = "Inflation (%, mom)"
-    if col_inflation not in df.columns:
-        raise ValueError(f"Colonne '{col_inflation}' introuvable dans {nom_feuille}")
+class KPI:
+    """
+    Inflation d'une feuille à une période et son évolution.
+
+    Attributs :
+        feuille (str): nom de la feuille.
+        mode (str): "mom" ou "yoy".
+        periode (pd.Period): période de référence (mois).
+        valeur (float): inflation à `periode` (%).
+        precedent (float): inflation à la période de comparaison (mois précédent / même mois N-1).
+        delta (float): valeur - precedent (points de %).
+    """
 
-    # Extraire année et mois
-    date_ref_dt = pd.to_datetime(date_ref)
-    annee, mois = date_ref_dt.year, date_ref_dt.month
+    __slots__ = ("feuille", "mode", "periode", "valeur", "precedent", "delta")
 
-    # Filtrer la ligne correspondante (mois demandé)
-    mask = (df.index.year == annee) & (df.index.month == mois)
-    if not mask.any():
-        raise ValueError(f"Aucune donnée pour {annee}-{mois:02d} dans {nom_feuille}")
+    def __init__(self, feuille: str, mode: str, periode, valeur: float, precedent: float):
+        self.feuille = feuille
+        self.mode = mode
+        self.periode = periode
+        self.valeur = valeur
+        self.precedent = precedent
+        self.delta = valeur - precedent
 
-    taux_actuel = df.loc[mask, col_inflation].iloc[0]
+    def __repr__(self):
+        return (f"KPI({self.feuille!r}, {self.mode}, {self.periode}, "
+                f"valeur={self.valeur:.2f}, delta={self.delta:+.2f})")
 
-    # Déterminer mois précédent
-    if mois == 1:  # si janvier -> comparer à décembre de l'année précédente
-        annee_prec, mois_prec = annee - 1, 12
-    else:
-        annee_prec, mois_prec = annee, mois - 1
 
-    # Récupérer la valeur du mois précédent
-    mask_prec = (df.index.year == annee_prec) & (df.index.month == mois_prec)
-    if not mask_prec.any():
-        raise ValueError(f"Aucune donnée pour {annee_prec}-{mois_prec:02d} (comparaison)")
+def _index_inflation(classeur: ClasseurCharge, feuille: str, colonne: str) -> dict:
+    """
+    {Period mensuelle: valeur} de `colonne`, construit une seule fois par
+    chargement du classeur et conservé avec lui (première ligne retenue si
+    un mois apparaît deux fois).
+    """
+    cle = ("inflation", feuille, colonne)
+    index = classeur.derivees.get(cle)
+    if index is not None:
+        return index
+
+    df = classeur.feuille_indexee(feuille)
+    if colonne not in df.columns:
+        raise ValueError(f"Colonne '{colonne}' introuvable dans {feuille}")
+    serie = pd.Series(df[colonne].to_numpy(dtype=float), index=pd.DatetimeIndex(df.index).to_period("M"))
+    serie = serie[~serie.index.duplicated()]
+    index = classeur.derivees[cle] = dict(zip(serie.index, serie.tolist()))
+    return index
+
+
+def get_kpis(nom_fichier: str, date_ref, mode: str = "yoy", sheets=("categories",),
+             classeur: ClasseurCharge = None) -> dict:
+    """
+    Inflation de plusieurs feuilles à une date et son évolution, en une seule
+    lecture du classeur et une recherche O(1) par feuille.
+
+    Args:
+        nom_fichier (str): classeur des résultats (`*_et_calculs.xlsx`).
+        date_ref: date de référence (str, date ou Timestamp) ; seuls l'année et le mois comptent.
+        mode (str): "mom" (comparaison au mois précédent) ou "yoy" (même mois N-1).
+        sheets (iterable): feuilles à interroger.
+        classeur (ClasseurCharge): classeur déjà chargé (évite de recalculer l'empreinte).
+
+    Returns:
+        dict: {feuille: KPI}, dans l'ordre de `sheets`. Les valeurs sont des
+        floats non formatés : la mise en forme revient à l'affichage.
+    """
+    mode = mode.lower()
+    if mode not in _MODES_KPI:
+        raise ValueError(f"Mode inconnu : {mode!r} (attendu : 'mom' ou 'yoy')")
+    ecart, colonne = _MODES_KPI[mode]
+    if classeur is None:
+        classeur = charger_classeur(nom_fichier)
+
+    periode = pd.Timestamp(date_ref).to_period("M")
+    periode_prec = periode - ecart
+
+    kpis = {}
+    for feuille in sheets:
+        index = _index_inflation(classeur, feuille, colonne)
+        if periode not in index:
+            raise ValueError(f"Aucune donnée pour {periode.year}-{periode.month:02d} dans {feuille}")
+        if periode_prec not in index:
+            raise ValueError(f"Aucune donnée pour {periode_prec.year}-{periode_prec.month:02d} (comparaison)")
+        kpis[feuille] = KPI(feuille, mode, periode, index[periode], index[periode_prec])
+    return kpis
 
-    taux_precedent = df.loc[mask_prec, col_inflation].iloc[0]
 
-    # Calcul évolution
-    evolution = taux_actuel - taux_precedent
+def extraire_inflation_mom(nom_fichier: str, nom_feuille: str, date_ref: str):
+    """
+    Récupère la valeur de l'inflation mensuelle (Inflation (%, mom))
+    à une date donnée (année-mois), ainsi que son évolution par rapport
+    au mois précédent (voir `get_kpis`).
 
-    # Formatage
-    taux_actuel_fmt = f"{taux_actuel:.2f}%"
-    evolution_fmt = f"{evolution:+.2f}"
+    Retour
+    ------
+    tuple (str, str)
+        - taux_actuel : valeur formatée à la date donnée (ex: '0.85%')
+        - evolution : différence vs mois précédent (ex: '+0.23' ou '-0.45')
+    """
+    kpi = get_kpis(nom_fichier, date_ref, "mom", [nom_feuille])[nom_feuille]
+    return f"{kpi.valeur:.2f}%", f"{kpi.delta:+.2f}"
 
-    return taux_actuel_fmt, evolution_fmt
 
 def extraire_inflation_yoy(nom_fichier: str, nom_feuille: str, date_ref: str):
     """
     Récupère la valeur de l'inflation annuelle (Inflation (%, yoy))
     à une date donnée (année-mois), ainsi que son évolution par rapport
-    au même mois de l'année précédente.
-
-    Paramètres
-    ----------
-    nom_fichier : str
-        Chemin du fichier Excel
-    nom_feuille : str
-        Nom de la feuille dans le fichier Excel
-    date_ref : str
-        Date de référence au format 'YYYY-MM-DD' (seuls année et mois sont pris en compte)
+    au même mois de l'année précédente (voir `get_kpis`).
 
     Retour
     ------
@@ -1224,41 +1752,8 @@ def extraire_inflation_yoy(nom_fichier: str, nom_feuille: str, date_ref: str):
         - taux_actuel : valeur formatée à la date donnée (ex: '7.85%')
         - evolution : différence vs même mois année précédente (ex: '+0.23' ou '-0.45')
     """
-
-    # Charger les données
-    df = pd.read_excel(nom_fichier, sheet_name=nom_feuille, index_col=0, parse_dates=True)
-
-    col_inflation = "Inflation (%, yoy)"
-    if col_inflation not in df.columns:
-        raise ValueError(f"Colonne '{col_inflation}' introuvable dans {nom_feuille}")
-
-    # Conversion de la date de référence
-    date_ref_dt = pd.to_datetime(date_ref)
-    annee, mois = date_ref_dt.year, date_ref_dt.month
-
-    # Filtrer la ligne correspondante (même année-mois)
-    mask = (df.index.year == annee) & (df.index.month == mois)
-    if not mask.any():
-        raise ValueError(f"Aucune donnée pour {annee}-{mois:02d} dans {nom_feuille}")
-
-    taux_actuel = df.loc[mask, col_inflation].iloc[0]
-
-    # Date de comparaison : même mois année précédente
-    annee_prec = annee - 1
-    mask_prec = (df.index.year == annee_prec) & (df.index.month == mois)
-    if not mask_prec.any():
-        raise ValueError(f"Aucune donnée pour {annee_prec}-{mois:02d} (comparaison)")
-
-    taux_precedent = df.loc[mask_prec, col_inflation].iloc[0]
-
-    # Calcul évolution
-    evolution = taux_actuel - taux_precedent
-
-    # Formatage
-    taux_actuel_fmt = f"{taux_actuel:.2f}%"
-    evolution_fmt = f"{evolution:+.2f}"
-
-    return taux_actuel_fmt, evolution_fmt
+    kpi = get_kpis(nom_fichier, date_ref, "yoy", [nom_feuille])[nom_feuille]
+    return f"{kpi.valeur:.2f}%", f"{kpi.delta:+.2f}"
 
 
 
@@ -0,0 +1,194 @@
+"""
+Ligne de commande sans interface (traitements planifiés, cron).
+
+Chaque sous-commande n'importe que ce dont elle a besoin : `compute` et
+`kpis` chargent pandas / openpyxl et la chaîne de calcul, `export-png`
+ajoute Plotly ; Streamlit n'est jamais importé.
+
+Exemples (depuis la racine du dépôt) :
+    python -m src compute src/Fichier_de_donnes.xlsx --incremental
+    python -m src compute src/Fichier_de_donnes.xlsx --feuilles Grand_Alger national
+    python -m src kpis src/Fichier_de_donnes.xlsx --mode mom --date 2025-06
+    python -m src scenarios src/Fichier_de_donnes.xlsx scenarios.json --feuille national
+    python -m src export-png src/Fichier_de_donnes.xlsx --debut 2020-01 --dossier graphes
+    python -m src bench --mois 300 --composantes 8 100
+"""
+import argparse
+import os
+import sys
+import time
+
+FEUILLES_KPI = ("categories", "core", "Produits_agricoles_frais")
+FEUILLE_DATES = "Grand_Alger"  # feuille de référence des bornes de dates (comme front.py)
+
+
+def _verifier_fichier(parser, nom_fichier: str):
+    if not os.path.isfile(nom_fichier):
+        parser.error(f"Fichier introuvable : {nom_fichier}")
+
+
+def _fichier_calculs(nom_fichier: str) -> str:
+    base, ext = os.path.splitext(nom_fichier)
+    return base + "_et_calculs" + ext
+
+
+# --- 1. Sous-commandes
+def compute(args) -> int:
+    from contextlib import nullcontext
+    from configuration import utiliser_config
+    from calculator import pipeline_global
+
+    config = utiliser_config(args.poids, args.categories) if args.poids else nullcontext()
+    with config:
+        pipeline_global(args.fichier, parallele=args.parallele, incremental=args.incremental,
+                        flux=args.flux, instrumentation=args.instrumentation or None,
+                        feuilles=args.feuilles)
+    return 0
+
+
+def kpis(args) -> int:
+    import json
+    from load_data import charger_classeur
+    from calculator import get_kpis
+
+    fichier_calculs = _fichier_calculs(args.fichier)
+    if not os.path.isfile(fichier_calculs):
+        print(f"❌ Classeur de résultats introuvable : {fichier_calculs} (lancer `compute` d'abord)")
+        return 1
+    classeur = charger_classeur(fichier_calculs)
+    date_ref = args.date or classeur.date_max(FEUILLE_DATES)
+    resultats = get_kpis(fichier_calculs, date_ref, args.mode, sheets=args.feuilles, classeur=classeur)
+
+    if args.json:
+        print(json.dumps([{"feuille": k.feuille, "mode": k.mode, "periode": str(k.periode),
+                           "valeur": k.valeur, "precedent": k.precedent, "delta": k.delta}
+                          for k in resultats.values()], ensure_ascii=False, indent=2))
+    else:
+        for k in resultats.values():
+            print(f"{k.feuille:<28} {k.periode}  {k.valeur:>7.2f}%  ({k.delta:+.2f})")
+    return 0
+
+
+def scenarios(args) -> int:
+    import json
+    import pandas as pd
+    from load_data import charger_classeur
+    from calculator import scenarios_poids
+
+    with open(args.scenarios, "r", encoding="utf-8") as f:
+        jeux = json.load(f)
+    if not isinstance(jeux, dict):
+        raise ValueError("Fichier de scénarios : objet {nom: {composante: poids}} attendu")
+    classeur = charger_classeur(args.fichier)
+    resultats = scenarios_poids(args.fichier, jeux, args.feuille, classeur=classeur)
+    periode = resultats["ipc"].index[-1] if args.date is None else pd.Period(args.date, freq="M")
+    if periode not in resultats["ipc"].index:
+        raise ValueError(f"Aucune donnée pour {periode} dans {args.feuille}")
+
+    print(f"{'Scénario':<28} {'IPC':>9} {'MoM (%)':>8} {'YoY (%)':>8}   ({args.feuille}, {periode})")
+    for nom in resultats["ipc"].columns:
+        print(f"{nom:<28} {resultats['ipc_arrondi'].at[periode, nom]:>9.2f} "
+              f"{resultats['inflation_mom'].at[periode, nom]:>8.2f} "
+              f"{resultats['inflation_yoy'].at[periode, nom]:>8.2f}")
+    return 0
+
+
+def export_png(args) -> int:
+    from load_data import charger_classeur
+    from visualizer import GRAPHIQUES, obtenir_figure, exporter_png
+
+    catalogue = charger_classeur(args.fichier).catalogue.get(FEUILLE_DATES)
+    date_debut = args.debut or catalogue["date_min"].strftime("%Y-%m")
+    date_fin = args.fin or catalogue["date_max"].strftime("%Y-%m")
+
+    inconnus = [nom for nom in args.graphiques or () if nom not in GRAPHIQUES]
+    if inconnus:
+        raise ValueError(f"Graphique(s) inconnu(s) : {inconnus} (disponibles : {', '.join(GRAPHIQUES)})")
+
+    echecs = 0
+    for nom in args.graphiques or list(GRAPHIQUES):
+        spec = GRAPHIQUES[nom]
+        fig = obtenir_figure(spec, args.fichier, date_debut, date_fin)
+        if fig is None:
+            echecs += 1
+            continue
+        print(f"🖼️ {exporter_png(spec, fig, args.dossier)}")
+    return 1 if echecs else 0
+
+
+def bench(args) -> int:
+    from benchmark import main as benchmark_main
+
+    benchmark_main(args.arguments)
+    return 0
+
+
+# --- 2. Analyse des arguments
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Calculs IPC sans interface.")
+    parser.add_argument("--chrono", action="store_true", help="afficher la durée totale de la commande")
+    sous = parser.add_subparsers(dest="commande", required=True)
+
+    p = sous.add_parser("compute", help="calculer le classeur de résultats (*_et_calculs.xlsx)")
+    p.add_argument("fichier", help="classeur source (Fichier_de_donnes.xlsx)")
+    p.add_argument("--feuilles", nargs="+", metavar="FEUILLE",
+                   help="pipelines à exécuter, par feuille principale (Grand_Alger, categories, national, core)")
+    p.add_argument("--incremental", action="store_true", help="ne recalculer que les périodes modifiées")
+    p.add_argument("--parallele", action="store_true", help="pipelines dans un pool de processus")
+    p.add_argument("--flux", action="store_true", help="réécrire le classeur en flux (mémoire constante)")
+    p.add_argument("--instrumentation", nargs="?", const=True, default=False, metavar="FICHIER_JSONL",
+                   help="mesurer chaque étape (lignes JSON sur stderr ou dans FICHIER_JSONL)")
+    p.add_argument("--poids", help="weights.json à utiliser (avec --categories)")
+    p.add_argument("--categories", help="categories.json à utiliser (avec --poids)")
+    p.set_defaults(executer=compute)
+
+    p = sous.add_parser("kpis", help="inflation à une date et évolution, par feuille")
+    p.add_argument("fichier", help="classeur source ; les valeurs sont lues dans *_et_calculs.xlsx")
+    p.add_argument("--date", help="période de référence AAAA-MM (défaut : dernière date de Grand_Alger)")
+    p.add_argument("--mode", choices=("mom", "yoy"), default="yoy")
+    p.add_argument("--feuilles", nargs="+", default=list(FEUILLES_KPI), metavar="FEUILLE")
+    p.add_argument("--json", action="store_true", help="sortie JSON")
+    p.set_defaults(executer=kpis)
+
+    p = sous.add_parser("scenarios", help="IPC et inflation sous des poids alternatifs (sans écriture)")
+    p.add_argument("fichier", help="classeur source")
+    p.add_argument("scenarios", help="JSON {nom: {composante: poids}} (composantes absentes : poids de weights.json)")
+    p.add_argument("--feuille", default=FEUILLE_DATES, help="feuille du panier (défaut : Grand_Alger)")
+    p.add_argument("--date", help="période AAAA-MM (défaut : dernière période)")
+    p.set_defaults(executer=scenarios)
+
+    p = sous.add_parser("export-png", help="exporter les graphiques en PNG (Plotly + kaleido)")
+    p.add_argument("fichier", help="classeur source ; les données viennent de *_et_calculs.xlsx")
+    p.add_argument("--graphiques", nargs="+", metavar="NOM",
+                   help="graphiques à exporter (noms des PNG, défaut : tous)")
+    p.add_argument("--debut", help="début de la période AAAA-MM (défaut : première date)")
+    p.add_argument("--fin", help="fin de la période AAAA-MM (défaut : dernière date)")
+    p.add_argument("--dossier", default="graphes", help="dossier des PNG")
+    p.set_defaults(executer=export_png)
+
+    p = sous.add_parser("bench", help="benchmarks sur classeurs synthétiques (voir benchmark.py)")
+    p.add_argument("arguments", nargs=argparse.REMAINDER, help="arguments de benchmark.py")
+    p.set_defaults(executer=bench)
+    return parser
+
+
+def main(arguments=None) -> int:
+    debut = time.perf_counter()
+    parser = _parser()
+    args = parser.parse_args(arguments)
+    if args.commande != "bench":
+        _verifier_fichier(parser, args.fichier)
+    if args.commande == "compute" and bool(args.poids) != bool(args.categories):
+        parser.error("--poids et --categories vont ensemble")
+    try:
+        code = args.executer(args)
+    except ValueError as e:
+        print(f"❌ Erreur: {e}")
+        code = 1
+    if args.chrono:
+        print(f"⏱️ {args.commande} : {time.perf_counter() - debut:.2f} s", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
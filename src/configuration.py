@@ -0,0 +1,305 @@
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+from load_data import extraire_poids
+from moteur_ipc import PoidsCompiles, ArbreAgregation
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHEMIN_POIDS = BASE_DIR / "config" / "weights.json"
+CHEMIN_CATEGORIES = BASE_DIR / "config" / "categories.json"
+
+# Fichiers lus par défaut par `charger_config`
+_chemins_defaut = (CHEMIN_POIDS, CHEMIN_CATEGORIES)
+
+# Fichiers choisis par `utiliser_config`, propres à chaque thread (attribut "chemins")
+_chemins_thread = threading.local()
+
+# Dernière configuration compilée : (chemins, dates de modification) -> ConfigIPC
+_cache_config = {}
+
+# Excel tronque les noms de feuilles à 31 caractères
+LONGUEUR_MAX_FEUILLE = 31
+
+
+def normaliser_nom(nom: str) -> str:
+    """Forme normalisée d'un nom de colonne / catégorie (espaces retirés, minuscules)."""
+    return nom.strip().lower()
+
+
+def extraire_toutes_categories(d):
+    """Extrait récursivement toutes les clés terminales d'un dict JSON hiérarchique."""
+    result = set()
+    if isinstance(d, dict):
+        for k, v in d.items():
+            result.add(k)
+            result |= extraire_toutes_categories(v)
+    elif isinstance(d, list):
+        for v in d:
+            result |= extraire_toutes_categories(v)
+    return result
+
+
+def _est_poids(valeur) -> bool:
+    return (isinstance(valeur, (int, float)) and not isinstance(valeur, bool)
+            and math.isfinite(valeur) and valeur >= 0)
+
+
+def _valider_poids(all_weights) -> list:
+    """Liste des erreurs de structure de weights.json (vide si le fichier est valide)."""
+    if not isinstance(all_weights, dict):
+        return ["la racine doit être un objet {feuille: {colonne: poids}}"]
+    erreurs = []
+    for feuille, poids in all_weights.items():
+        if not isinstance(poids, dict):
+            erreurs.append(f"{feuille} : objet {{colonne: poids}} attendu")
+            continue
+        for col, valeur in poids.items():
+            if isinstance(valeur, dict):
+                if "Poids" in valeur and not _est_poids(valeur["Poids"]):
+                    erreurs.append(f"{feuille}/{col}/Poids : nombre positif attendu ({valeur['Poids']!r})")
+                for sous_col, sous_valeur in valeur.get("Subcategories", {}).items():
+                    if not _est_poids(sous_valeur):
+                        erreurs.append(f"{feuille}/{col}/{sous_col} : nombre positif attendu ({sous_valeur!r})")
+            elif not _est_poids(valeur):
+                erreurs.append(f"{feuille}/{col} : nombre positif attendu ({valeur!r})")
+    return erreurs
+
+
+def _valider_categories(categories) -> list:
+    """Liste des erreurs de structure de categories.json (vide si le fichier est valide)."""
+    if not isinstance(categories, dict):
+        return ["la racine doit être un objet {feuille: {élément: [...]}}"]
+    return [f"{feuille} : objet ou liste attendu"
+            for feuille, elements in categories.items()
+            if not isinstance(elements, (dict, list))]
+
+
+class PanierConfig:
+    """
+    Poids compilés d'une feuille (panier) de weights.json.
+
+    Attributs :
+        feuille (str): nom de la feuille.
+        composantes (tuple): noms des composantes, dans l'ordre de weights.json.
+        vecteur (np.ndarray): poids alignés sur `composantes` (lecture seule).
+        index (Mapping): {composante: position dans `composantes`}.
+        normalises (Mapping): {nom normalisé: composante}.
+        poids (Mapping): {composante: poids}, comme `extraire_poids`.
+    """
+
+    __slots__ = ("feuille", "composantes", "vecteur", "index", "normalises", "poids")
+
+    def __init__(self, feuille: str, poids: dict):
+        self.feuille = feuille
+        self.composantes = tuple(poids)
+        self.vecteur = np.array([float(poids[c]) for c in self.composantes])
+        self.vecteur.flags.writeable = False
+        self.index = MappingProxyType({c: i for i, c in enumerate(self.composantes)})
+        self.normalises = MappingProxyType({normaliser_nom(c): c for c in self.composantes})
+        self.poids = MappingProxyType(dict(poids))
+
+    def compiler(self, colonnes) -> PoidsCompiles:
+        """
+        Vecteur de poids aligné sur `colonnes` (les colonnes sans poids sont
+        ignorées), équivalent de `compiler_poids(self.poids, colonnes)`.
+        """
+        colonnes = [c for c in colonnes if c in self.index]
+        if not colonnes:
+            raise ValueError("Aucune colonne ne correspond aux poids du panier.")
+        return PoidsCompiles(colonnes, self.vecteur[[self.index[c] for c in colonnes]])
+
+
+class ConfigIPC:
+    """
+    Modèle immuable de config/weights.json et config/categories.json, compilé
+    une seule fois par `charger_config`.
+
+    Attributs :
+        paniers (Mapping): {feuille: PanierConfig}.
+        hierarchie (Mapping): {feuille: {élément: tuple des sous-éléments}}, ordre de categories.json.
+        noms_categories (frozenset): tous les noms de categories.json, normalisés.
+        empreinte (tuple): dates de modification des deux fichiers au chargement.
+    """
+
+    __slots__ = ("paniers", "hierarchie", "noms_categories", "empreinte")
+
+    def __init__(self, all_weights: dict, categories: dict, empreinte: tuple):
+        self.paniers = MappingProxyType({
+            feuille: PanierConfig(feuille, extraire_poids(poids))
+            for feuille, poids in all_weights.items()
+        })
+        self.hierarchie = MappingProxyType({
+            feuille: MappingProxyType({
+                elem: tuple(sous)
+                for elem, sous in (elements.items() if isinstance(elements, dict)
+                                   else ((e, ()) for e in elements))
+            })
+            for feuille, elements in categories.items()
+        })
+        self.noms_categories = frozenset(normaliser_nom(c) for c in extraire_toutes_categories(categories))
+        self.empreinte = empreinte
+
+    def poids(self, feuille: str):
+        """{composante: poids} de la feuille (vide si absente de weights.json)."""
+        panier = self.paniers.get(feuille)
+        return panier.poids if panier is not None else MappingProxyType({})
+
+    def panier(self, feuille: str) -> PanierConfig:
+        """Panier compilé de la feuille ; ValueError si elle n'a pas de poids."""
+        panier = self.paniers.get(feuille)
+        if panier is None or not panier.composantes:
+            raise ValueError(f"Aucun poids trouvé pour la feuille {feuille} dans weights.json")
+        return panier
+
+    def elements(self, feuille: str) -> tuple:
+        """Éléments de la feuille dans categories.json (tuple vide si absente)."""
+        return tuple(self.hierarchie.get(feuille, ()))
+
+    def feuille_du_panier(self, panier: str, feuilles) -> str:
+        """
+        Feuille du classeur qui porte les composantes du panier : même nom,
+        ou nom tronqué à 31 caractères par Excel
+        ("Alimentations_Boissons_non_alcoolisées" → "Alimentations_Boissons_non_alco").
+        None si aucune.
+        """
+        for nom in (panier, panier[:LONGUEUR_MAX_FEUILLE]):
+            if nom in feuilles:
+                return nom
+        return None
+
+    def arbre(self, colonnes_par_feuille: dict, racines=None) -> ArbreAgregation:
+        """
+        Arbre d'agrégation de weights.json sur les colonnes d'un classeur.
+
+        Chaque panier est un nœud dont les enfants sont ses composantes ; une
+        composante qui est elle-même un panier (par exemple
+        "Alimentations_Boissons_non_alcoolisées" dans Grand_Alger et national)
+        a pour enfants les composantes de ce panier, lues dans sa propre
+        feuille : sous-groupe → groupe → indice d'ensemble. Une composante
+        présente dans la feuille du panier a cette colonne pour série
+        observée. Comme dans `pipeline_calculs`, les composantes sans colonne
+        (et sans sous-panier) sont ignorées. Les sous-catégories en ligne
+        ("Poids" / "Subcategories") restent aplaties, comme dans `extraire_poids`.
+
+        Args:
+            colonnes_par_feuille (dict): {feuille: colonnes} du classeur.
+            racines (iterable): paniers racines (défaut : tous ceux qui ont une feuille).
+
+        Returns:
+            ArbreAgregation: nœuds nommés "panier/composante/…".
+        """
+        feuilles = set(colonnes_par_feuille)
+        if racines is None:
+            racines = [p for p in self.paniers if self.feuille_du_panier(p, feuilles) is not None]
+
+        noeuds, parents, poids, sources = [], [], [], []
+        a_developper = []  # (index du nœud, panier, paniers déjà sur le chemin)
+        for panier in racines:
+            if self.feuille_du_panier(panier, feuilles) is None:
+                raise ValueError(f"Aucune feuille pour le panier '{panier}'")
+            a_developper.append((len(noeuds), panier, (panier,)))
+            noeuds.append(panier)
+            parents.append(-1)
+            poids.append(np.nan)
+            sources.append(None)
+
+        # Parcours en largeur : les enfants d'un nœud sont numérotés ensemble
+        position = 0
+        while position < len(a_developper):
+            indice, panier, chemin = a_developper[position]
+            position += 1
+            feuille = self.feuille_du_panier(panier, feuilles)
+            colonnes = set(colonnes_par_feuille[feuille])
+            enfants = 0
+            for composante, w in self.panier(panier).poids.items():
+                sous_panier = (composante in self.paniers and composante not in chemin
+                               and self.feuille_du_panier(composante, feuilles) is not None)
+                if composante not in colonnes and not sous_panier:
+                    continue
+                if sous_panier:
+                    a_developper.append((len(noeuds), composante, chemin + (composante,)))
+                noeuds.append(f"{noeuds[indice]}/{composante}")
+                parents.append(indice)
+                poids.append(float(w))
+                sources.append((feuille, composante) if composante in colonnes else None)
+                enfants += 1
+            if not enfants:
+                raise ValueError(f"Aucune correspondance entre les colonnes de '{feuille}' et les poids de '{panier}'")
+        return ArbreAgregation(noeuds, parents, poids, sources)
+
+    def colonnes_elements(self, feuille: str, colonnes) -> list:
+        """
+        Colonnes présentes à la fois dans les poids de la feuille et dans
+        categories.json (comparaison sur les noms normalisés), dans l'ordre de `colonnes`.
+        """
+        panier = self.paniers.get(feuille)
+        if panier is None:
+            return []
+        return [col for col in colonnes
+                if normaliser_nom(col) in panier.normalises and normaliser_nom(col) in self.noms_categories]
+
+
+def chemins_config() -> tuple:
+    """(weights.json, categories.json) lus par défaut par `charger_config` dans ce thread."""
+    return getattr(_chemins_thread, "chemins", _chemins_defaut)
+
+
+@contextmanager
+def utiliser_config(chemin_poids, chemin_categories):
+    """
+    Fait de ces deux fichiers la configuration par défaut le temps du bloc
+    `with` (jeux de données synthétiques, benchmarks), dans le thread
+    courant seulement : un calcul qui tourne dans un autre thread (voir
+    `arriere_plan`) garde sa configuration.
+    """
+    anciens = getattr(_chemins_thread, "chemins", None)
+    _chemins_thread.chemins = (Path(chemin_poids), Path(chemin_categories))
+    try:
+        yield
+    finally:
+        if anciens is None:
+            del _chemins_thread.chemins
+        else:
+            _chemins_thread.chemins = anciens
+
+
+def charger_config(chemin_poids=None, chemin_categories=None) -> ConfigIPC:
+    """
+    Charge, valide et compile weights.json et categories.json
+    (par défaut ceux de `chemins_config()`).
+
+    Le modèle est conservé en mémoire et n'est relu que si la date de
+    modification de l'un des deux fichiers change.
+
+    Raises:
+        FileNotFoundError: si un fichier est absent.
+        ValueError: si un fichier n'a pas la structure attendue.
+    """
+    chemin_poids = chemin_poids or chemins_config()[0]
+    chemin_categories = chemin_categories or chemins_config()[1]
+    empreinte = (os.stat(chemin_poids).st_mtime_ns, os.stat(chemin_categories).st_mtime_ns)
+    cle = (str(chemin_poids), str(chemin_categories))
+    config = _cache_config.get(cle)
+    if config is not None and config.empreinte == empreinte:
+        return config
+
+    with open(chemin_poids, "r", encoding="utf-8") as f:
+        all_weights = json.load(f)
+    with open(chemin_categories, "r", encoding="utf-8") as f:
+        categories = json.load(f)
+
+    erreurs = ([f"weights.json : {e}" for e in _valider_poids(all_weights)]
+               + [f"categories.json : {e}" for e in _valider_categories(categories)])
+    if erreurs:
+        raise ValueError("Configuration invalide :\n" + "\n".join(erreurs))
+
+    config = ConfigIPC(all_weights, categories, empreinte)
+    _cache_config[cle] = config
+    return config
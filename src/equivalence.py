@@ -0,0 +1,350 @@
+"""
+Vérification des moteurs de calcul contre la chaîne historique.
+
+La référence est la chaîne d'origine : pour chaque feuille, les fonctions
+calculer_ipc → calculer_contributions_pp_yoy appelées l'une après l'autre,
+puis pipeline_core_noncore. Chaque moteur candidat est exécuté sur une copie
+du même classeur ; toutes les colonnes qu'il écrit (IPC (%), Inflation (%,
+mom/yoy), Inflation_MoM (%)_*, Contrib_*…) sont relevées cellule par cellule
+et comparées à la référence, avec une tolérance, et les temps d'exécution
+sont affichés côte à côte.
+
+Les vérifications portent sur le classeur livré (Fichier_de_donnes.xlsx,
+jamais modifié : les calculs se font sur des copies) et sur des classeurs
+synthétiques (voir `benchmark.generer_jeu`). La sortie de référence du
+classeur livré peut être enregistrée (JSON) pour servir de point fixe.
+
+Exemples :
+    python src/equivalence.py
+    python src/equivalence.py --moteurs moteur global_flux --synthetiques 600x40
+    python src/equivalence.py --sauver-reference reference.json
+    python src/equivalence.py --reference reference.json --synthetiques
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from openpyxl import load_workbook
+
+import load_data
+from load_data import charger_classeur, SessionMemoire, _periode_cellule
+from configuration import utiliser_config
+from calculator import (
+    calculer_ipc, calculer_inflation_mom, calculer_inflation_yoy,
+    calculer_inflation_elements_mom, calculer_inflation_elements_yoy,
+    calculer_inflation_tronquee_mom, calculer_inflation_tronquee_yoy,
+    calculer_contributions_pp_mom, calculer_contributions_pp_yoy,
+    pipeline_global, preparer_fichier_calculs, taches_pipelines, executer_tache, feuilles_principales,
+)
+from benchmark import generer_jeu
+
+CLASSEUR_LIVRE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Fichier_de_donnes.xlsx")
+TOLERANCE_ABSOLUE = 1e-9
+TOLERANCE_RELATIVE = 0.0
+EXEMPLES_MAX = 5
+
+# Chaîne historique d'une feuille "calculs", dans l'ordre où elle écrivait ses colonnes
+CHAINE_HISTORIQUE = (
+    calculer_ipc,
+    calculer_inflation_elements_mom,
+    calculer_inflation_mom,
+    calculer_inflation_tronquee_mom,
+    calculer_inflation_elements_yoy,
+    calculer_inflation_yoy,
+    calculer_inflation_tronquee_yoy,
+    calculer_contributions_pp_mom,
+    calculer_contributions_pp_yoy,
+)
+
+
+# --- 1. Instantanés : {feuille: {colonne: {"AAAA-MM": valeur}}}
+def _est_vide(valeur) -> bool:
+    return valeur is None or (isinstance(valeur, float) and math.isnan(valeur))
+
+
+def instantane_journal(journal: list) -> dict:
+    """
+    Instantané des colonnes écrites, à partir du journal d'une `SessionMemoire`
+    (les écritures sont appliquées dans l'ordre, comme sur le classeur).
+    """
+    instantane = {}
+    for feuille, nom_colonne, valeurs, ignorer_nan in journal:
+        colonne = instantane.setdefault(feuille, {}).setdefault(nom_colonne, {})
+        for periode, valeur in valeurs.items():
+            cle = str(periode)
+            if _est_vide(valeur):
+                if not ignorer_nan:
+                    colonne.pop(cle, None)
+            else:
+                colonne[cle] = float(valeur)
+    return instantane
+
+
+def instantane_classeur(fichier_calculs: str, fichier_source: str) -> dict:
+    """
+    Instantané des colonnes d'un classeur de résultats absentes du classeur
+    source (les colonnes calculées), relu avec openpyxl.
+    """
+    source = load_workbook(fichier_source, read_only=True)
+    try:
+        entetes_source = {ws.title: set(next(ws.iter_rows(max_row=1, values_only=True), ()))
+                          for ws in source.worksheets}
+    finally:
+        source.close()
+
+    instantane = {}
+    wb = load_workbook(fichier_calculs, read_only=True)
+    try:
+        for ws in wb.worksheets:
+            lignes = ws.iter_rows(values_only=True)
+            entete = next(lignes, ())
+            calculees = [(i, nom) for i, nom in enumerate(entete)
+                         if nom is not None and nom not in entetes_source.get(ws.title, ())]
+            if not calculees:
+                continue
+            colonnes = instantane.setdefault(ws.title, {nom: {} for _, nom in calculees})
+            for ligne in lignes:
+                periode = _periode_cellule(ligne[0] if ligne else None)
+                if periode is None:
+                    continue
+                for i, nom in calculees:
+                    valeur = ligne[i] if i < len(ligne) else None
+                    if not _est_vide(valeur):
+                        colonnes[nom][str(periode)] = float(valeur)
+    finally:
+        wb.close()
+    return instantane
+
+
+def enregistrer_instantane(instantane: dict, chemin: str):
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(instantane, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def charger_instantane(chemin: str) -> dict:
+    with open(chemin, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- 2. Moteurs : fonction(classeur source) -> instantané
+def _executer_en_memoire(classeur_source: str, historique: bool) -> dict:
+    """Tous les pipelines de `pipeline_global`, sur une `SessionMemoire`, sans écriture Excel."""
+    classeur = charger_classeur(classeur_source)
+    taches = taches_pipelines(classeur)
+    feuilles = {f for _, _, _, noms in taches for f in noms}
+    session = SessionMemoire({f: classeur.feuille_wide(f) for f in feuilles})
+    for tache in taches:
+        type_pipeline, arguments = tache[1], tache[2]
+        if type_pipeline == "core_noncore" or not historique:
+            executer_tache(None, type_pipeline, arguments, session)
+            continue
+        # Chaîne historique : une feuille après l'autre, même pour une tâche "regions"
+        for feuille in feuilles_principales(tache):
+            for fonction in CHAINE_HISTORIQUE:
+                fonction(None, feuille, *arguments[1:], session=session)
+    return instantane_journal(session.journal)
+
+
+def moteur_historique(classeur_source: str) -> dict:
+    """Référence : la chaîne calculer_* d'origine, étape par étape."""
+    return _executer_en_memoire(classeur_source, historique=True)
+
+
+def moteur_calculs(classeur_source: str) -> dict:
+    """`pipeline_calculs` / `pipeline_regions` (toutes les séries en une passe, `calculer_tout` / `calculer_panneau`)."""
+    return _executer_en_memoire(classeur_source, historique=False)
+
+
+def _moteur_global(**options):
+    def moteur(classeur_source: str) -> dict:
+        pipeline_global(classeur_source, **options)
+        return instantane_classeur(preparer_fichier_calculs(classeur_source), classeur_source)
+    moteur.__doc__ = f"`pipeline_global` complet ({options or 'séquentiel'}), relu dans le classeur écrit."
+    return moteur
+
+
+MOTEURS = {
+    "historique": moteur_historique,
+    "moteur": moteur_calculs,
+    "global": _moteur_global(),
+    "global_parallele": _moteur_global(parallele=True),
+    "global_flux": _moteur_global(flux=True),
+}
+
+
+# --- 3. Comparaison cellule par cellule
+def comparer_instantanes(reference: dict, candidat: dict, atol: float = TOLERANCE_ABSOLUE,
+                         rtol: float = TOLERANCE_RELATIVE) -> dict:
+    """
+    Compare deux instantanés. Une cellule est égale si
+    |candidat - référence| <= atol + rtol * |référence|.
+
+    Returns:
+        dict: colonnes manquantes / en trop, nombre de cellules comparées,
+        différentes, manquantes et en trop, écart maximal et quelques exemples
+        (feuille, colonne, période, référence, candidat).
+    """
+    rapport = {"colonnes_manquantes": [], "colonnes_en_trop": [], "cellules": 0,
+               "differentes": 0, "manquantes": 0, "en_trop": 0, "ecart_max": 0.0, "exemples": []}
+
+    def exemple(*valeurs):
+        if len(rapport["exemples"]) < EXEMPLES_MAX:
+            rapport["exemples"].append(valeurs)
+
+    for feuille in sorted(set(reference) | set(candidat)):
+        colonnes_ref = reference.get(feuille, {})
+        colonnes_cand = candidat.get(feuille, {})
+        rapport["colonnes_manquantes"] += [(feuille, c) for c in colonnes_ref if c not in colonnes_cand]
+        rapport["colonnes_en_trop"] += [(feuille, c) for c in colonnes_cand if c not in colonnes_ref]
+
+        for nom in colonnes_ref:
+            if nom not in colonnes_cand:
+                continue
+            ref, cand = colonnes_ref[nom], colonnes_cand[nom]
+            for periode, valeur in ref.items():
+                rapport["cellules"] += 1
+                if periode not in cand:
+                    rapport["manquantes"] += 1
+                    exemple(feuille, nom, periode, valeur, None)
+                    continue
+                ecart = abs(cand[periode] - valeur)
+                rapport["ecart_max"] = max(rapport["ecart_max"], ecart)
+                if ecart > atol + rtol * abs(valeur):
+                    rapport["differentes"] += 1
+                    exemple(feuille, nom, periode, valeur, cand[periode])
+            for periode in cand.keys() - ref.keys():
+                rapport["en_trop"] += 1
+                exemple(feuille, nom, periode, None, cand[periode])
+    return rapport
+
+
+def est_equivalent(rapport: dict) -> bool:
+    return not (rapport["colonnes_manquantes"] or rapport["colonnes_en_trop"]
+                or rapport["differentes"] or rapport["manquantes"] or rapport["en_trop"])
+
+
+# --- 4. Exécution d'un cas
+def _copie_fraiche(classeur_source: str, dossier: str) -> str:
+    """Copie du classeur dans un dossier vide (pas de classeur de résultats ni de cache)."""
+    shutil.rmtree(dossier, ignore_errors=True)
+    os.makedirs(dossier)
+    copie = os.path.join(dossier, os.path.basename(classeur_source))
+    shutil.copyfile(classeur_source, copie)
+    return copie
+
+
+def verifier(classeur_source: str, moteurs: list, reference: dict = None, repetitions: int = 1,
+             atol: float = TOLERANCE_ABSOLUE, rtol: float = TOLERANCE_RELATIVE) -> list:
+    """
+    Exécute la référence (si `reference` n'est pas fournie) puis chaque moteur
+    sur une copie fraîche de `classeur_source`, et compare leurs sorties.
+
+    Returns:
+        list: une entrée par moteur {"moteur", "secondes" (meilleur temps),
+        "rapport" (voir `comparer_instantanes`) ; None pour la référence}.
+    """
+    resultats = []
+    with tempfile.TemporaryDirectory(prefix="equivalence_") as dossier:
+        def executer(nom):
+            durees, instantane = [], None
+            for _ in range(repetitions):
+                copie = _copie_fraiche(classeur_source, os.path.join(dossier, nom))
+                load_data._classeurs.clear()
+                debut = time.perf_counter()
+                with open(os.devnull, "w") as muet, redirect_stdout(muet):
+                    instantane = MOTEURS[nom](copie)
+                durees.append(time.perf_counter() - debut)
+            return instantane, min(durees)
+
+        recalculee = reference is None
+        if recalculee:
+            reference, secondes = executer("historique")
+            resultats.append({"moteur": "historique", "secondes": secondes, "rapport": None})
+        for nom in moteurs:
+            if nom == "historique" and recalculee:
+                continue
+            instantane, secondes = executer(nom)
+            resultats.append({"moteur": nom, "secondes": secondes,
+                              "rapport": comparer_instantanes(reference, instantane, atol, rtol)})
+    return resultats
+
+
+def afficher(titre: str, resultats: list):
+    print(f"\n📋 {titre}")
+    temps_ref = next((r["secondes"] for r in resultats if r["rapport"] is None), None)
+    print(f"{'Moteur':<18} {'temps (s)':>10} {'x réf.':>7} {'cellules':>9} {'écart max':>10}  Résultat")
+    for r in resultats:
+        rapport = r["rapport"]
+        ratio = f"{temps_ref / r['secondes']:>7.2f}" if temps_ref else f"{'-':>7}"
+        if rapport is None:
+            print(f"{r['moteur']:<18} {r['secondes']:>10.3f} {ratio} {'-':>9} {'-':>10}  référence")
+            continue
+        verdict = "✅ identique" if est_equivalent(rapport) else (
+            f"❌ {rapport['differentes']} différente(s), {rapport['manquantes']} manquante(s), "
+            f"{rapport['en_trop']} en trop, {len(rapport['colonnes_manquantes'])} colonne(s) manquante(s), "
+            f"{len(rapport['colonnes_en_trop'])} en trop")
+        print(f"{r['moteur']:<18} {r['secondes']:>10.3f} {ratio} {rapport['cellules']:>9} "
+              f"{rapport['ecart_max']:>10.2e}  {verdict}")
+        for colonne in (rapport["colonnes_manquantes"] + rapport["colonnes_en_trop"])[:EXEMPLES_MAX]:
+            print(f"    colonne {colonne}")
+        for feuille, nom, periode, ref, cand in rapport["exemples"]:
+            print(f"    {feuille} / {nom} / {periode} : référence={ref} candidat={cand}")
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Équivalence des moteurs de calcul avec la chaîne historique.")
+    parser.add_argument("--classeur", default=CLASSEUR_LIVRE, help="Classeur réel vérifié (non modifié).")
+    parser.add_argument("--moteurs", nargs="+", choices=sorted(MOTEURS),
+                        default=[m for m in MOTEURS if m != "historique"])
+    parser.add_argument("--synthetiques", nargs="*", default=["300x8", "600x40"], metavar="MOISxCOMPOSANTES",
+                        help="Classeurs synthétiques vérifiés en plus du classeur réel.")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--atol", type=float, default=TOLERANCE_ABSOLUE)
+    parser.add_argument("--rtol", type=float, default=TOLERANCE_RELATIVE)
+    parser.add_argument("--reference", help="Sortie de référence (JSON) du classeur réel, au lieu de la recalculer.")
+    parser.add_argument("--sauver-reference", help="Enregistre la sortie de la chaîne historique du classeur réel.")
+    args = parser.parse_args(arguments)
+
+    cas = []
+    for texte in args.synthetiques:
+        try:
+            mois, composantes = (int(v) for v in texte.lower().split("x"))
+        except ValueError:
+            parser.error(f"Taille synthétique invalide : {texte} (attendu MOISxCOMPOSANTES)")
+        cas.append((mois, composantes))
+
+    if args.sauver_reference:
+        with tempfile.TemporaryDirectory(prefix="equivalence_") as dossier, \
+                open(os.devnull, "w") as muet, redirect_stdout(muet):
+            instantane = moteur_historique(_copie_fraiche(args.classeur, os.path.join(dossier, "ref")))
+        enregistrer_instantane(instantane, args.sauver_reference)
+        print(f"✅ Référence enregistrée : {args.sauver_reference}")
+
+    reference = charger_instantane(args.reference) if args.reference else None
+    tous_identiques = True
+
+    resultats = verifier(args.classeur, args.moteurs, reference, args.repetitions, args.atol, args.rtol)
+    afficher(f"{os.path.basename(args.classeur)}" + (" (référence enregistrée)" if reference else ""), resultats)
+    tous_identiques &= all(r["rapport"] is None or est_equivalent(r["rapport"]) for r in resultats)
+
+    for mois, composantes in cas:
+        with tempfile.TemporaryDirectory(prefix="equivalence_jeu_") as dossier:
+            chemins = generer_jeu(dossier, mois, composantes)
+            with utiliser_config(chemins["poids"], chemins["categories"]):
+                resultats = verifier(chemins["classeur"], args.moteurs, None, args.repetitions,
+                                     args.atol, args.rtol)
+        afficher(f"Synthétique {mois} mois x {composantes} composantes", resultats)
+        tous_identiques &= all(r["rapport"] is None or est_equivalent(r["rapport"]) for r in resultats)
+
+    print("\n✅ Tous les moteurs sont équivalents." if tous_identiques else "\n❌ Des écarts ont été trouvés.")
+    return 0 if tous_identiques else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
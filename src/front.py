@@ -10,11 +10,13 @@ import locale
 
 # ---- Import des fonctions de CALCUL ----
 from calculator import (
-    extraire_inflation_mom,
-    extraire_inflation_yoy,
+    get_kpis,
     get_max_date
 )
 
+# ---- Lecture des feuilles (cache Streamlit, clé = chemin + date de modification) ----
+from cache_donnees import bornes_dates, classeur
+
 # ---- Import des fonctions de VISUALISATION ----
 from visualizer import (
     tracer_inflation_dashboard_yoy,
@@ -102,11 +104,12 @@ with st.sidebar:
     )
 
 
-# ---- Load data from Grand_Alger sheet ----
-df = pd.read_excel(NOM_FICHIER, sheet_name=FEUILLE_GRAND_ALGER)
-df["date"] = pd.to_datetime(df["date"])
-startDate = df["date"].min()
-endDate = df["date"].max()
+# ---- Bornes de dates de la feuille Grand_Alger (cache Streamlit) ----
+bornes = bornes_dates(NOM_FICHIER, FEUILLE_GRAND_ALGER)
+if bornes is None:
+    st.error(f"❌ Aucune date valide dans la feuille '{FEUILLE_GRAND_ALGER}' : vérifier le classeur.")
+    st.stop()
+startDate, endDate = bornes
 
 col1, col2, col3 = st.columns([2, 2, 6])
 with col1:
@@ -114,9 +117,6 @@ with col1:
 with col2:
     type_glissement = st.selectbox("Type de glissement", options=["Annuel", "Mensuel"])
 with col3:
-    # Convert pandas.Timestamp → datetime.date
-    startDate = df["date"].min().date()
-    endDate = df["date"].max().date()
     date_range = st.slider(
         "Période",
         min_value=startDate, max_value=endDate,
@@ -126,11 +126,6 @@ with col3:
     # Convert back to datetime for filtering
     date1, date2 = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
 
-df = df[(df["date"] >= date1) & (df["date"] <= date2)].copy()
-
-# ---- Contributions ----
-df_full = pd.read_excel(NOM_FICHIER, sheet_name=FEUILLE_CATEGORIES)
-
 # ---- Nouvelles variables pour l'analyse ----
 date_debut_str = date1.strftime("%Y-%m")
 date_fin_str = date2.strftime("%Y-%m")
@@ -164,44 +159,21 @@ with col_left:
 
 
     try:
-        if type_glissement == "Annuel":
-            # ⚠️ Annuel → utiliser YOY
-            inflation_now, inflation_prev = extraire_inflation_yoy(
-                NOM_FICHIER2, FEUILLE_CATEGORIES, endDate.strftime("%Y-%m-%d")
-            )
-            core_now, core_prev = extraire_inflation_yoy(
-                NOM_FICHIER2, FEUILLE_CORE, endDate.strftime("%Y-%m-%d")
-            )
-            noncore_now, noncore_prev = extraire_inflation_yoy(
-                NOM_FICHIER2, FEUILLE_NON_CORE, endDate.strftime("%Y-%m-%d")
-            )
-        else:
-            # ⚠️ Mensuel → utiliser MOM
-            inflation_now, inflation_prev = extraire_inflation_mom(
-                NOM_FICHIER2, FEUILLE_CATEGORIES, endDate.strftime("%Y-%m-%d")
-            )
-            core_now, core_prev = extraire_inflation_mom(
-                NOM_FICHIER2, FEUILLE_CORE, endDate.strftime("%Y-%m-%d")
-            )
-            noncore_now, noncore_prev = extraire_inflation_mom(
-                NOM_FICHIER2, FEUILLE_NON_CORE, endDate.strftime("%Y-%m-%d")
-            )
-
-        # Conversion en float
-        inflation_now = float(inflation_now.replace('%', ''))
-        inflation_prev = float(inflation_prev)
-        core_now = float(core_now.replace('%', ''))
-        core_prev = float(core_prev)
-        noncore_now = float(noncore_now.replace('%', ''))
-        noncore_prev = float(noncore_prev)
+        # Annuel → YoY, Mensuel → MoM ; une seule lecture (cache) pour les trois feuilles
+        mode = "yoy" if type_glissement == "Annuel" else "mom"
+        kpis = get_kpis(
+            NOM_FICHIER2, endDate, mode,
+            sheets=[FEUILLE_CATEGORIES, FEUILLE_CORE, FEUILLE_NON_CORE],
+            classeur=classeur(NOM_FICHIER2)
+        )
+        valeurs = [(kpi.valeur, kpi.delta) for kpi in kpis.values()]
 
     except Exception as e:
         st.error(f"Erreur lors du calcul des KPIs: {e}")
-        inflation_now, inflation_prev, core_now, core_prev, noncore_now, noncore_prev = 0, 0, 0, 0, 0, 0
+        valeurs = [(0, 0), (0, 0), (0, 0)]
 
-    st.markdown(kpi_card("Inflation", inflation_now, inflation_now - inflation_prev), unsafe_allow_html=True)
-    st.markdown(kpi_card("Core", core_now, core_now - core_prev), unsafe_allow_html=True)
-    st.markdown(kpi_card("Non Core", noncore_now, noncore_now - noncore_prev), unsafe_allow_html=True)
+    for titre, (valeur, delta) in zip(["Inflation", "Core", "Non Core"], valeurs):
+        st.markdown(kpi_card(titre, valeur, delta), unsafe_allow_html=True)
 
     # Camembert Core vs Non Core
     st.subheader("Répartition Core vs Non Core")
@@ -0,0 +1,259 @@
+"""
+Mesure, étape par étape, de la chaîne de calcul.
+
+Désactivée par défaut. Elle s'active :
+  - par la variable d'environnement IPC_INSTRUMENTATION : "1" écrit les
+    mesures sur la sortie d'erreur, toute autre valeur est le chemin d'un
+    fichier auquel elles sont ajoutées ;
+  - par programme, avec `activer()` / `desactiver()` ou
+    `pipeline_global(..., instrumentation=True)`.
+
+Chaque étape (`with etape("nom"):`) enregistre son temps réel, son temps
+CPU, son pic mémoire (tracemalloc) et les lignes et cellules lues / écrites
+qui lui sont signalées par `compter(...)`. Les étapes s'imbriquent : les
+compteurs d'une étape sont reportés sur l'étape englobante. Chaque mesure
+est émise sous forme d'une ligne JSON, et `afficher_resume()` imprime un
+tableau récapitulatif.
+
+Le pic mémoire n'est mesuré que dans le thread principal : tracemalloc n'a
+qu'un pic pour tout le processus, et chaque étape le remet à zéro, ce qui
+effacerait celui des étapes ouvertes au même moment dans d'autres threads
+(calcul en arrière-plan, pages Streamlit). Ailleurs, il vaut None. Il
+n'est exact que pour une exécution à un seul thread : il inclut aussi les
+allocations des autres threads actifs pendant l'étape.
+
+Désactivée, une étape ne coûte qu'un test de booléen.
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+VARIABLE_ENVIRONNEMENT = "IPC_INSTRUMENTATION"
+COMPTEURS = ("lignes_lues", "cellules_lues", "lignes_ecrites", "cellules_ecrites")
+
+_etat = threading.local()   # pile des étapes ouvertes, propre à chaque thread
+_verrou = threading.Lock()
+_actif = False
+_sortie = None              # None : sortie d'erreur ; sinon chemin du fichier JSON lines
+_tracemalloc_lance = False
+_mesures = []               # toutes les mesures émises depuis `activer()` / `reinitialiser()`
+_ordre = itertools.count()  # rang d'ouverture des étapes (ordre du résumé)
+
+
+class Mesure:
+    """
+    Mesure d'une étape.
+
+    Attributs :
+        nom (str): nom de l'étape.
+        chemin (str): noms des étapes englobantes et de l'étape, séparés par '/'.
+        mur_s / cpu_s (float): temps réel et temps CPU (processus) de l'étape.
+        pic_octets (int): pic mémoire tracemalloc pendant l'étape, au-delà de
+            la mémoire allouée à son début (None hors du thread principal).
+        compteurs (dict): lignes / cellules lues et écrites (voir COMPTEURS).
+    """
+
+    __slots__ = ("nom", "chemin", "mur_s", "cpu_s", "pic_octets", "compteurs", "ordre",
+                 "_debut_mur", "_debut_cpu", "_memoire_debut", "_pic_enfants", "_suivi_memoire")
+
+    def __init__(self, nom: str, chemin: str):
+        self.nom = nom
+        self.chemin = chemin
+        self.mur_s = 0.0
+        self.cpu_s = 0.0
+        self.pic_octets = 0
+        self.compteurs = dict.fromkeys(COMPTEURS, 0)
+        self.ordre = next(_ordre)
+        self._pic_enfants = 0
+
+    def en_json(self) -> dict:
+        return {"etape": self.chemin, "mur_s": round(self.mur_s, 6), "cpu_s": round(self.cpu_s, 6),
+                "pic_octets": self.pic_octets, **self.compteurs}
+
+
+def _pile() -> list:
+    pile = getattr(_etat, "pile", None)
+    if pile is None:
+        pile = _etat.pile = []
+    return pile
+
+
+def est_active() -> bool:
+    return _actif
+
+
+def activer(sortie: str = None):
+    """
+    Active la mesure des étapes.
+
+    Args:
+        sortie (str): fichier auquel ajouter les lignes JSON (None : sortie d'erreur).
+    """
+    global _actif, _sortie, _tracemalloc_lance
+    with _verrou:
+        _sortie = sortie
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_lance = True
+        _actif = True
+
+
+def desactiver():
+    """Désactive la mesure (et arrête tracemalloc s'il a été lancé par `activer`)."""
+    global _actif, _tracemalloc_lance
+    with _verrou:
+        _actif = False
+        if _tracemalloc_lance:
+            tracemalloc.stop()
+            _tracemalloc_lance = False
+
+
+def reinitialiser():
+    """Oublie les mesures déjà enregistrées (début d'une nouvelle exécution)."""
+    with _verrou:
+        _mesures.clear()
+
+
+def mesures() -> list:
+    """Mesures enregistrées, dans l'ordre de fin des étapes."""
+    with _verrou:
+        return list(_mesures)
+
+
+def _emettre(mesure: Mesure):
+    ligne = json.dumps(mesure.en_json(), ensure_ascii=False)
+    with _verrou:
+        _mesures.append(mesure)
+        if _sortie is None:
+            print(ligne, file=sys.stderr)
+        else:
+            with open(_sortie, "a", encoding="utf-8") as f:
+                f.write(ligne + "\n")
+
+
+def _ouvrir(nom: str) -> Mesure:
+    pile = _pile()
+    parent = pile[-1] if pile else None
+    mesure = Mesure(nom, f"{parent.chemin}/{nom}" if parent else nom)
+    # Le pic de tracemalloc est global au processus : seul le thread principal le remet à zéro
+    mesure._suivi_memoire = threading.current_thread() is threading.main_thread()
+    if mesure._suivi_memoire:
+        courante, pic = tracemalloc.get_traced_memory()
+        if parent is not None:
+            # Le pic de l'étape englobante jusqu'ici est conservé avant la remise à zéro
+            parent._pic_enfants = max(parent._pic_enfants, pic - parent._memoire_debut)
+        tracemalloc.reset_peak()
+        mesure._memoire_debut = courante
+    mesure._debut_cpu = time.process_time()
+    mesure._debut_mur = time.perf_counter()
+    pile.append(mesure)
+    return mesure
+
+
+def _fermer(mesure: Mesure):
+    mesure.mur_s = time.perf_counter() - mesure._debut_mur
+    mesure.cpu_s = time.process_time() - mesure._debut_cpu
+    if mesure._suivi_memoire:
+        courante, pic = tracemalloc.get_traced_memory()
+        mesure.pic_octets = max(pic - mesure._memoire_debut, mesure._pic_enfants, 0)
+    else:
+        mesure.pic_octets = None
+    pile = _pile()
+    pile.pop()
+    if pile:
+        parent = pile[-1]
+        if mesure._suivi_memoire:
+            parent._pic_enfants = max(parent._pic_enfants, mesure.pic_octets + mesure._memoire_debut
+                                      - parent._memoire_debut)
+        for cle, valeur in mesure.compteurs.items():
+            parent.compteurs[cle] += valeur
+    _emettre(mesure)
+
+
+class etape:
+    """
+    Bloc mesuré : `with etape("lecture_excel"):`. Sans effet si la mesure
+    n'est pas active.
+    """
+
+    __slots__ = ("nom", "mesure")
+
+    def __init__(self, nom: str):
+        self.nom = nom
+        self.mesure = None
+
+    def __enter__(self):
+        if _actif:
+            self.mesure = _ouvrir(self.nom)
+        return self.mesure
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.mesure is not None:
+            _fermer(self.mesure)
+            self.mesure = None
+        return False
+
+
+def compter(**compteurs):
+    """
+    Ajoute des lignes / cellules lues ou écrites à l'étape en cours, par
+    exemple `compter(cellules_ecrites=n)`. Sans effet hors d'une étape.
+    """
+    if not _actif:
+        return
+    pile = _pile()
+    if pile:
+        for cle, valeur in compteurs.items():
+            pile[-1].compteurs[cle] += int(valeur)
+
+
+def resume(liste: list = None) -> list:
+    """
+    Agrège les mesures par étape (même chemin) : nombre d'appels, totaux de
+    temps et de compteurs, pic mémoire maximal (None si aucune mesure de
+    l'étape n'a de pic, voir le thread principal). Ordre : première ouverture
+    (une étape englobante précède ses sous-étapes).
+    """
+    lignes = {}
+    for mesure in sorted(mesures() if liste is None else liste, key=lambda m: m.ordre):
+        ligne = lignes.get(mesure.chemin)
+        if ligne is None:
+            ligne = lignes[mesure.chemin] = {"etape": mesure.chemin, "appels": 0, "mur_s": 0.0,
+                                             "cpu_s": 0.0, "pic_octets": None,
+                                             **dict.fromkeys(COMPTEURS, 0)}
+        ligne["appels"] += 1
+        ligne["mur_s"] += mesure.mur_s
+        ligne["cpu_s"] += mesure.cpu_s
+        if mesure.pic_octets is not None:
+            ligne["pic_octets"] = max(ligne["pic_octets"] or 0, mesure.pic_octets)
+        for cle in COMPTEURS:
+            ligne[cle] += mesure.compteurs[cle]
+    return list(lignes.values())
+
+
+def afficher_resume(liste: list = None, fichier=None):
+    """Imprime le tableau récapitulatif des étapes (sur la sortie standard par défaut)."""
+    lignes = resume(liste)
+    if not lignes:
+        return
+    largeur = max(len("Étape"), *(len(l["etape"]) for l in lignes))
+    entete = (f"{'Étape':<{largeur}} {'n':>4} {'mur (s)':>9} {'cpu (s)':>9} {'pic (Mo)':>9} "
+              f"{'l. lues':>9} {'c. lues':>10} {'l. écr.':>8} {'c. écr.':>10}")
+    print("⏱️ Mesures par étape", file=fichier)
+    print(entete, file=fichier)
+    print("-" * len(entete), file=fichier)
+    for l in lignes:
+        pic = f"{l['pic_octets'] / 2**20:>9.1f}" if l["pic_octets"] is not None else f"{'-':>9}"
+        print(f"{l['etape']:<{largeur}} {l['appels']:>4} {l['mur_s']:>9.3f} {l['cpu_s']:>9.3f} "
+              f"{pic} {l['lignes_lues']:>9} {l['cellules_lues']:>10} "
+              f"{l['lignes_ecrites']:>8} {l['cellules_ecrites']:>10}", file=fichier)
+
+
+# Activation par variable d'environnement (au chargement du module)
+if os.environ.get(VARIABLE_ENVIRONNEMENT, "").strip() not in ("", "0"):
+    _valeur = os.environ[VARIABLE_ENVIRONNEMENT].strip()
+    activer(None if _valeur == "1" else _valeur)
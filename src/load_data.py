@@ -1,4 +1,279 @@
+import hashlib
+import logging
+import os
+import threading
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+
+from instrumentation import etape, compter
+
+logger = logging.getLogger(__name__)
+
+# Dossier (à côté du classeur) contenant les copies binaires des feuilles lues.
+# Les copies sont des archives NumPy (.npz) relues avec allow_pickle=False :
+# un fichier déposé dans ce dossier ne peut pas exécuter de code, mais il peut
+# fausser les données servies. Le dossier ne doit donc être accessible en
+# écriture qu'à l'utilisateur qui exécute l'application.
+DOSSIER_CACHE = ".cache_feuilles"
+
+# Types de colonnes que les copies .npz conservent à l'identique (sans pickle)
+_TYPES_COPIE = "biufcmM"
+
+# Compteurs de chargements de classeurs servis par le cache (hit) ou par Excel (miss)
+_stats_cache = {"hit": 0, "miss": 0}
+
+# Dernier classeur chargé pour chaque chemin (dans ce processus) : chemin -> ((taille, mtime), classeur)
+_classeurs = {}
+
+# Protège _classeurs et _stats_cache, partagés par les threads Streamlit et le
+# calcul en arrière-plan (la lecture du classeur se fait hors du verrou)
+_verrou = threading.Lock()
+
+
+def empreinte_fichier(nom_fichier: str) -> str:
+    """
+    Empreinte d'un classeur : chemin absolu, taille, date de modification
+    et hash SHA-256 du contenu. Toute modification du fichier change l'empreinte.
+    """
+    infos = os.stat(nom_fichier)
+    contenu = hashlib.sha256()
+    with open(nom_fichier, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            contenu.update(bloc)
+    return hashlib.sha256(
+        f"{os.path.abspath(nom_fichier)}|{infos.st_size}|{infos.st_mtime_ns}|{contenu.hexdigest()}".encode("utf-8")
+    ).hexdigest()
+
+
+def statistiques_cache() -> dict:
+    """Retourne le nombre de chargements servis par le cache ('hit') ou par Excel ('miss')."""
+    with _verrou:
+        return dict(_stats_cache)
+
+
+def _compter_chargement(resultat: str):
+    with _verrou:
+        _stats_cache[resultat] += 1
+
+
+def _decrire_feuille(df: pd.DataFrame) -> dict:
+    """Entrée du catalogue : dates min/max (première colonne), nombre de lignes, colonnes."""
+    date_min = date_max = None
+    if len(df.columns):
+        try:
+            dates = pd.DatetimeIndex(pd.to_datetime(df.iloc[:, 0]))
+            date_min, date_max = dates.min(), dates.max()
+        except (ValueError, TypeError):
+            pass  # première colonne qui n'est pas une date
+    return {
+        "date_min": date_min,
+        "date_max": date_max,
+        "lignes": len(df),
+        "colonnes": list(df.columns),
+    }
+
+
+class ClasseurCharge:
+    """
+    Toutes les feuilles d'un classeur, lues en une seule analyse du fichier.
+
+    Attributs :
+        nom_fichier (str): chemin du classeur.
+        empreinte (str): empreinte du fichier au moment du chargement (None
+            pour les feuilles d'une `SessionClasseur`, lues en mémoire).
+        feuilles (dict): {nom de feuille: DataFrame brut (comme `pd.read_excel`)}.
+        catalogue (dict): {nom de feuille: {"date_min", "date_max", "lignes", "colonnes"}}.
+        derivees (dict): données dérivées des feuilles ({clé: valeur}), construites
+            par les appelants et libérées avec le classeur quand le fichier change.
+    """
+
+    __slots__ = ("nom_fichier", "empreinte", "feuilles", "catalogue", "derivees", "_indexees")
+
+    def __init__(self, nom_fichier: str, empreinte: str, feuilles: dict):
+        self.nom_fichier = nom_fichier
+        self.empreinte = empreinte
+        self.feuilles = feuilles
+        self.catalogue = {nom: _decrire_feuille(df) for nom, df in feuilles.items()}
+        self.derivees = {}
+        self._indexees = {}
+
+    def feuille(self, nom: str) -> pd.DataFrame:
+        """Copie de la feuille `nom` (l'original reste intact pour les autres lecteurs)."""
+        if nom not in self.feuilles:
+            raise ValueError(f"Worksheet named '{nom}' not found")
+        return self.feuilles[nom].copy()
+
+    def feuille_indexee(self, nom: str) -> pd.DataFrame:
+        """
+        Feuille `nom` indexée par date (voir `lire_feuille_indexee`), construite
+        une seule fois par chargement et partagée : à ne pas modifier en place.
+        """
+        df = self._indexees.get(nom)
+        if df is None:
+            df = self.feuille(nom)
+            df = df.set_index(df.columns[0])
+            try:
+                df.index = pd.to_datetime(df.index)
+            except (ValueError, TypeError):
+                pass  # comme read_excel : index laissé tel quel s'il n'est pas une date
+            self._indexees[nom] = df
+        return df
+
+    def feuille_wide(self, nom: str) -> pd.DataFrame:
+        """Feuille `nom` en format wide (voir `lire_feuille_wide`)."""
+        df = self.feuille(nom)
+
+        # Renommer la première colonne en "date" (minuscule pour uniformité)
+        df.rename(columns={df.columns[0]: "date"}, inplace=True)
+
+        # Conversion en datetime (format jour/mois/année)
+        df["date"] = pd.to_datetime(df["date"], format="%d/%m/%Y", errors="coerce")
+
+        # ⚠️ Ne pas mettre en index ici → on garde la colonne 'date'
+        return df
+
+    def date_max(self, nom: str):
+        """Date la plus récente de la feuille `nom` (première colonne)."""
+        if nom not in self.catalogue:
+            raise ValueError(f"Worksheet named '{nom}' not found")
+        return self.catalogue[nom]["date_max"]
+
+
+def _ecrire_copie(feuilles: dict, chemin_cache: str) -> bool:
+    """
+    Écrit les feuilles dans une archive .npz (une entrée par colonne, sans
+    pickle). Retourne False, sans rien écrire, si une feuille a des colonnes
+    que l'archive ne conserverait pas à l'identique (texte, types mixtes).
+    """
+    for df in feuilles.values():
+        if not all(isinstance(c, str) for c in df.columns) or \
+                not all(isinstance(t, np.dtype) and t.kind in _TYPES_COPIE for t in df.dtypes):
+            return False
+    tableaux = {"feuilles": np.array(list(feuilles), dtype=str)}
+    for i, df in enumerate(feuilles.values()):
+        tableaux[f"{i}/colonnes"] = np.array(list(df.columns), dtype=str)
+        for j in range(df.shape[1]):
+            tableaux[f"{i}/{j}"] = df.iloc[:, j].to_numpy()
+    tmp = _chemin_temporaire(chemin_cache)
+    with open(tmp, "wb") as f:
+        np.savez(f, **tableaux)
+    os.replace(tmp, chemin_cache)
+    return True
+
+
+def _lire_copie(chemin_cache: str) -> dict:
+    """Feuilles d'une archive écrite par `_ecrire_copie` (lue avec allow_pickle=False)."""
+    with np.load(chemin_cache, allow_pickle=False) as archive:
+        feuilles = {}
+        for i, nom in enumerate(archive["feuilles"].tolist()):
+            colonnes = archive[f"{i}/colonnes"].tolist()
+            df = pd.DataFrame({j: archive[f"{i}/{j}"] for j in range(len(colonnes))})
+            df.columns = colonnes
+            feuilles[nom] = df
+    return feuilles
+
+
+def _lire_excel(nom_fichier: str) -> dict:
+    """
+    Toutes les feuilles d'un classeur Excel, même s'il est contenu dans un
+    .zip (le premier .xlsx / .xls de l'archive).
+    """
+    if nom_fichier.endswith(".zip"):
+        with zipfile.ZipFile(nom_fichier) as z:
+            for name in z.namelist():
+                if name.endswith((".xlsx", ".xls")):
+                    with z.open(name) as f:
+                        return pd.read_excel(f, sheet_name=None, engine="openpyxl")
+        raise FileNotFoundError("Aucun .xlsx trouvé dans le zip")
+    return pd.read_excel(nom_fichier, sheet_name=None)
+
+
+def charger_classeur(nom_fichier: str) -> ClasseurCharge:
+    """
+    Charge toutes les feuilles d'un classeur en une seule analyse
+    (`pd.read_excel(sheet_name=None)`) et construit leur catalogue. Un
+    classeur livré dans un .zip est lu dans l'archive.
+
+    Le résultat est conservé en mémoire et dans une copie .npz du dossier
+    `.cache_feuilles/` voisin du classeur (voir `DOSSIER_CACHE`), nommée
+    d'après l'empreinte du fichier : tant que le classeur ne change pas, il
+    n'est plus relu depuis Excel ; dès qu'il change, l'empreinte diffère et
+    il est relu. Le contenu n'est haché (`empreinte_fichier`) que si la
+    taille ou la date de modification diffèrent du dernier chargement.
+    """
+    chemin = os.path.abspath(nom_fichier)
+    infos = os.stat(nom_fichier)
+    signature = (infos.st_size, infos.st_mtime_ns)
+    with _verrou:
+        signature_memoire, classeur = _classeurs.get(chemin, (None, None))
+        if classeur is not None and signature_memoire == signature:
+            _stats_cache["hit"] += 1
+            return classeur
+
+    empreinte = empreinte_fichier(nom_fichier)
+    dossier = os.path.join(os.path.dirname(chemin), DOSSIER_CACHE)
+    radical = os.path.splitext(os.path.basename(nom_fichier))[0]
+    prefixe = hashlib.sha256(chemin.encode("utf-8")).hexdigest()[:16]
+    chemin_cache = os.path.join(dossier, f"{radical}.{prefixe}.{empreinte[:16]}.npz")
+
+    feuilles = None
+    if os.path.exists(chemin_cache):
+        try:
+            with etape("lecture_cache"):
+                feuilles = _lire_copie(chemin_cache)
+            _compter_chargement("hit")
+            logger.info("Cache hit : %s", nom_fichier)
+        except Exception as e:
+            logger.warning("Cache illisible, relecture Excel : %s (%s)", chemin_cache, e)
+
+    if feuilles is None:
+        with etape("lecture_excel"):
+            feuilles = _lire_excel(nom_fichier)
+            compter(lignes_lues=sum(len(df) + 1 for df in feuilles.values()),
+                    cellules_lues=sum(df.size + len(df.columns) for df in feuilles.values()))
+        _compter_chargement("miss")
+        logger.info("Cache miss : %s", nom_fichier)
+
+        # Écrire la copie (atomique) et supprimer les copies périmées du même classeur
+        # (y compris les anciennes copies pickle, qui ne sont plus jamais relues)
+        try:
+            os.makedirs(dossier, exist_ok=True)
+            if not _ecrire_copie(feuilles, chemin_cache):
+                logger.info("Colonnes non numériques : pas de copie disque pour %s", nom_fichier)
+            for nom in os.listdir(dossier):
+                if nom.startswith(f"{radical}.{prefixe}.") and nom.endswith((".npz", ".pkl")) \
+                        and os.path.join(dossier, nom) != chemin_cache:
+                    os.remove(os.path.join(dossier, nom))
+        except OSError as e:
+            logger.warning("Impossible d'écrire le cache %s (%s)", chemin_cache, e)
+
+    classeur = ClasseurCharge(nom_fichier, empreinte, feuilles)
+    with _verrou:
+        _classeurs[chemin] = (signature, classeur)
+    return classeur
+
+
+def lire_feuille_brute(nom_fichier: str, feuille: str) -> pd.DataFrame:
+    """
+    Équivalent de `pd.read_excel(nom_fichier, sheet_name=feuille)`, servi par
+    `charger_classeur` (une seule analyse du classeur pour toutes ses feuilles).
+    """
+    return charger_classeur(nom_fichier).feuille(feuille)
+
+
+def lire_feuille_indexee(nom_fichier: str, feuille: str) -> pd.DataFrame:
+    """
+    Équivalent (avec cache) de
+    `pd.read_excel(nom_fichier, sheet_name=feuille, index_col=0, parse_dates=True)`.
+    """
+    return charger_classeur(nom_fichier).feuille_indexee(feuille).copy()
+
 
 def lire_feuille_wide(nom_fichier: str, feuille: str) -> pd.DataFrame:
     """
@@ -11,17 +286,8 @@ def lire_feuille_wide(nom_fichier: str, feuille: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame avec une colonne 'date' et colonnes = catégories.
     """
-    # Charger la feuille
-    df = pd.read_excel(nom_fichier, sheet_name=feuille)
-
-    # Renommer la première colonne en "date" (minuscule pour uniformité)
-    df.rename(columns={df.columns[0]: "date"}, inplace=True)
-
-    # Conversion en datetime (format jour/mois/année)
-    df["date"] = pd.to_datetime(df["date"], format="%d/%m/%Y", errors="coerce")
-
-    # ⚠️ Ne pas mettre en index ici → on garde la colonne 'date'
-    return df
+    # Charger la feuille (servie par le cache si le classeur n'a pas changé)
+    return charger_classeur(nom_fichier).feuille_wide(feuille)
 
 
 def extraire_poids(poids_dict):
@@ -49,3 +315,507 @@ def extraire_poids(poids_dict):
             print(f"⚠️ Format inattendu pour {key}: {value}")
 
     return result
+
+
+def _chemin_temporaire(nom_fichier: str) -> str:
+    """Fichier temporaire propre au processus et au thread, à côté de `nom_fichier`."""
+    return f"{nom_fichier}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _a_ecrire(valeurs: dict, periode, ignorer_nan: bool) -> bool:
+    return periode in valeurs and not (ignorer_nan and pd.isna(valeurs[periode]))
+
+
+def _valeur_cellule(valeur):
+    """Convertit une valeur pandas/NumPy en valeur de cellule (NaN -> cellule vide)."""
+    if pd.isna(valeur):
+        return None
+    if isinstance(valeur, pd.Timestamp):
+        return valeur.to_pydatetime()
+    return valeur.item() if isinstance(valeur, np.generic) else valeur
+
+
+def _periode_cellule(valeur):
+    """Période M d'une cellule de date (None si la cellule n'est pas une date)."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, datetime):
+        return pd.Period(year=valeur.year, month=valeur.month, freq="M")
+    try:
+        periode = pd.to_datetime(valeur, errors="coerce").to_period("M")
+    except Exception:
+        return None
+    return None if pd.isna(periode) else periode
+
+
+def _index_par_periode(periodes) -> dict:
+    """{période: [positions]} à partir d'une liste de périodes (NaT ignorés)."""
+    index = {}
+    for position, periode in enumerate(periodes):
+        if not pd.isna(periode):
+            index.setdefault(periode, []).append(position)
+    return index
+
+
+class SessionClasseur:
+    """
+    Classeur Excel chargé une seule fois pour toute une chaîne de calculs.
+
+    Les feuilles sont lues (format wide, comme `lire_feuille_wide`) à la
+    première demande, à partir du classeur openpyxl déjà chargé : le fichier
+    n'est analysé qu'une fois par session, puis les feuilles sont servies
+    depuis la mémoire. Chaque écriture met à jour à la fois
+    la feuille openpyxl et le DataFrame en mémoire, de sorte que les étapes
+    suivantes voient les colonnes déjà calculées. Le fichier n'est enregistré
+    qu'une seule fois, par `enregistrer()` (ou à la sortie du bloc `with`, s'il
+    a été modifié) ; `fermer(enregistrer=False)` abandonne les écritures.
+    """
+
+    def __init__(self, nom_fichier: str):
+        self.nom_fichier = nom_fichier
+        with etape("ouverture_openpyxl"):
+            self.wb = load_workbook(nom_fichier)
+        self._classeur = None
+        self._feuilles = {}
+        self._periodes = {}
+        self._positions = {}
+        self._lignes = {}
+        self._entetes = {}
+        self._autorisees = None
+        self._modifie = False
+        self.colonnes_ecrites = {}  # {feuille: en-têtes écrits pendant la session}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.fermer(enregistrer=exc_type is None)
+        return False
+
+    def fermer(self, enregistrer: bool = True):
+        """
+        Termine la session : enregistre le classeur s'il a été modifié (et si
+        `enregistrer` est vrai), sinon le ferme sans l'écrire. Les écritures non
+        enregistrées sont abandonnées ; un second appel est sans effet.
+        """
+        if enregistrer and self._modifie:
+            self.enregistrer()
+        elif self.wb is not None:
+            self.wb.close()
+        self.wb = None
+        self._modifie = False
+
+    def _charger_feuilles(self) -> ClasseurCharge:
+        """
+        Toutes les feuilles, lues dans le classeur openpyxl en mémoire (mêmes
+        DataFrames que `pd.read_excel`, sans relire le fichier).
+        """
+        with etape("lecture_feuilles"):
+            feuilles = pd.read_excel(self.wb, sheet_name=None, engine="openpyxl")
+            compter(lignes_lues=sum(len(df) + 1 for df in feuilles.values()),
+                    cellules_lues=sum(df.size + len(df.columns) for df in feuilles.values()))
+        return ClasseurCharge(self.nom_fichier, None, feuilles)
+
+    def _frame(self, feuille: str) -> pd.DataFrame:
+        if feuille not in self._feuilles:
+            # Toutes les feuilles du classeur sont analysées au premier accès
+            if self._classeur is None:
+                self._classeur = self._charger_feuilles()
+            df = self._classeur.feuille_wide(feuille)
+            self._feuilles[feuille] = df
+            # Périodes des lignes du DataFrame, calculées une fois
+            self._periodes[feuille] = df["date"].dt.to_period("M").tolist()
+            self._positions[feuille] = _index_par_periode(self._periodes[feuille])
+        return self._feuilles[feuille]
+
+    def _lignes_periodes(self, feuille: str) -> dict:
+        """
+        Correspondance {période M: [lignes Excel]} de la feuille, construite en
+        lisant la colonne des dates (première colonne) une seule fois.
+        """
+        if feuille not in self._lignes:
+            ws = self.wb[feuille]
+            lignes = {}
+            for row, (cell_date,) in enumerate(
+                    ws.iter_rows(min_row=2, max_row=ws.max_row, max_col=1, values_only=True), start=2):
+                periode = _periode_cellule(cell_date)
+                if periode is not None:
+                    lignes.setdefault(periode, []).append(row)
+            self._lignes[feuille] = lignes
+        return self._lignes[feuille]
+
+    def _colonne(self, feuille: str, nom_colonne: str) -> int:
+        """Index de la colonne `nom_colonne` (ligne d'en-tête), créée à la fin si absente."""
+        if feuille not in self._entetes:
+            self._entetes[feuille] = self._lire_entetes(feuille)
+
+        entetes = self._entetes[feuille]
+        if nom_colonne not in entetes:
+            entetes[nom_colonne] = self._nouvelle_colonne(feuille, nom_colonne)
+        return entetes[nom_colonne]
+
+    def _lire_entetes(self, feuille: str) -> dict:
+        """{en-tête: index de colonne} (première occurrence) de la ligne d'en-tête."""
+        ws = self.wb[feuille]
+        entetes = {}
+        for col in range(1, ws.max_column + 1):
+            entetes.setdefault(ws.cell(row=1, column=col).value, col)
+        return entetes
+
+    def _nouvelle_colonne(self, feuille: str, nom_colonne: str) -> int:
+        """Ajoute l'en-tête `nom_colonne` après la dernière colonne et retourne son index."""
+        ws = self.wb[feuille]
+        col_index = ws.max_column + 1
+        ws.cell(row=1, column=col_index, value=nom_colonne)
+        return col_index
+
+    def _ecrire_cellules(self, feuille: str, col_index: int, cellules: dict):
+        """Écrit {période: valeur} dans la colonne `col_index`, sur chaque ligne de la période."""
+        ws = self.wb[feuille]
+        lignes = self._lignes_periodes(feuille)
+        for periode, valeur in cellules.items():
+            for row in lignes.get(periode, ()):
+                ws.cell(row=row, column=col_index, value=valeur)
+
+    def _ajouter_ligne(self, feuille: str, periode, cellules: dict):
+        """Ajoute une ligne {index de colonne: valeur} en fin de feuille (colonne 1 = date)."""
+        ws = self.wb[feuille]
+        format_date = ws.cell(row=ws.max_row, column=1).number_format
+        row = ws.max_row + 1
+        for col_index, valeur in cellules.items():
+            ws.cell(row=row, column=col_index, value=valeur)
+        ws.cell(row=row, column=1).number_format = format_date
+        self._lignes_periodes(feuille).setdefault(periode, []).append(row)
+
+    def noms_feuilles(self) -> list:
+        """Noms des feuilles du classeur, dans l'ordre."""
+        return self.wb.sheetnames
+
+    def lire_feuille(self, feuille: str) -> pd.DataFrame:
+        """Retourne une copie de la feuille wide (colonne 'date' + catégories)."""
+        return self._frame(feuille).copy()
+
+    @contextmanager
+    def restreindre(self, periodes):
+        """
+        Limite les écritures aux `periodes` (pd.Period M) le temps du bloc `with` :
+        les valeurs calculées pour les autres périodes (historique servant de
+        recul aux variations) sont ignorées.
+        """
+        self._autorisees = set(periodes)
+        try:
+            yield self
+        finally:
+            self._autorisees = None
+
+    def _filtrer(self, valeurs: dict) -> dict:
+        if self._autorisees is None:
+            return valeurs
+        return {p: v for p, v in valeurs.items() if p in self._autorisees}
+
+    def ecrire_colonne(self, feuille: str, nom_colonne: str, valeurs: dict,
+                       ignorer_nan: bool = False):
+        """
+        Écrit {période: valeur} dans la colonne `nom_colonne` de la feuille
+        (créée à la fin si absente) et répercute les valeurs dans le DataFrame.
+
+        Les dates de la feuille ne sont analysées qu'une fois par session :
+        écrire une colonne coûte O(len(valeurs)) affectations de cellules.
+
+        Args:
+            feuille (str): nom de la feuille.
+            nom_colonne (str): en-tête de la colonne cible.
+            valeurs (dict): dictionnaire {pd.Period (M): valeur}.
+            ignorer_nan (bool): ne pas écrire les valeurs manquantes.
+        """
+        self._frame(feuille)  # charger le DataFrame avant toute écriture
+        valeurs = self._filtrer(valeurs)
+        col_index = self._colonne(feuille, nom_colonne)
+        self._modifie = True
+        self.colonnes_ecrites.setdefault(feuille, set()).add(nom_colonne)
+
+        # Écrire les valeurs au bon endroit
+        cellules = {
+            periode: float(valeurs[periode])
+            for periode in valeurs if _a_ecrire(valeurs, periode, ignorer_nan)
+        }
+        self._ecrire_cellules(feuille, col_index, cellules)
+        compter(cellules_ecrites=len(cellules))
+
+        self._maj_frame(feuille, nom_colonne, valeurs, ignorer_nan)
+
+    def _maj_frame(self, feuille: str, nom_colonne: str, valeurs: dict, ignorer_nan: bool):
+        """Répercute une écriture {période: valeur} dans le DataFrame en mémoire."""
+        df = self._frame(feuille)
+        positions_periode = self._positions[feuille]
+        if nom_colonne not in df.columns:
+            df[nom_colonne] = np.nan
+        positions, nouvelles = [], []
+        for periode in valeurs:
+            if _a_ecrire(valeurs, periode, ignorer_nan):
+                for position in positions_periode.get(periode, ()):
+                    positions.append(position)
+                    nouvelles.append(float(valeurs[periode]))
+        if positions:
+            df.loc[df.index.take(positions), nom_colonne] = nouvelles
+
+    def synchroniser_source(self, feuille: str, df_source: pd.DataFrame) -> set:
+        """
+        Reporte dans la feuille les lignes de `df_source` (feuille wide du fichier
+        source) nouvelles ou modifiées depuis la dernière exécution.
+
+        Les valeurs source de la copie de calcul servent de référence : une
+        période est retenue si elle est absente de la copie (ajoutée à la fin)
+        ou si l'une de ses valeurs source diffère (cellules mises à jour).
+
+        Args:
+            feuille (str): nom de la feuille.
+            df_source (pd.DataFrame): feuille wide du fichier source.
+
+        Returns:
+            set: périodes (pd.Period M) ajoutées ou modifiées.
+        """
+        df = self._frame(feuille)
+        colonnes = [c for c in df_source.columns if c != "date"]
+        manquantes = [c for c in colonnes if c not in df.columns]
+        if manquantes:
+            raise ValueError(f"Colonnes source absentes de la copie de calcul ({feuille}) : {manquantes}")
+
+        source = df_source.assign(date=df_source["date"].dt.to_period("M"))
+        source = source.dropna(subset=["date"]).drop_duplicates("date").set_index("date")[colonnes]
+        positions = self._positions[feuille]
+
+        # --- Périodes existantes dont au moins une valeur source a changé
+        existantes = [p for p in source.index if p in positions]
+        actuelles = df.loc[df.index.take([positions[p][0] for p in existantes]), colonnes]
+        actuelles.index = pd.PeriodIndex(existantes, freq="M")
+        nouvelles = source.loc[existantes]
+        differences = ~((nouvelles == actuelles) | (nouvelles.isna() & actuelles.isna()))
+
+        modifiees = set()
+        for periode, ligne_diff in differences.iterrows():
+            for col in ligne_diff.index[ligne_diff.to_numpy(dtype=bool)]:
+                valeur = source.at[periode, col]
+                self._ecrire_cellules(feuille, self._colonne(feuille, col),
+                                      {periode: _valeur_cellule(valeur)})
+                df.loc[df.index.take(positions[periode]), col] = valeur
+                modifiees.add(periode)
+
+        # --- Périodes absentes de la copie : ajoutées en fin de feuille
+        ajouts = [p for p in source.index if p not in positions]
+        if ajouts:
+            dates = df_source.assign(periode=df_source["date"].dt.to_period("M"))
+            dates = dates.dropna(subset=["periode"]).drop_duplicates("periode").set_index("periode")["date"]
+            nouvelles_lignes = []
+            for periode in ajouts:
+                date = dates[periode]
+                cellules = {1: _valeur_cellule(date)}
+                for col in colonnes:
+                    cellules[self._colonne(feuille, col)] = _valeur_cellule(source.at[periode, col])
+                self._ajouter_ligne(feuille, periode, cellules)
+                nouvelles_lignes.append({"date": date, **source.loc[periode].to_dict()})
+                modifiees.add(periode)
+
+            df = pd.concat([df, pd.DataFrame(nouvelles_lignes)], ignore_index=True)
+            self._feuilles[feuille] = df
+            self._periodes[feuille] = self._periodes[feuille] + ajouts
+            self._positions[feuille] = _index_par_periode(self._periodes[feuille])
+
+        self._modifie = self._modifie or bool(modifiees)
+        return modifiees
+
+    def rejouer(self, journal: list):
+        """Applique dans l'ordre des écritures journalisées par une `SessionMemoire`."""
+        for feuille, nom_colonne, valeurs, ignorer_nan in journal:
+            self.ecrire_colonne(feuille, nom_colonne, valeurs, ignorer_nan=ignorer_nan)
+
+    def enregistrer(self):
+        """
+        Enregistre le classeur puis le ferme. L'écriture se fait dans un
+        fichier temporaire voisin, substitué d'un coup (`os.replace`) : un
+        lecteur concurrent voit l'ancien ou le nouveau classeur, jamais un
+        fichier à moitié écrit.
+        """
+        tmp = _chemin_temporaire(self.nom_fichier)
+        with etape("enregistrement"):
+            compter(lignes_ecrites=sum(ws.max_row for ws in self.wb.worksheets))
+            try:
+                self.wb.save(tmp)
+            finally:
+                self.wb.close()
+            os.replace(tmp, self.nom_fichier)
+
+
+class SessionFlux(SessionClasseur):
+    """
+    Session qui n'ouvre jamais le classeur complet avec openpyxl.
+
+    Les feuilles sont lues comme dans `SessionClasseur` ; les écritures sont
+    conservées sous forme {feuille: {colonne: {période: valeur}}}. À
+    l'enregistrement, le classeur d'origine est relu ligne par ligne
+    (openpyxl `read_only`) et réécrit ligne par ligne (openpyxl `write_only`),
+    en substituant les valeurs calculées : la mémoire utilisée par l'écriture
+    ne dépend pas de la taille du classeur.
+
+    Les valeurs, les formules et les formats de nombre des cellules sont
+    conservés ; les autres éléments de mise en forme (largeurs de colonnes,
+    polices, volets figés…) ne le sont pas.
+    """
+
+    def __init__(self, nom_fichier: str):
+        self.nom_fichier = nom_fichier
+        self.wb = None
+        self._classeur = None
+        self._feuilles = {}
+        self._periodes = {}
+        self._positions = {}
+        self._entetes = {}
+        self._autorisees = None
+        self._modifie = False
+        self.colonnes_ecrites = {}
+
+        # En-têtes et largeur de chaque feuille, lus en flux
+        self._noms = []
+        self._largeurs = {}
+        self._entetes_lus = {}
+        with etape("lecture_entetes"):
+            wb = load_workbook(nom_fichier, read_only=True)
+            try:
+                for ws in wb.worksheets:
+                    entete = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+                    self._noms.append(ws.title)
+                    self._largeurs[ws.title] = max(ws.max_column or 0, len(entete))
+                    self._entetes_lus[ws.title] = list(entete)
+            finally:
+                wb.close()
+
+        self._nouveaux_entetes = {}  # {feuille: {index de colonne: en-tête}}
+        self._cellules = {}          # {feuille: {index de colonne: {période: valeur}}}
+        self._ajouts = {}            # {feuille: [(période, {index de colonne: valeur})]}
+
+    def noms_feuilles(self) -> list:
+        return list(self._noms)
+
+    def _charger_feuilles(self) -> ClasseurCharge:
+        # Pas de classeur openpyxl complet en mémoire : analyse (avec cache) du fichier
+        return charger_classeur(self.nom_fichier)
+
+    def _lire_entetes(self, feuille: str) -> dict:
+        entete = self._entetes_lus[feuille]
+        entetes = {}
+        for col in range(1, self._largeurs[feuille] + 1):
+            entetes.setdefault(entete[col - 1] if col <= len(entete) else None, col)
+        return entetes
+
+    def _nouvelle_colonne(self, feuille: str, nom_colonne: str) -> int:
+        self._largeurs[feuille] += 1
+        col_index = self._largeurs[feuille]
+        self._nouveaux_entetes.setdefault(feuille, {})[col_index] = nom_colonne
+        return col_index
+
+    def _ecrire_cellules(self, feuille: str, col_index: int, cellules: dict):
+        self._cellules.setdefault(feuille, {}).setdefault(col_index, {}).update(cellules)
+
+    def _ajouter_ligne(self, feuille: str, periode, cellules: dict):
+        self._ajouts.setdefault(feuille, []).append((periode, dict(cellules)))
+
+    def _lignes_flux(self, ws_source, ws_sortie):
+        """Lignes de la feuille de sortie : lignes d'origine modifiées, puis lignes ajoutées."""
+        feuille = ws_source.title
+        largeur = self._largeurs[feuille]
+        nouveaux_entetes = self._nouveaux_entetes.get(feuille, {})
+        colonnes_ecrites = self._cellules.get(feuille, {})
+        format_date = "General"
+
+        def cellule(valeur, number_format="General"):
+            # Valeur brute sauf si un format de nombre doit être conservé
+            if number_format == "General":
+                return valeur
+            c = WriteOnlyCell(ws_sortie, value=valeur)
+            c.number_format = number_format
+            return c
+
+        for row, cellules_source in enumerate(ws_source.iter_rows(), start=1):
+            ligne = [cellule(c.value, getattr(c, "number_format", None) or "General") for c in cellules_source]
+            ligne.extend(None for _ in range(largeur - len(ligne)))
+
+            if row == 1:
+                for col_index, nom in nouveaux_entetes.items():
+                    ligne[col_index - 1] = cellule(nom)
+            else:
+                periode = _periode_cellule(cellules_source[0].value if cellules_source else None)
+                if periode is not None:
+                    format_date = getattr(cellules_source[0], "number_format", None) or "General"
+                    for col_index, par_periode in colonnes_ecrites.items():
+                        if periode in par_periode:
+                            ancien = cellules_source[col_index - 1] if col_index <= len(cellules_source) else None
+                            ligne[col_index - 1] = cellule(
+                                par_periode[periode],
+                                getattr(ancien, "number_format", None) or "General")
+            yield ligne
+
+        for periode, cellules in self._ajouts.get(feuille, []):
+            ligne = [None] * largeur
+            for col_index, valeur in cellules.items():
+                ligne[col_index - 1] = cellule(valeur, format_date if col_index == 1 else "General")
+            for col_index, par_periode in colonnes_ecrites.items():
+                if periode in par_periode:
+                    ligne[col_index - 1] = cellule(par_periode[periode])
+            yield ligne
+
+    def enregistrer(self):
+        """Réécrit le classeur en flux (lecture `read_only`, écriture `write_only`)."""
+        with etape("enregistrement"):
+            source = load_workbook(self.nom_fichier, read_only=True)
+            sortie = Workbook(write_only=True)
+            lignes = 0
+            try:
+                for ws_source in source.worksheets:
+                    ws_sortie = sortie.create_sheet(ws_source.title)
+                    for ligne in self._lignes_flux(ws_source, ws_sortie):
+                        ws_sortie.append(ligne)
+                        lignes += 1
+                tmp = _chemin_temporaire(self.nom_fichier)
+                sortie.save(tmp)
+            finally:
+                source.close()
+            os.replace(tmp, self.nom_fichier)
+            compter(lignes_lues=lignes - sum(len(a) for a in self._ajouts.values()), lignes_ecrites=lignes)
+
+
+class SessionMemoire(SessionClasseur):
+    """
+    Session sans classeur, pour exécuter un pipeline hors du processus principal.
+
+    Les feuilles sont fournies sous forme de DataFrames wide (tels que retournés
+    par `lire_feuille`). Les écritures mettent à jour ces DataFrames comme le
+    ferait `SessionClasseur` et sont consignées dans `journal`, à rejouer
+    ensuite sur le vrai classeur avec `SessionClasseur.rejouer`.
+    """
+
+    def __init__(self, feuilles: dict):
+        self.nom_fichier = None
+        self.wb = None
+        self._feuilles = {nom: df.copy() for nom, df in feuilles.items()}
+        self._periodes = {nom: df["date"].dt.to_period("M").tolist()
+                          for nom, df in self._feuilles.items()}
+        self._positions = {nom: _index_par_periode(periodes)
+                           for nom, periodes in self._periodes.items()}
+        self._autorisees = None
+        self.colonnes_ecrites = {}
+        self.journal = []
+
+    def _frame(self, feuille: str) -> pd.DataFrame:
+        if feuille not in self._feuilles:
+            raise KeyError(f"Feuille '{feuille}' non fournie à la session mémoire")
+        return self._feuilles[feuille]
+
+    def ecrire_colonne(self, feuille: str, nom_colonne: str, valeurs: dict,
+                       ignorer_nan: bool = False):
+        valeurs = self._filtrer(valeurs)
+        self.colonnes_ecrites.setdefault(feuille, set()).add(nom_colonne)
+        self.journal.append((feuille, nom_colonne, valeurs, ignorer_nan))
+        self._maj_frame(feuille, nom_colonne, valeurs, ignorer_nan)
+
+    def enregistrer(self):
+        pass
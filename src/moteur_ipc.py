@@ -0,0 +1,676 @@
+import numpy as np
+import pandas as pd
+
+
+class PoidsCompiles:
+    """
+    Poids d'un panier alignés sur un ordre de colonnes fixe.
+
+    Attributs :
+        colonnes (tuple): noms des composantes, dans l'ordre du vecteur.
+        vecteur (np.ndarray): poids (float64) alignés sur `colonnes`.
+        total (float): somme des poids (dénominateur de l'indice).
+    """
+
+    __slots__ = ("colonnes", "vecteur", "total")
+
+    def __init__(self, colonnes, vecteur):
+        self.colonnes = tuple(colonnes)
+        self.vecteur = np.ascontiguousarray(vecteur, dtype=float)
+        # Somme séquentielle, comme sum() sur les poids
+        self.total = float(sum(self.vecteur.tolist()))
+
+    def __len__(self):
+        return len(self.colonnes)
+
+
+def compiler_poids(poids_feuille: dict, colonnes) -> PoidsCompiles:
+    """
+    Compile un dictionnaire {colonne: poids} en vecteur aligné sur `colonnes`
+    (les colonnes sans poids sont ignorées).
+    """
+    colonnes = [c for c in colonnes if c in poids_feuille]
+    if not colonnes:
+        raise ValueError("Aucune colonne ne correspond aux poids du panier.")
+    return PoidsCompiles(colonnes, [float(poids_feuille[c]) for c in colonnes])
+
+
+def matrice_prix(df: pd.DataFrame, poids: PoidsCompiles) -> np.ndarray:
+    """Matrice contiguë (périodes × composantes) des indices élémentaires."""
+    return np.ascontiguousarray(df[list(poids.colonnes)].to_numpy(dtype=float))
+
+
+def decaler(x: np.ndarray, k: int, axe: int = 0) -> np.ndarray:
+    """Équivalent de `shift(k)` sur l'axe des périodes (`axe`, les lignes par défaut), NaN en tête."""
+    resultat = np.full(x.shape, np.nan)
+    n = x.shape[axe]
+    if k < n:
+        cible = [slice(None)] * x.ndim
+        source = [slice(None)] * x.ndim
+        cible[axe], source[axe] = slice(k, None), slice(0, n - k)
+        resultat[tuple(cible)] = x[tuple(source)]
+    return resultat
+
+
+def indice_pondere(df: pd.DataFrame, poids: PoidsCompiles) -> pd.Series:
+    """
+    Indice agrégé = moyenne pondérée des composantes, calculée par un seul
+    produit matrice–vecteur.
+    """
+    x = matrice_prix(df, poids)
+    return pd.Series((x @ poids.vecteur) / poids.total, index=df.index)
+
+
+def contributions_pp(df: pd.DataFrame, poids: PoidsCompiles, ipc_precedent: pd.Series,
+                     k: int, prefixe: str) -> pd.DataFrame:
+    """
+    Contributions (en pp) de chaque composante à la variation de l'indice
+    sur `k` mois, en une seule opération de broadcast :
+
+        contrib_i = (x_i,t - x_i,t-k) / IPC_t-k * (w_i / Σw) * 100
+
+    Les colonnes sont nommées f"{prefixe}{composante} (pp)" ; les valeurs
+    infinies ou manquantes valent 0 et sont arrondies à 3 décimales.
+    """
+    x = matrice_prix(df, poids)
+    delta = x - decaler(x, k)
+    parts = poids.vecteur / poids.total
+    contrib = (delta / ipc_precedent.to_numpy(dtype=float)[:, None]) * parts[None, :] * 100
+
+    df_contrib = pd.DataFrame(contrib, index=df.index,
+                              columns=[f"{prefixe}{col} (pp)" for col in poids.colonnes])
+    return df_contrib.replace([np.inf, -np.inf], np.nan).fillna(0.0).round(3)
+
+
+class ResultatsFeuille:
+    """
+    Ensemble des séries dérivées d'une feuille, produites par `calculer_tout`.
+
+    Attributs :
+        ipc (pd.Series): niveau de l'IPC (non arrondi).
+        ipc_arrondi (pd.Series): colonne 'IPC (%)' (arrondie à 2 décimales).
+        inflation_mom / inflation_yoy (pd.Series): 'Inflation (%, mom/yoy)'.
+        elements_mom / elements_yoy (pd.DataFrame): 'Inflation_MoM (%)_*' / 'Inflation_YoY (%)_*'.
+        contrib_mom / contrib_yoy (pd.DataFrame): 'Contrib_MoM_* (pp)' / 'Contrib_YoY_* (pp)'.
+        ipc_info_mom / ipc_info_yoy (pd.DataFrame): IPC_level, IPC_prev1/12, IPC_mom/yoy_pct.
+        tronquees_mom / tronquees_yoy (pd.DataFrame): moyennes tronquées et
+            médiane pondérées (voir `colonnes_tronquees`).
+    """
+
+    __slots__ = ("ipc", "ipc_arrondi", "inflation_mom", "inflation_yoy",
+                 "elements_mom", "elements_yoy", "contrib_mom", "contrib_yoy",
+                 "ipc_info_mom", "ipc_info_yoy", "tronquees_mom", "tronquees_yoy")
+
+    def depuis(self, debut) -> "ResultatsFeuille":
+        """
+        Mêmes séries restreintes aux périodes à partir de `debut` (retire les
+        mois de recul lus seulement pour les variations MoM / YoY).
+        """
+        res = ResultatsFeuille()
+        for nom in self.__slots__:
+            setattr(res, nom, getattr(self, nom).loc[debut:])
+        return res
+
+
+# Part des poids retirée de chaque queue de la distribution des variations
+COUPES_TRONQUEES = (0.05, 0.10, 0.15)
+
+
+def colonnes_tronquees(mode: str, coupes=COUPES_TRONQUEES) -> list:
+    """Colonnes des mesures tronquées ("mom" / "yoy"), dans l'ordre de `mesures_tronquees`."""
+    return ([f"Inflation tronquée {round(c * 100):g}% (%, {mode})" for c in coupes]
+            + [f"Inflation médiane pondérée (%, {mode})"])
+
+
+def mesures_tronquees(taux: np.ndarray, poids: np.ndarray, coupes=COUPES_TRONQUEES) -> np.ndarray:
+    """
+    Moyennes tronquées pondérées et médiane pondérée des variations des
+    composantes, pour toutes les périodes à la fois.
+
+    Les variations de chaque période sont triées une seule fois le long de
+    l'axe des composantes ; les poids cumulés (rapportés au total des
+    composantes observées) bornent la part de chaque composante conservée
+    entre `c` et `1 - c`, pour tous les niveaux de coupe en une opération.
+    Une composante à cheval sur une borne n'est conservée que pour la part
+    de son poids située à l'intérieur. La médiane est la première variation
+    dont le poids cumulé atteint 50 %.
+
+    Args:
+        taux (np.ndarray): variations en % (… × périodes × composantes) ; NaN
+            ou infini pour une composante non observée.
+        poids (np.ndarray): poids des composantes (… × composantes, diffusable).
+        coupes (tuple): part retirée de chaque queue (0.15 : 15 % en bas et 15 % en haut).
+
+    Returns:
+        np.ndarray: … × périodes × (len(coupes) + 1), arrondi à 2 décimales :
+        une moyenne par coupe, puis la médiane (NaN si aucune composante observée).
+    """
+    taux = np.where(np.isfinite(taux), taux, np.nan)
+    poids = np.broadcast_to(np.asarray(poids, dtype=float), taux.shape)
+
+    # --- Un seul tri (les NaN en dernier), poids et parts cumulées dans le même ordre
+    ordre = np.argsort(taux, axis=-1, kind="stable")
+    tri = np.take_along_axis(taux, ordre, axis=-1)
+    w = np.take_along_axis(np.where(np.isnan(taux), 0.0, poids), ordre, axis=-1)
+    total = w.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        haut = np.cumsum(w, axis=-1) / total
+    bas = np.concatenate([np.zeros(haut.shape[:-1] + (1,)), haut[..., :-1]], axis=-1)
+    valeurs = np.where(np.isnan(tri), 0.0, tri)
+
+    # --- Moyennes tronquées : tous les niveaux de coupe diffusés sur le même tri
+    c = np.asarray(coupes, dtype=float).reshape((-1,) + (1,) * taux.ndim)
+    garde = np.clip(np.minimum(haut, 1.0 - c) - np.maximum(bas, c), 0.0, None)
+    moyennes = (garde * valeurs).sum(axis=-1) / (1.0 - 2.0 * c[..., 0])
+
+    # --- Médiane pondérée
+    position = np.argmax(haut >= 0.5, axis=-1)
+    mediane = np.take_along_axis(tri, position[..., None], axis=-1)[..., 0]
+
+    resultat = np.concatenate([np.moveaxis(moyennes, 0, -1), mediane[..., None]], axis=-1)
+    resultat[total[..., 0] <= 0] = np.nan
+    return np.round(resultat, 2)
+
+
+def _taux(x: np.ndarray, precedent: np.ndarray) -> np.ndarray:
+    """Variation en % ((x - précédent) / précédent * 100), infinis → NaN, arrondie à 2 décimales."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taux = ((x - precedent) / precedent) * 100
+    taux[np.isinf(taux)] = np.nan
+    return np.round(taux, 2)
+
+
+def calculer_tout(df: pd.DataFrame, poids: PoidsCompiles, colonnes_elements) -> ResultatsFeuille:
+    """
+    Calcule en une passe toutes les séries dérivées d'une feuille : IPC,
+    inflation globale MoM/YoY, inflation par élément et contributions.
+
+    La matrice des prix et ses décalages à 1 et 12 mois sont construits une
+    seule fois et partagés par tous les calculs. Les résultats sont identiques
+    à ceux de la chaîne calculer_ipc → calculer_contributions_pp_yoy
+    (l'inflation globale est calculée sur l'IPC arrondi, comme dans Excel).
+
+    Args:
+        df (pd.DataFrame): feuille indexée par période, déjà restreinte.
+        poids (PoidsCompiles): poids du panier (colonnes de l'IPC).
+        colonnes_elements (list): colonnes dont on calcule l'inflation par élément.
+
+    Returns:
+        ResultatsFeuille
+    """
+    index = df.index
+    colonnes = list(dict.fromkeys(list(poids.colonnes) + list(colonnes_elements)))
+    position = {col: i for i, col in enumerate(colonnes)}
+    idx_poids = [position[c] for c in poids.colonnes]
+    idx_elements = [position[c] for c in colonnes_elements]
+
+    # --- Matrice des prix et décalages partagés
+    x = np.ascontiguousarray(df[colonnes].to_numpy(dtype=float))
+    x_prev1 = decaler(x, 1)
+    x_prev12 = decaler(x, 12)
+
+    res = ResultatsFeuille()
+
+    # --- IPC (produit matrice–vecteur)
+    ipc = (x[:, idx_poids] @ poids.vecteur) / poids.total
+    res.ipc = pd.Series(ipc, index=index, name="IPC_level")
+    ipc_arrondi = np.round(ipc, 2)
+    res.ipc_arrondi = pd.Series(ipc_arrondi, index=index, name="IPC (%)")
+
+    # --- Inflation globale (sur l'IPC arrondi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.inflation_mom = pd.Series(
+            np.round((ipc_arrondi / decaler(ipc_arrondi, 1) - 1) * 100, 2),
+            index=index, name="Inflation (%, mom)")
+        res.inflation_yoy = pd.Series(
+            np.round((ipc_arrondi / decaler(ipc_arrondi, 12) - 1) * 100, 2),
+            index=index, name="Inflation (%, yoy)")
+
+    # --- Inflation par élément
+    res.elements_mom = pd.DataFrame(
+        _taux(x[:, idx_elements], x_prev1[:, idx_elements]), index=index,
+        columns=[f"Inflation_MoM (%)_{c}" for c in colonnes_elements])
+    res.elements_yoy = pd.DataFrame(
+        _taux(x[:, idx_elements], x_prev12[:, idx_elements]), index=index,
+        columns=[f"Inflation_YoY (%)_{c}" for c in colonnes_elements])
+
+    # --- Contributions (pp)
+    parts = (poids.vecteur / poids.total)[None, :]
+    for k, x_prev, suffixe in ((1, x_prev1, "mom"), (12, x_prev12, "yoy")):
+        ipc_prev = decaler(ipc, k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contrib = ((x[:, idx_poids] - x_prev[:, idx_poids]) / ipc_prev[:, None]) * parts * 100
+            ipc_pct = ((ipc - ipc_prev) / ipc_prev) * 100
+        contrib[~np.isfinite(contrib)] = 0.0
+        prefixe = "Contrib_MoM_" if k == 1 else "Contrib_YoY_"
+        df_contrib = pd.DataFrame(np.round(contrib, 3), index=index,
+                                  columns=[f"{prefixe}{c} (pp)" for c in poids.colonnes])
+        ipc_info = pd.DataFrame({"IPC_level": ipc, f"IPC_prev{k}": ipc_prev,
+                                 f"IPC_{suffixe}_pct": ipc_pct}, index=index)
+        if k == 1:
+            res.contrib_mom, res.ipc_info_mom = df_contrib, ipc_info
+        else:
+            res.contrib_yoy, res.ipc_info_yoy = df_contrib, ipc_info
+
+    # --- Moyennes tronquées et médiane pondérées des variations des composantes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for x_prev, mode in ((x_prev1, "mom"), (x_prev12, "yoy")):
+            taux = (x[:, idx_poids] / x_prev[:, idx_poids] - 1) * 100
+            tronquees = pd.DataFrame(mesures_tronquees(taux, poids.vecteur), index=index,
+                                     columns=colonnes_tronquees(mode))
+            if mode == "mom":
+                res.tronquees_mom = tronquees
+            else:
+                res.tronquees_yoy = tronquees
+
+    return res
+
+
+class PanneauRegional:
+    """
+    Régions de même structure (mêmes périodes, mêmes composantes) rangées
+    dans un seul tableau contigu (région × période × composante).
+
+    Attributs :
+        regions (tuple): noms des régions (feuilles), dans l'ordre du premier axe.
+        periodes (pd.Index): périodes communes (deuxième axe).
+        colonnes (tuple): composantes (troisième axe).
+        x (np.ndarray): indices élémentaires, float64, C-contigu.
+    """
+
+    __slots__ = ("regions", "periodes", "colonnes", "x")
+
+    def __init__(self, regions, periodes, colonnes, x):
+        self.regions = tuple(regions)
+        self.periodes = periodes
+        self.colonnes = tuple(colonnes)
+        self.x = np.ascontiguousarray(x, dtype=float)
+        if self.x.shape != (len(self.regions), len(periodes), len(self.colonnes)):
+            raise ValueError(f"Panneau {self.x.shape} incohérent avec "
+                             f"{len(self.regions)} régions × {len(periodes)} périodes × {len(self.colonnes)} composantes")
+
+    @classmethod
+    def depuis_feuilles(cls, feuilles: dict, colonnes):
+        """
+        Panneau à partir de {région: DataFrame indexé par période}. Les
+        DataFrames doivent avoir exactement les mêmes périodes (ValueError sinon).
+        """
+        regions = list(feuilles)
+        periodes = feuilles[regions[0]].index
+        for region in regions[1:]:
+            if not feuilles[region].index.equals(periodes):
+                raise ValueError(f"Périodes différentes entre '{regions[0]}' et '{region}'")
+        x = np.empty((len(regions), len(periodes), len(colonnes)))
+        for r, region in enumerate(regions):
+            x[r] = feuilles[region][list(colonnes)].to_numpy(dtype=float)
+        return cls(regions, periodes, colonnes, x)
+
+
+class ResultatsPanneau:
+    """
+    Séries dérivées de toutes les régions d'un panneau, produites par
+    `calculer_panneau` : un tableau par série, la région en premier axe.
+
+    Attributs :
+        panneau (PanneauRegional): données d'entrée.
+        colonnes_poids / colonnes_elements (tuple): composantes de l'IPC / des
+            inflations par élément.
+        ipc, ipc_arrondi, inflation_mom, inflation_yoy (np.ndarray): région × période.
+        elements_mom, elements_yoy (np.ndarray): région × période × élément.
+        contrib_mom, contrib_yoy (np.ndarray): région × période × composante.
+        tronquees_mom, tronquees_yoy (np.ndarray): région × période × mesure tronquée.
+        ipc_prev (dict): {1: …, 12: …} IPC décalé (région × période).
+        ipc_pct (dict): {1: …, 12: …} variation de l'IPC non arrondi (région × période).
+    """
+
+    __slots__ = ("panneau", "colonnes_poids", "colonnes_elements", "ipc", "ipc_arrondi",
+                 "inflation_mom", "inflation_yoy", "elements_mom", "elements_yoy",
+                 "contrib_mom", "contrib_yoy", "tronquees_mom", "tronquees_yoy", "ipc_prev", "ipc_pct")
+
+    def region(self, region: str) -> ResultatsFeuille:
+        """
+        Résultats d'une région, au format de `calculer_tout`. Les Series et
+        DataFrames sont des vues sur les tableaux du panneau (aucune copie) :
+        ils ne doivent pas être modifiés en place.
+        """
+        r = self.panneau.regions.index(region)
+        index = self.panneau.periodes
+
+        def serie(valeurs, nom):
+            return pd.Series(valeurs[r], index=index, name=nom, copy=False)
+
+        def tableau(valeurs, colonnes):
+            return pd.DataFrame(valeurs[r], index=index, columns=list(colonnes), copy=False)
+
+        res = ResultatsFeuille()
+        res.ipc = serie(self.ipc, "IPC_level")
+        res.ipc_arrondi = serie(self.ipc_arrondi, "IPC (%)")
+        res.inflation_mom = serie(self.inflation_mom, "Inflation (%, mom)")
+        res.inflation_yoy = serie(self.inflation_yoy, "Inflation (%, yoy)")
+        res.elements_mom = tableau(self.elements_mom, [f"Inflation_MoM (%)_{c}" for c in self.colonnes_elements])
+        res.elements_yoy = tableau(self.elements_yoy, [f"Inflation_YoY (%)_{c}" for c in self.colonnes_elements])
+        res.contrib_mom = tableau(self.contrib_mom, [f"Contrib_MoM_{c} (pp)" for c in self.colonnes_poids])
+        res.contrib_yoy = tableau(self.contrib_yoy, [f"Contrib_YoY_{c} (pp)" for c in self.colonnes_poids])
+        res.ipc_info_mom = pd.DataFrame({"IPC_level": res.ipc, "IPC_prev1": serie(self.ipc_prev[1], None),
+                                         "IPC_mom_pct": serie(self.ipc_pct[1], None)}, copy=False)
+        res.ipc_info_yoy = pd.DataFrame({"IPC_level": res.ipc, "IPC_prev12": serie(self.ipc_prev[12], None),
+                                         "IPC_yoy_pct": serie(self.ipc_pct[12], None)}, copy=False)
+        res.tronquees_mom = tableau(self.tronquees_mom, colonnes_tronquees("mom"))
+        res.tronquees_yoy = tableau(self.tronquees_yoy, colonnes_tronquees("yoy"))
+        return res
+
+
+def calculer_panneau(panneau: PanneauRegional, poids: list, colonnes_elements) -> ResultatsPanneau:
+    """
+    `calculer_tout` pour toutes les régions d'un panneau à la fois : hormis
+    le produit matrice–vecteur de l'IPC, chaque série est calculée par une
+    seule opération sur le tableau (région × période × composante), quel que
+    soit le nombre de régions. Les résultats sont identiques, au bit près, à
+    ceux de `calculer_tout` feuille par feuille.
+
+    Args:
+        panneau (PanneauRegional): indices élémentaires des régions.
+        poids (list): un `PoidsCompiles` par région (mêmes colonnes, dans le
+            même ordre ; les valeurs des poids peuvent différer).
+        colonnes_elements (list): colonnes dont on calcule l'inflation par élément.
+
+    Returns:
+        ResultatsPanneau (voir `ResultatsPanneau.region` pour le format de `calculer_tout`).
+    """
+    if len(poids) != len(panneau.regions):
+        raise ValueError("Un jeu de poids par région est attendu.")
+    colonnes_poids = poids[0].colonnes
+    if any(p.colonnes != colonnes_poids for p in poids):
+        raise ValueError("Les régions d'un panneau doivent avoir les mêmes composantes pondérées.")
+    position = {col: i for i, col in enumerate(panneau.colonnes)}
+    idx_poids = [position[c] for c in colonnes_poids]
+    idx_elements = [position[c] for c in colonnes_elements]
+
+    # --- Tableaux partagés : prix, décalages, poids (région × composante)
+    x = panneau.x
+    x_prev = {1: decaler(x, 1, axe=1), 12: decaler(x, 12, axe=1)}
+    vecteurs = np.stack([p.vecteur for p in poids])
+    totaux = np.array([p.total for p in poids])
+
+    res = ResultatsPanneau()
+    res.panneau = panneau
+    res.colonnes_poids = tuple(colonnes_poids)
+    res.colonnes_elements = tuple(colonnes_elements)
+
+    # --- IPC : le produit matrice–vecteur de `calculer_tout`, région par
+    # région (un produit groupé ne somme pas dans le même ordre : les IPC
+    # différeraient au dernier bit, et leurs arrondis pourraient basculer)
+    ipc = np.empty(x.shape[:2])
+    for r in range(len(poids)):
+        ipc[r] = x[r][:, idx_poids] @ vecteurs[r]
+    ipc /= totaux[:, None]
+    x_poids = x[:, :, idx_poids]
+    res.ipc = ipc
+    res.ipc_arrondi = ipc_arrondi = np.round(ipc, 2)
+
+    # --- Inflation globale (sur l'IPC arrondi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.inflation_mom = np.round((ipc_arrondi / decaler(ipc_arrondi, 1, axe=1) - 1) * 100, 2)
+        res.inflation_yoy = np.round((ipc_arrondi / decaler(ipc_arrondi, 12, axe=1) - 1) * 100, 2)
+
+    # --- Inflation par élément
+    res.elements_mom = _taux(x[:, :, idx_elements], x_prev[1][:, :, idx_elements])
+    res.elements_yoy = _taux(x[:, :, idx_elements], x_prev[12][:, :, idx_elements])
+
+    # --- Contributions (pp)
+    parts = (vecteurs / totaux[:, None])[:, None, :]
+    res.ipc_prev, res.ipc_pct = {}, {}
+    for k in (1, 12):
+        ipc_prev = decaler(ipc, k, axe=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contrib = ((x_poids - x_prev[k][:, :, idx_poids]) / ipc_prev[:, :, None]) * parts * 100
+            res.ipc_pct[k] = ((ipc - ipc_prev) / ipc_prev) * 100
+        contrib[~np.isfinite(contrib)] = 0.0
+        res.ipc_prev[k] = ipc_prev
+        if k == 1:
+            res.contrib_mom = np.round(contrib, 3)
+        else:
+            res.contrib_yoy = np.round(contrib, 3)
+
+    # --- Moyennes tronquées et médiane pondérées (un tri pour toutes les régions)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.tronquees_mom = mesures_tronquees((x_poids / x_prev[1][:, :, idx_poids] - 1) * 100, vecteurs[:, None, :])
+        res.tronquees_yoy = mesures_tronquees((x_poids / x_prev[12][:, :, idx_poids] - 1) * 100, vecteurs[:, None, :])
+    return res
+
+
+class ResultatsScenarios:
+    """
+    IPC et inflation globale d'un panier sous K jeux de poids, produits par
+    `calculer_scenarios` (une colonne par scénario).
+
+    Attributs :
+        colonnes (tuple): composantes, dans l'ordre des colonnes de `poids`.
+        poids (np.ndarray): poids des scénarios (K × composantes).
+        ipc, ipc_arrondi, inflation_mom, inflation_yoy (np.ndarray): période × scénario.
+    """
+
+    __slots__ = ("colonnes", "poids", "ipc", "ipc_arrondi", "inflation_mom", "inflation_yoy")
+
+
+def calculer_scenarios(x: np.ndarray, colonnes, poids) -> ResultatsScenarios:
+    """
+    IPC, inflation MoM et YoY d'un panier pour K jeux de poids à la fois :
+    un seul produit matriciel (périodes × composantes) · (composantes × K),
+    puis les variations sur l'IPC arrondi, comme `calculer_tout`.
+
+    Le produit matriciel ne somme pas dans le même ordre que le produit
+    matrice–vecteur de `calculer_tout` : l'IPC d'un scénario égal aux poids
+    de weights.json peut en différer au dernier bit.
+
+    Args:
+        x (np.ndarray): indices élémentaires (périodes × composantes).
+        colonnes (iterable): composantes, dans l'ordre des colonnes de `x`.
+        poids (array-like): K × composantes, poids positifs de somme non nulle.
+
+    Returns:
+        ResultatsScenarios
+    """
+    poids = np.atleast_2d(np.asarray(poids, dtype=float))
+    colonnes = tuple(colonnes)
+    if poids.ndim != 2 or poids.shape[1] != len(colonnes) or x.shape[1] != len(colonnes):
+        raise ValueError(f"Poids {poids.shape} incompatibles avec {len(colonnes)} composantes "
+                         f"et des prix {x.shape}")
+    if not np.isfinite(poids).all() or (poids < 0).any():
+        raise ValueError("Les poids des scénarios doivent être des nombres positifs.")
+    totaux = poids.sum(axis=1)
+    if (totaux <= 0).any():
+        raise ValueError(f"Scénario(s) de poids nuls : {np.flatnonzero(totaux <= 0).tolist()}")
+
+    res = ResultatsScenarios()
+    res.colonnes = colonnes
+    res.poids = poids
+
+    # --- IPC de tous les scénarios (un produit matriciel). Calculé scénario
+    # × période puis transposé : chaque scénario reste contigu en mémoire (les
+    # DataFrames construits dessus n'ont pas à recopier les valeurs)
+    res.ipc = ipc = ((poids @ np.asarray(x, dtype=float).T) / totaux[:, None]).T
+    res.ipc_arrondi = ipc_arrondi = np.round(ipc, 2)
+
+    # --- Inflation globale (sur l'IPC arrondi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.inflation_mom = np.round((ipc_arrondi / decaler(ipc_arrondi, 1) - 1) * 100, 2)
+        res.inflation_yoy = np.round((ipc_arrondi / decaler(ipc_arrondi, 12) - 1) * 100, 2)
+    return res
+
+
+class ResultatsExclusions:
+    """
+    Indices hors composantes produits par `calculer_exclusions` : une colonne
+    par mesure (chaque composante retirée seule, puis chaque ensemble).
+
+    Attributs :
+        retirees (np.ndarray): part de l'indice retirée par chaque mesure.
+        ipc, ipc_arrondi, inflation_mom, inflation_yoy (np.ndarray): période × mesure.
+    """
+
+    __slots__ = ("retirees", "ipc", "ipc_arrondi", "inflation_mom", "inflation_yoy")
+
+
+def calculer_exclusions(ipc: np.ndarray, x: np.ndarray, parts: np.ndarray, ensembles=None,
+                        sans_chaque: bool = True) -> ResultatsExclusions:
+    """
+    Indices hors composantes, sans recalculer l'indice pour chaque exclusion.
+
+    Une composante de part p et de série x pèse p·x dans l'indice I ;
+    l'indice qui l'exclut est (I - p·x) / (1 - p). Pour un ensemble de
+    composantes, les parts et les termes p·x s'additionnent. Les N
+    exclusions individuelles coûtent donc O(N·T) opérations sur tableaux,
+    et les ensembles un seul produit matriciel.
+
+    Args:
+        ipc (np.ndarray): indice d'ensemble (périodes).
+        x (np.ndarray): séries des composantes (périodes × composantes).
+        parts (np.ndarray): part de chaque composante dans l'indice (somme des
+            parts des composantes directes = 1).
+        ensembles (array-like): M × composantes, 1 pour une composante exclue
+            (None : aucun ensemble).
+        sans_chaque (bool): inclure l'exclusion de chaque composante seule.
+
+    Returns:
+        ResultatsExclusions: N mesures individuelles (si `sans_chaque`) puis
+        M ensembles. Une mesure qui retire tout l'indice vaut NaN.
+    """
+    ipc = np.asarray(ipc, dtype=float)
+    x = np.asarray(x, dtype=float)
+    parts = np.asarray(parts, dtype=float)
+    retire, reste = [], []
+
+    # --- Chaque composante seule : termes p·x, élément par élément
+    if sans_chaque:
+        retire.append(x * parts)
+        reste.append(1.0 - parts)
+
+    # --- Ensembles : un produit matriciel ; une série manquante dans
+    # l'ensemble rend la mesure manquante, les autres sont sans effet
+    if ensembles is not None:
+        ensembles = np.atleast_2d(np.asarray(ensembles, dtype=float))
+        if ensembles.shape[1] != len(parts):
+            raise ValueError(f"Ensembles {ensembles.shape} incompatibles avec {len(parts)} composantes")
+        manquantes = np.isnan(x)
+        termes = np.where(manquantes, 0.0, x) @ (ensembles * parts).T
+        termes[(manquantes.astype(float) @ ensembles.T) > 0] = np.nan
+        retire.append(termes)
+        reste.append(1.0 - ensembles @ parts)
+
+    retire = np.concatenate(retire, axis=1) if retire else np.empty((len(ipc), 0))
+    reste = np.concatenate(reste) if reste else np.empty(0)
+
+    res = ResultatsExclusions()
+    res.retirees = 1.0 - reste
+    with np.errstate(divide="ignore", invalid="ignore"):
+        indices = (ipc[:, None] - retire) / reste
+    indices[:, reste <= 1e-12] = np.nan
+    res.ipc = indices
+    res.ipc_arrondi = arrondi = np.round(indices, 2)
+
+    # --- Inflation (sur l'indice arrondi, comme `calculer_tout`)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.inflation_mom = np.round((arrondi / decaler(arrondi, 1) - 1) * 100, 2)
+        res.inflation_yoy = np.round((arrondi / decaler(arrondi, 12) - 1) * 100, 2)
+    return res
+
+
+class ArbreAgregation:
+    """
+    Arbre d'agrégation compilé : chaque nœud interne est la moyenne pondérée
+    de ses enfants, calculée de bas en haut, un niveau à la fois.
+
+    Les nœuds sont numérotés en largeur d'abord : les enfants d'un même
+    parent sont contigus et rangés dans l'ordre des parents, de sorte qu'un
+    niveau entier s'agrège en une seule opération (`np.add.reduceat`).
+
+    Attributs :
+        noeuds (tuple): chemins des nœuds ("panier/composante/…").
+        parents (np.ndarray): index du parent de chaque nœud (-1 pour une racine).
+        poids (np.ndarray): poids du nœud dans son parent (NaN pour une racine).
+        profondeurs (np.ndarray): profondeur de chaque nœud (0 pour une racine).
+        sources (tuple): (feuille, colonne) de la série observée du nœud, ou None.
+        niveaux (tuple): par profondeur décroissante, (enfants, débuts des
+            groupes, parents, somme des poids) des nœuds internes du niveau.
+    """
+
+    __slots__ = ("noeuds", "parents", "poids", "profondeurs", "sources", "niveaux", "_index")
+
+    def __init__(self, noeuds, parents, poids, sources):
+        self.noeuds = tuple(noeuds)
+        self.parents = np.asarray(parents, dtype=np.intp)
+        self.poids = np.asarray(poids, dtype=float)
+        self.sources = tuple(sources)
+        self._index = {nom: i for i, nom in enumerate(self.noeuds)}
+
+        profondeurs = np.zeros(len(self.noeuds), dtype=np.intp)
+        for i, parent in enumerate(self.parents):
+            if parent >= i:
+                raise ValueError("Les nœuds doivent être numérotés en largeur d'abord (parent avant enfant).")
+            if parent >= 0:
+                profondeurs[i] = profondeurs[parent] + 1
+        self.profondeurs = profondeurs
+
+        niveaux = []
+        for profondeur in range(int(profondeurs.max(initial=0)), 0, -1):
+            enfants = np.flatnonzero(profondeurs == profondeur)
+            parents_enfants = self.parents[enfants]
+            if np.any(np.diff(parents_enfants) < 0):
+                raise ValueError("Les enfants d'un même parent doivent être contigus.")
+            debuts = np.flatnonzero(np.r_[True, parents_enfants[1:] != parents_enfants[:-1]])
+            parents_niveau = parents_enfants[debuts]
+            # Sommes séquentielles, comme `PoidsCompiles.total`
+            totaux = np.array([float(sum(self.poids[enfants[a:b]].tolist()))
+                               for a, b in zip(debuts, np.r_[debuts[1:], len(enfants)])])
+            niveaux.append((enfants, debuts, parents_niveau, totaux))
+        self.niveaux = tuple(niveaux)
+
+    def __len__(self):
+        return len(self.noeuds)
+
+    def index(self, noeud: str) -> int:
+        return self._index[noeud]
+
+    def racines(self) -> list:
+        return [n for n, p in zip(self.noeuds, self.parents) if p < 0]
+
+    def parts(self) -> np.ndarray:
+        """
+        Part de chaque nœud dans l'indice de sa racine : produit, le long du
+        chemin, des poids rapportés à la somme des poids des frères (1 pour
+        une racine).
+        """
+        parts = np.ones(len(self.noeuds))
+        for enfants, debuts, parents, totaux in reversed(self.niveaux):
+            groupe = np.repeat(np.arange(len(debuts)), np.diff(np.r_[debuts, len(enfants)]))
+            parts[enfants] = parts[parents[groupe]] * self.poids[enfants] / totaux[groupe]
+        return parts
+
+    def agreger(self, observees: np.ndarray, priorite_observees: bool = True) -> np.ndarray:
+        """
+        Valeurs de tous les nœuds (périodes × nœuds).
+
+        Args:
+            observees (np.ndarray): séries observées (périodes × nœuds), NaN
+                en colonne pour les nœuds sans source ; les feuilles de
+                l'arbre doivent toutes être observées.
+            priorite_observees (bool): un nœud interne qui a sa propre série
+                observée (par exemple un groupe publié dans la feuille du
+                niveau supérieur) garde cette série, et c'est elle qui entre
+                dans l'agrégat du parent. Sinon, tous les nœuds internes sont
+                recalculés à partir de leurs enfants.
+        """
+        valeurs = np.array(observees, dtype=float, copy=True)
+        if valeurs.ndim != 2 or valeurs.shape[1] != len(self.noeuds):
+            raise ValueError(f"Matrice (périodes × {len(self.noeuds)} nœuds) attendue, reçu {valeurs.shape}")
+        a_source = np.array([s is not None for s in self.sources])
+
+        for enfants, debuts, parents, totaux in self.niveaux:
+            agregats = np.add.reduceat(valeurs[:, enfants] * self.poids[enfants], debuts, axis=1) / totaux
+            if priorite_observees:
+                calcules = ~a_source[parents]
+                valeurs[:, parents[calcules]] = agregats[:, calcules]
+            else:
+                valeurs[:, parents] = agregats
+        return valeurs
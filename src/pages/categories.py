@@ -9,11 +9,13 @@ if not st.session_state.get('authenticated', False):
 
 # ---- Import des nouvelles fonctions ----
 from calculator import (
-    pipeline_global,
     extraire_inflation_mom,
     extraire_inflation_yoy
 )
 
+from cache_donnees import bornes_dates
+from arriere_plan import lancer_calcul, afficher_suivi
+
 from visualizer import (
     tracer_inflation_categories_mom,
     tracer_inflation_categories_yoy,
@@ -84,19 +86,18 @@ NOM_FICHIER = "src/Fichier_de_donnes.xlsx"
 FEUILLE_CATEGORIES = "categories"
 
 # ---- Bouton pour exécuter tous les calculs ----
+# (en arrière-plan : un seul calcul à la fois, les demandes simultanées le rejoignent)
 if st.sidebar.button("🔄 Calculer toutes les données"):
-    with st.spinner("Calcul en cours..."):
-        try:
-            pipeline_global(NOM_FICHIER)
-            st.sidebar.success("✅ Calculs terminés avec succès!")
-        except Exception as e:
-            st.sidebar.error(f"❌ Erreur: {str(e)}")
+    lancer_calcul(NOM_FICHIER)
+with st.sidebar:
+    afficher_suivi(NOM_FICHIER)
 
 # ---- Load data from categories sheet ----
-df = pd.read_excel(NOM_FICHIER, sheet_name=FEUILLE_CATEGORIES)
-df["date"] = pd.to_datetime(df["date"])
-startDate = df["date"].min().date()
-endDate = df["date"].max().date()
+bornes = bornes_dates(NOM_FICHIER, FEUILLE_CATEGORIES)
+if bornes is None:
+    st.error(f"❌ Aucune date valide dans la feuille '{FEUILLE_CATEGORIES}' : vérifier le classeur.")
+    st.stop()
+startDate, endDate = bornes
 
 # ---- Filters ----
 col1, col2 = st.columns([2, 6])  # ⚡ plus que 2 colonnes maintenant
@@ -13,11 +13,13 @@ if not st.session_state.get('authenticated', False):
 
 # ---- Import des nouvelles fonctions ----
 from calculator import (
-    pipeline_global,
     extraire_inflation_mom,
     extraire_inflation_yoy
 )
 
+from cache_donnees import bornes_dates
+from arriere_plan import lancer_calcul, afficher_suivi
+
 from visualizer import (
     tracer_inflation_grand_alger_mom,
     tracer_inflation_grand_alger_yoy,
@@ -26,7 +28,9 @@ from visualizer import (
     tracer_inflation_contributions_grand_alger_mom,
     tracer_inflation_contributions_grand_alger_yoy,
     tracer_inflation_contributions_national_mom,
-    tracer_inflation_contributions_national_yoy
+    tracer_inflation_contributions_national_yoy,
+    tracer_inflation_exclusions,
+    mesures_exclusion_disponibles
 )
 
 # ---- Page config ----
@@ -93,22 +97,21 @@ FEUILLE_GRAND_ALGER = "Grand_Alger"
 FEUILLE_NATIONAL = "national"
 
 # ---- Bouton pour exécuter tous les calculs ----
+# (en arrière-plan : un seul calcul à la fois, les demandes simultanées le rejoignent)
 if st.sidebar.button("🔄 Calculer toutes les données"):
-    with st.spinner("Calcul en cours..."):
-        try:
-            pipeline_global(NOM_FICHIER)
-            st.sidebar.success("✅ Calculs terminés avec succès!")
-        except Exception as e:
-            st.sidebar.error(f"❌ Erreur: {str(e)}")
+    lancer_calcul(NOM_FICHIER)
+with st.sidebar:
+    afficher_suivi(NOM_FICHIER)
 
 # ---- Chargement des données ----
 region = st.selectbox("Portée", options=["Grand Alger", "National"], key="region")
 sheet_name = FEUILLE_GRAND_ALGER if region == "Grand Alger" else FEUILLE_NATIONAL
 
-df = pd.read_excel(NOM_FICHIER, sheet_name=sheet_name)
-df["date"] = pd.to_datetime(df["date"])
-startDate = df["date"].min().date()
-endDate = df["date"].max().date()
+bornes = bornes_dates(NOM_FICHIER, sheet_name)
+if bornes is None:
+    st.error(f"❌ Aucune date valide dans la feuille '{sheet_name}' : vérifier le classeur.")
+    st.stop()
+startDate, endDate = bornes
 
 # ---- Filtres ----
 col1, col2 = st.columns([2, 8])
@@ -160,6 +163,21 @@ with col_right:
         else:
             tracer_inflation_contributions_national_mom(NOM_FICHIER, date1.strftime("%Y-%m"), date2.strftime("%Y-%m"), export_png=False)
 
+# ---- Inflation hors composantes (exclusion de chaque groupe / sous-groupe ou d'un ensemble) ----
+st.subheader("🧮 Inflation hors composantes")
+mesures = st.multiselect(
+    "Mesures",
+    options=mesures_exclusion_disponibles(NOM_FICHIER, sheet_name),
+    default=None,
+    placeholder="IPC et hors chaque groupe",
+    key="mesures_exclusion"
+)
+tracer_inflation_exclusions(
+    NOM_FICHIER, sheet_name, "yoy" if type_glissement == "Annuel" else "mom",
+    date1.strftime("%Y-%m"), date2.strftime("%Y-%m"),
+    mesures=mesures or None, export_png=False
+)
+
 # ---- Navigation vers les autres pages ----
 
 if selected == "Acceuil":
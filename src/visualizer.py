@@ -1,1850 +1,712 @@
-import os , json
+import os
+import sys
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import streamlit as st
 import locale
-import zipfile
+from collections import OrderedDict
 
+from load_data import ClasseurCharge, charger_classeur
+from configuration import charger_config
 
 
-def safe_read_excel(path, **kwargs):
-    """Lit un fichier Excel, même s'il est contenu dans un .zip"""
-    if path.endswith(".zip"):
-        with zipfile.ZipFile(path) as z:
-            # prendre le premier .xlsx trouvé
-            for name in z.namelist():
-                if name.endswith(".xlsx") or name.endswith(".xls"):
-                    with z.open(name) as f:
-                        return pd.read_excel(f, engine="openpyxl", **kwargs)
-        raise FileNotFoundError("Aucun .xlsx trouvé dans le zip")
-    else:
-        return pd.read_excel(path, engine="openpyxl", **kwargs)
+# --- Palettes et habillage communs
+COULEUR_IPC = "#1f77b4"
+PALETTE_PANIER = ("#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                  "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22")
+PALETTE_CATEGORIES = ("#e41a1c", "#377eb8", "#4daf4a")  # palette spéciale 3 couleurs
+LEGENDE = dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center")
+TITRE_AXE_Y = {"mom": "Inflation mensuelle (%)", "yoy": "Inflation annuelle (%)"}
+TITRE_AXE_CONTRIB = "Inflation & Contributions (pp / %)"
 
 
-def tracer_inflation_dashboard_yoy(nom_fichier: str,
-                                   feuille_categories: str,
-                                   feuille_core: str,
-                                   feuille_non_core: str,
-                                   date_debut: str,
-                                   date_fin: str,
-                                   export_png: bool = True):
+class SpecGraphique:
     """
-    Trace un graphique interactif (Plotly) de l'inflation IPC, Core et Non Core.
-    Affiche le résultat dans Streamlit et enregistre une copie PNG si demandé.
+    Description déclarative d'un graphique, rendue par `tracer_graphique`.
+
+    Attributs :
+        nom (str): identifiant du graphique (et nom du PNG exporté).
+        titre (str): titre du graphique.
+        feuilles (tuple): feuilles lues ; les traces y font référence par position.
+        traces (tuple): traces fixes, dicts {feuille, colonne, type ("ligne"/"barre"),
+            nom, couleur, largeur, tirets, survol}.
+        elements (dict | None): une trace par élément de categories.json pour
+            feuilles[0] : {colonne (motif avec {}), type, palette}.
+        axe_y (dict): habillage de l'axe Y.
+        hauteur (int): hauteur en pixels (affichage et PNG).
+        plage_commune (bool): axe Y borné aux min/max des traces fixes (+10 %).
+        cible (float | None): ligne horizontale de cible d'inflation.
+        locale_fr (bool): active la locale française pour les libellés de mois.
+        message_colonne (str): message d'erreur d'une colonne absente ({col}).
     """
 
-    # --- 1. Construire le chemin du fichier enrichi
-    base, _ = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs.xlsx"
-
-    # --- 2. Lire les résultats calculés
-    df_global = safe_read_excel(fichier_calculs, sheet_name=feuille_categories,
-                                index_col=0, parse_dates=True)
-    df_core = safe_read_excel(fichier_calculs, sheet_name=feuille_core,
-                              index_col=0, parse_dates=True)
-    df_noncore = safe_read_excel(fichier_calculs, sheet_name=feuille_non_core,
-                                 index_col=0, parse_dates=True)
-
-    # --- 3. Trouver la colonne "Inflation (%, yoy)"
-    def trouver_colonne_yoy(cols):
-        cible = "Inflation (%, yoy)"
-        for col in cols:
-            if col.strip() == cible:
-                return col
-        return None
-
-    col_global = trouver_colonne_yoy(df_global.columns)
-    col_core = trouver_colonne_yoy(df_core.columns)
-    col_noncore = trouver_colonne_yoy(df_noncore.columns)
-
-    if not col_global or not col_core or not col_noncore:
-        st.error("Impossible de trouver la colonne exacte 'Inflation (%, yoy)' dans l’un des fichiers Excel.")
-        return None
-
-    # --- 4. Gérer les bornes de dates
-    first_valid_date = max(
-        df_global.first_valid_index(),
-        df_core.first_valid_index(),
-        df_noncore.first_valid_index(),
+    __slots__ = ("nom", "titre", "feuilles", "traces", "elements", "axe_y", "hauteur",
+                 "plage_commune", "cible", "locale_fr", "message_colonne")
+
+    def __init__(self, nom, titre, feuilles, traces, elements=None, axe_y=None, hauteur=700,
+                 plage_commune=False, cible=None, locale_fr=False,
+                 message_colonne="❌ Colonne manquante dans Excel : {col}"):
+        self.nom = nom
+        self.titre = titre
+        self.feuilles = tuple(feuilles)
+        self.traces = tuple(traces)
+        self.elements = elements
+        self.axe_y = dict(axe_y or {})
+        self.hauteur = hauteur
+        self.plage_commune = plage_commune
+        self.cible = cible
+        self.locale_fr = locale_fr
+        self.message_colonne = message_colonne
+
+
+def _trace(colonne, nom, survol, type="ligne", couleur=COULEUR_IPC, largeur=2.5, tirets=None, feuille=0):
+    return dict(feuille=feuille, colonne=colonne, type=type, nom=nom,
+                couleur=couleur, largeur=largeur, tirets=tirets, survol=survol)
+
+
+def _spec_dashboard(mode: str) -> SpecGraphique:
+    """IPC, Core et Non Core (trois feuilles) en lignes."""
+    colonne = f"Inflation (%, {mode})"
+    suffixe = " (MoM)" if mode == "mom" else ""
+    survol = " MoM" if mode == "mom" else ""
+    return SpecGraphique(
+        nom=f"inflation_core_noncore_{mode}",
+        titre=f"Inflation IPC, core et non_core (%) - {'MoM' if mode == 'mom' else 'YoY'}",
+        feuilles=("categories", "core", "Produits_agricoles_frais"),
+        traces=(
+            _trace(colonne, f"Inflation IPC{suffixe}", f"Date: %{{text}}<br>IPC{survol}: %{{y:.2f}}%"),
+            _trace(colonne, f"Inflation Core{suffixe}", f"Date: %{{text}}<br>Core{survol}: %{{y:.2f}}%",
+                   couleur="#ff7f0e", largeur=2.0, tirets="dash", feuille=1),
+            _trace(colonne, f"Inflation Non Core{suffixe}", f"Date: %{{text}}<br>Non Core{survol}: %{{y:.2f}}%",
+                   couleur="#2ca02c", largeur=2.0, tirets="dot", feuille=2),
+        ),
+        axe_y=dict(title=TITRE_AXE_Y[mode], ticksuffix=" %"),
+        hauteur=600,
+        cible=4 if mode == "yoy" else None,
+        message_colonne=f"Impossible de trouver la colonne exacte '{colonne}' dans l’un des fichiers Excel.",
     )
 
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
 
-    real_start = max(first_valid_date, date_debut_dt)
-
-    df_global = df_global.loc[real_start:date_fin_dt]
-    df_core = df_core.loc[real_start:date_fin_dt]
-    df_noncore = df_noncore.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X avec labels en FR
-
-
-    x = df_global.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")  # Ex: janv. 2023
-
-    # --- 6. Création du graphique interactif
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_global[col_global],
-        mode="lines+markers",
-        name="Inflation IPC",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_core[col_core],
-        mode="lines+markers",
-        name="Inflation Core",
-        line=dict(color="#ff7f0e", width=2.0, dash="dash"),
-        hovertemplate="Date: %{text}<br>Core: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_noncore[col_noncore],
-        mode="lines+markers",
-        name="Inflation Non Core",
-        line=dict(color="#2ca02c", width=2.0, dash="dot"),
-        hovertemplate="Date: %{text}<br>Non Core: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    # Ligne horizontale cible
-    fig.add_hline(
-        y=4, line_dash="dash", line_color="red",
-        annotation_text="Cible 4%", annotation_position="top right"
+def _spec_core_noncore(mode: str) -> SpecGraphique:
+    """IPC en ligne + contributions Core / Non Core en barres empilées."""
+    m = "MoM" if mode == "mom" else "YoY"
+    suffixe = " (MoM)" if mode == "mom" else ""
+    survol = " MoM" if mode == "mom" else ""
+    return SpecGraphique(
+        nom=f"contributions_inflation_core_noncore_{mode}",
+        titre=f"Inflation IPC et contributions core & non_core ({m})",
+        feuilles=("categories",),
+        traces=(
+            _trace(f"Inflation (%, {mode})", f"Inflation IPC{suffixe}", f"Date: %{{text}}<br>IPC{survol}: %{{y:.2f}} %"),
+            _trace(f"Contrib_Core_{m} (pp)", "Contribution Core", "Date: %{text}<br>Core: %{y:.2f} pp",
+                   type="barre", couleur="#ff7f0e"),
+            _trace(f"Contrib_Non_Core_{m} (pp)", "Contribution Non-Core", "Date: %{text}<br>Non-Core: %{y:.2f} pp",
+                   type="barre", couleur="#2ca02c"),
+        ),
+        axe_y=dict(title=TITRE_AXE_CONTRIB),
+        hauteur=600,
+        plage_commune=True,
+        message_colonne="❌ Colonne manquante : '{col}'",
     )
 
-    # Habillage
-    fig.update_layout(
-        title="Inflation IPC, core et non_core (%) - YoY",
-        xaxis_title="Date",
-        yaxis_title="Inflation annuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=600,
-    )
-
-    fig.update_yaxes(ticksuffix=" %")
 
-    # Alléger l’axe X → un tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
+def _spec_panier(nom: str, feuille: str, mode: str, type: str, titre: str,
+                 palette=PALETTE_PANIER, locale_fr=False) -> SpecGraphique:
+    """
+    IPC d'une feuille en ligne + une trace par élément de categories.json :
+    inflation de l'élément (type "ligne") ou contribution en pp (type "barre").
+    """
+    m = "MoM" if mode == "mom" else "YoY"
+    if type == "ligne":
+        colonne, survol_ipc, axe_y = f"Inflation_{m} (%)_{{}}", "IPC", TITRE_AXE_Y[mode]
+    else:
+        colonne, survol_ipc, axe_y = f"Contrib_{m}_{{}} (pp)", f"IPC {m}", TITRE_AXE_CONTRIB
+    return SpecGraphique(
+        nom=nom,
+        titre=titre,
+        feuilles=(feuille,),
+        traces=(_trace(f"Inflation (%, {mode})", f"Inflation IPC ({m})",
+                       f"Date: %{{text}}<br>{survol_ipc}: %{{y:.2f}} %"),),
+        elements=dict(colonne=colonne, type=type, palette=palette),
+        axe_y=dict(title=axe_y, ticksuffix=" %"),
+        locale_fr=locale_fr,
     )
 
-    # --- 7. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
 
-    # --- 8. Export PNG pour rapport
-    # --- 7. Export PNG pour rapport
-    if export_png:
-        # Créer le dossier 'graphes' s'il n'existe pas
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
+# --- Catalogue des graphiques (clé = nom du PNG exporté)
+GRAPHIQUES = {spec.nom: spec for spec in (
+    _spec_dashboard("yoy"),
+    _spec_dashboard("mom"),
+    _spec_core_noncore("yoy"),
+    _spec_core_noncore("mom"),
+    _spec_panier("inflation_grand_alger_mom", "Grand_Alger", "mom", "ligne",
+                 "Inflation IPC et Composantes du Panier (MoM) - Grand Alger"),
+    _spec_panier("inflation_grand_alger_yoy", "Grand_Alger", "yoy", "ligne",
+                 "Inflation IPC et Composantes du Panier (YoY) - Grand Alger"),
+    _spec_panier("inflation_contributions_grand_alger_mom", "Grand_Alger", "mom", "barre",
+                 "Inflation IPC et Contributions des Composantes - Grand Alger (MoM)"),
+    _spec_panier("inflation_contributions_grand_alger_yoy", "Grand_Alger", "yoy", "barre",
+                 "Inflation IPC et Contributions des Composantes - Grand Alger (YoY)"),
+    _spec_panier("inflation_national_mom", "national", "mom", "ligne",
+                 "Inflation IPC et Composantes du Panier (MoM) - National"),
+    _spec_panier("inflation_national_yoy", "national", "yoy", "ligne",
+                 "Inflation IPC et Composantes du Panier (YoY) - National"),
+    _spec_panier("inflation_contributions_national_mom", "national", "mom", "barre",
+                 "Inflation IPC et Contributions des Composantes - National (MoM)"),
+    _spec_panier("inflation_contributions_national_yoy", "national", "yoy", "barre",
+                 "Inflation IPC et Contributions des Composantes - National (YOY)"),
+    _spec_panier("inflation_catégories_mom", "categories", "mom", "ligne",
+                 "Inflation IPC et des composantes par catégories (MoM)", PALETTE_CATEGORIES),
+    _spec_panier("inflation_catégories_yoy", "categories", "yoy", "ligne",
+                 "Inflation IPC et des composantes par catégories (YoY)", PALETTE_CATEGORIES),
+    _spec_panier("inflation_contributions_catégories_mom", "categories", "mom", "barre",
+                 "Inflation IPC et Contributions des Composantes - Catégories (MoM)", PALETTE_CATEGORIES,
+                 locale_fr=True),
+    _spec_panier("inflation_contributions_catégories_yoy", "categories", "yoy", "barre",
+                 "Inflation IPC et Contributions des Composantes - Catégories (YoY)", PALETTE_CATEGORIES),
+)}
+
+
+def _streamlit():
+    """
+    Module streamlit s'il est déjà chargé (application Streamlit), sinon None :
+    le module n'est jamais importé ici, pour que les exports sans interface
+    (`cli.py export-png`) ne paient pas son import.
+    """
+    return sys.modules.get("streamlit")
 
-        # Définir le chemin complet du fichier
-        output_png = os.path.join(dossier_graphes, "inflation_core_noncore_yoy.png")
 
-        # Sauvegarder l'image
-        fig.write_image(output_png, width=1200, height=600, scale=2)
+def _alerter(message: str, niveau: str = "error"):
+    """Affiche `message` dans la page (st.error / st.warning) ou, hors Streamlit, sur la console."""
+    st = _streamlit()
+    if st is not None:
+        getattr(st, niveau)(message)
+    else:
+        print(message)
 
 
-    return fig
-
-def tracer_inflation_dashboard_mom(nom_fichier: str,
-                                   feuille_categories: str,
-                                   feuille_core: str,
-                                   feuille_non_core: str,
-                                   date_debut: str,
-                                   date_fin: str,
-                                   export_png: bool = True):
+def charger_resultats(nom_fichier: str) -> ClasseurCharge:
     """
-    Trace un graphique interactif (Plotly) de l'inflation IPC, Core et Non Core en glissement mensuel (MoM).
-    Les axes sont alignés pour que Core/Non-Core et IPC soient comparables.
+    Résultats calculés (classeur `<base>_et_calculs<ext>`), servis par le
+    cache Streamlit (`cache_donnees.classeur`) : chargés une seule fois par
+    version du fichier et partagés par tous les graphiques et toutes les pages.
+    Hors Streamlit, le classeur est chargé par `charger_classeur`.
     """
-
-    import os, locale, pandas as pd, plotly.graph_objects as go, streamlit as st
-
-    # --- 1. Construire le chemin du fichier enrichi
     base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 2. Lire les résultats calculés
-    df_global = pd.read_excel(fichier_calculs, sheet_name=feuille_categories,
-                              index_col=0, parse_dates=True)
-    df_core = pd.read_excel(fichier_calculs, sheet_name=feuille_core,
-                            index_col=0, parse_dates=True)
-    df_noncore = pd.read_excel(fichier_calculs, sheet_name=feuille_non_core,
-                               index_col=0, parse_dates=True)
-
-    # --- 3. Trouver la colonne "Inflation (%, mom)"
-    def trouver_colonne_mom(cols):
-        cible = "Inflation (%, mom)"
-        for col in cols:
-            if col.strip() == cible:
-                return col
-        return None
-
-    col_global = trouver_colonne_mom(df_global.columns)
-    col_core = trouver_colonne_mom(df_core.columns)
-    col_noncore = trouver_colonne_mom(df_noncore.columns)
-
-    if not col_global or not col_core or not col_noncore:
-        st.error("Impossible de trouver la colonne exacte 'Inflation (%, mom)' dans l’un des fichiers Excel.")
-        return None
+    if _streamlit() is None:
+        return charger_classeur(base + "_et_calculs" + ext)
+    from cache_donnees import classeur
+    return classeur(base + "_et_calculs" + ext)
 
-    # --- 4. Gérer les bornes de dates
-    first_valid_date = max(
-        df_global.first_valid_index(),
-        df_core.first_valid_index(),
-        df_noncore.first_valid_index(),
-    )
 
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
+def _trouver_colonne(colonnes, cible: str):
+    """Colonne `cible`, en tolérant des espaces autour du nom (None si absente)."""
+    if cible in colonnes:
+        return cible
+    for col in colonnes:
+        if isinstance(col, str) and col.strip() == cible:
+            return col
+    return None
 
-    real_start = max(first_valid_date, date_debut_dt)
-
-    df_global = df_global.loc[real_start:date_fin_dt]
-    df_core = df_core.loc[real_start:date_fin_dt]
-    df_noncore = df_noncore.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X avec labels en FR
-
-    x = df_global.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Création du graphique interactif
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_global[col_global],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_core[col_core],
-        mode="lines+markers",
-        name="Inflation Core (MoM)",
-        line=dict(color="#ff7f0e", width=2.0, dash="dash"),
-        hovertemplate="Date: %{text}<br>Core MoM: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=x, y=df_noncore[col_noncore],
-        mode="lines+markers",
-        name="Inflation Non Core (MoM)",
-        line=dict(color="#2ca02c", width=2.0, dash="dot"),
-        hovertemplate="Date: %{text}<br>Non Core MoM: %{y:.2f}%",
-        text=x_labels
-    ))
-
-    # --- 7. Habillage
-    fig.update_layout(
-        title="Inflation IPC, core et non_core (%) - MoM",
-        xaxis_title="Date",
-        yaxis=dict(title="Inflation mensuelle (%)", ticksuffix=" %"),
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=600,
-    )
-
-    # Tick X un par trimestre
-    fig.update_xaxes(tickmode="array", tickvals=x[::3], ticktext=x_labels[::3])
-
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG pour rapport
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_core_noncore_mom.png")
-        fig.write_image(output_png, width=1200, height=600, scale=2)
-
-    return fig
 
+def _activer_locale_fr():
+    try:
+        locale.setlocale(locale.LC_TIME, "fr_FR.UTF-8")
+    except locale.Error:
+        try:
+            locale.setlocale(locale.LC_TIME, "French_France.1252")
+        except locale.Error:
+            _alerter("⚠️ Locale FR non dispo, mois en anglais.", "warning")
 
-def tracer_contributions_core_noncore_yoy(nom_fichier: str,
-                                                 feuille_categories: str,
-                                                 date_debut: str,
-                                                 date_fin: str,
-                                                 export_png: bool = True):
-    import os, locale, pandas as pd, plotly.graph_objects as go, streamlit as st
 
-    # --- 1. Chemin du fichier
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
+def construire_figure(spec: SpecGraphique,
+                      nom_fichier: str,
+                      date_debut: str,
+                      date_fin: str,
+                      feuilles=None):
+    """
+    Construit le graphique interactif (Plotly) décrit par `spec`.
 
-    # --- 2. Lire les données
-    df = pd.read_excel(fichier_calculs, sheet_name=feuille_categories,
-                       index_col=0, parse_dates=True)
+    Args:
+        spec (SpecGraphique): description du graphique (voir GRAPHIQUES).
+        nom_fichier (str): classeur source ; les données viennent de `<base>_et_calculs`.
+        date_debut, date_fin (str): bornes de la période affichée ("AAAA-MM").
+        feuilles (tuple | None): remplace `spec.feuilles` (mêmes positions).
 
-    colonnes_requises = ["Inflation (%, yoy)", "Contrib_Core_YoY (pp)", "Contrib_Non_Core_YoY (pp)"]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante : '{col}'")
+    Returns:
+        go.Figure, ou None si une colonne ou une catégorie manque.
+    """
+    feuilles = tuple(feuilles) if feuilles is not None else spec.feuilles
+
+    # --- 1. Éléments du panier (config compilée, relue seulement si categories.json change)
+    elements = ()
+    if spec.elements is not None:
+        elements = charger_config().elements(feuilles[0])
+        if not elements:
+            _alerter(f"❌ Aucune catégorie trouvée dans config/categories.json pour '{feuilles[0]}'")
             return None
 
-    # --- 3. Bornes de dates
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 4. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 5. Calcul plage y commune
-    min_val = min(df["Inflation (%, yoy)"].min(),
-                  df["Contrib_Core_YoY (pp)"].min(),
-                  df["Contrib_Non_Core_YoY (pp)"].min())
-    max_val = max(df["Inflation (%, yoy)"].max(),
-                  df["Contrib_Core_YoY (pp)"].max(),
-                  df["Contrib_Non_Core_YoY (pp)"].max())
-
-    buffer = (max_val - min_val) * 0.1  # marge 10%
-    y_range = [min_val - buffer, max_val + buffer]
-
-    # --- 6. Graphique
-    fig = go.Figure()
-
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres Core et Non-Core sur le même axe Y
-    fig.add_trace(go.Bar(
-        x=x, y=df["Contrib_Core_YoY (pp)"],
-        name="Contribution Core",
-        marker_color="#ff7f0e",
-        hovertemplate="Date: %{text}<br>Core: %{y:.2f} pp",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Bar(
-        x=x, y=df["Contrib_Non_Core_YoY (pp)"],
-        name="Contribution Non-Core",
-        marker_color="#2ca02c",
-        hovertemplate="Date: %{text}<br>Non-Core: %{y:.2f} pp",
-        text=x_labels
-    ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et contributions core & non_core (YoY)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", range=y_range),
-        template="plotly_white",
-        barmode="relative",  # stack mais négatif sous zéro
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=600
-    )
-
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "contributions_inflation_core_noncore_yoy.png")
-        fig.write_image(output_png, width=1200, height=600, scale=2)
-
-    return fig
-
-def tracer_contributions_core_noncore_mom(nom_fichier: str,
-                                                 feuille_categories: str,
-                                                 date_debut: str,
-                                                 date_fin: str,
-                                                 export_png: bool = True):
-
-    # --- 1. Chemin du fichier
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 2. Lire les données
-    df = pd.read_excel(fichier_calculs, sheet_name=feuille_categories,
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, mom)", "Contrib_Core_MoM (pp)", "Contrib_Non_Core_MoM (pp)"]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante : '{col}'")
+    # --- 2. Données : une seule lecture du classeur pour toutes les feuilles
+    resultats = charger_resultats(nom_fichier)
+    utilisees = sorted({t["feuille"] for t in spec.traces} | ({0} if elements else set()))
+    dfs = {i: resultats.feuille_indexee(feuilles[i]) for i in utilisees}
+
+    # --- 3. Résolution des colonnes
+    colonnes = []
+    for t in spec.traces:
+        col = _trouver_colonne(dfs[t["feuille"]].columns, t["colonne"])
+        if col is None:
+            _alerter(spec.message_colonne.format(col=t["colonne"]))
+            return None
+        colonnes.append(col)
+    for cat in elements:
+        col = spec.elements["colonne"].format(cat)
+        if col not in dfs[0].columns:
+            _alerter(spec.message_colonne.format(col=col))
             return None
 
-    # --- 3. Bornes de dates
-    first_valid_date = df.first_valid_index()
+    # --- 4. Bornes de dates
+    first_valid_date = max(df.first_valid_index() for df in dfs.values())
     date_debut_dt = pd.to_datetime(date_debut)
     date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
     real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 4. Axe X FR
-
+    dfs = {i: df.loc[real_start:date_fin_dt] for i, df in dfs.items()}
 
-    x = df.index.to_period("M").to_timestamp(how="start")
+    # --- 5. Axe X (un tick par trimestre)
+    if spec.locale_fr:
+        _activer_locale_fr()
+    x = dfs[utilisees[0]].index.to_period("M").to_timestamp(how="start")
     x_labels = x.strftime("%b %Y")
 
-    # --- 5. Calcul plage y commune
-    min_val = min(df["Inflation (%, mom)"].min(),
-                  df["Contrib_Core_MoM (pp)"].min(),
-                  df["Contrib_Non_Core_MoM (pp)"].min())
-    max_val = max(df["Inflation (%, mom)"].max(),
-                  df["Contrib_Core_MoM (pp)"].max(),
-                  df["Contrib_Non_Core_MoM (pp)"].max())
-    buffer = (max_val - min_val) * 0.1
-    y_range = [min_val - buffer, max_val + buffer]
-
-    # --- 6. Graphique
+    # --- 6. Traces
     fig = go.Figure()
+    for t, col in zip(spec.traces, colonnes):
+        y = dfs[t["feuille"]][col]
+        if t["type"] == "barre":
+            fig.add_trace(go.Bar(x=x, y=y, name=t["nom"], marker_color=t["couleur"],
+                                 hovertemplate=t["survol"], text=x_labels))
+        else:
+            ligne = dict(color=t["couleur"], width=t["largeur"])
+            if t["tirets"]:
+                ligne["dash"] = t["tirets"]
+            fig.add_trace(go.Scatter(x=x, y=y, mode="lines+markers", name=t["nom"], line=ligne,
+                                     hovertemplate=t["survol"], text=x_labels))
+
+    if elements:
+        palette = spec.elements["palette"]
+        for i, cat in enumerate(elements):
+            y = dfs[0][spec.elements["colonne"].format(cat)]
+            couleur = palette[i % len(palette)]
+            if spec.elements["type"] == "barre":
+                fig.add_trace(go.Bar(x=x, y=y, name=cat, marker_color=couleur,
+                                     hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"))
+            else:
+                fig.add_trace(go.Scatter(x=x, y=y, mode="lines+markers", name=cat,
+                                         line=dict(width=2.0, dash="dot", color=couleur),
+                                         hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
+                                         text=x_labels))
 
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres Core et Non-Core sur le même axe Y
-    fig.add_trace(go.Bar(
-        x=x, y=df["Contrib_Core_MoM (pp)"],
-        name="Contribution Core",
-        marker_color="#ff7f0e",
-        hovertemplate="Date: %{text}<br>Core: %{y:.2f} pp",
-        text=x_labels
-    ))
-
-    fig.add_trace(go.Bar(
-        x=x, y=df["Contrib_Non_Core_MoM (pp)"],
-        name="Contribution Non-Core",
-        marker_color="#2ca02c",
-        hovertemplate="Date: %{text}<br>Non-Core: %{y:.2f} pp",
-        text=x_labels
-    ))
-
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et contributions core & non_core (MoM)",
+    # --- 7. Habillage
+    axe_y = dict(spec.axe_y)
+    if spec.plage_commune:
+        series = [dfs[t["feuille"]][col] for t, col in zip(spec.traces, colonnes)]
+        min_val = min(s.min() for s in series)
+        max_val = max(s.max() for s in series)
+        buffer = (max_val - min_val) * 0.1  # marge 10%
+        axe_y["range"] = [min_val - buffer, max_val + buffer]
+
+    layout = dict(
+        title=spec.titre,
         xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", range=y_range),
+        yaxis=axe_y,
         template="plotly_white",
-        barmode="relative",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
+        legend=LEGENDE,
         hovermode="x unified",
-        height=600
+        height=spec.hauteur,
     )
+    if any(t["type"] == "barre" for t in spec.traces) or (elements and spec.elements["type"] == "barre"):
+        layout["barmode"] = "relative"  # empilement, négatif sous zéro
+    fig.update_layout(**layout)
 
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "contributions_inflation_core_noncore_yoy.png")
-        fig.write_image(output_png, width=1200, height=600, scale=2)
+    if spec.cible is not None:
+        fig.add_hline(
+            y=spec.cible, line_dash="dash", line_color="red",
+            annotation_text=f"Cible {spec.cible}%", annotation_position="top right"
+        )
 
     return fig
 
-def tracer_inflation_grand_alger_mom(nom_fichier: str,
-                                     date_debut: str,
-                                     date_fin: str,
-                                     export_png: bool = True):
+
+def _taille_valeurs(valeurs) -> int:
     """
-    Trace l'inflation IPC mensuelle (MoM) du Grand Alger
-    ainsi que les 8 éléments du panier (définis dans config/categories.json).
+    Mémoire (octets) d'une série de valeurs d'une trace. Un tableau NumPy
+    numérique compte pour `nbytes` ; pour un tuple, une liste ou un tableau
+    d'objets (libellés de dates, textes de survol), chaque élément est un
+    objet Python dont la taille est ajoutée à celle du conteneur.
     """
+    if isinstance(valeurs, np.ndarray):
+        if valeurs.dtype != object:
+            return valeurs.nbytes
+        return valeurs.nbytes + sum(sys.getsizeof(v) for v in valeurs.ravel())
+    return sys.getsizeof(valeurs) + sum(sys.getsizeof(v) for v in valeurs)
 
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
 
-    # Les 8 éléments du panier
-    elements_panier = config.get("Grand_Alger", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
-
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="Grand_Alger",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Inflation_MoM (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
-
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
-
-    # IPC global
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 8 éléments du panier
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_MoM (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i % len(couleurs)]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Composantes du Panier (MoM) - Grand Alger",
-        xaxis_title="Date",
-        yaxis_title="Inflation mensuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
+def _taille_figure(fig) -> int:
+    """Estimation (octets) de la mémoire des données d'une figure : x, y et textes des traces."""
+    taille = 0
+    for trace in fig.data:
+        for attribut in ("x", "y", "text", "hovertext"):
+            valeurs = getattr(trace, attribut, None)
+            if valeurs is not None and not isinstance(valeurs, str):
+                taille += _taille_valeurs(valeurs)
+    return taille
 
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
 
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
-
-    # --- 8. Affichage
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_grand_alger_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
-    return fig
-
-def tracer_inflation_grand_alger_yoy(nom_fichier: str,
-                                     date_debut: str,
-                                     date_fin: str,
-                                     export_png: bool = True):
+class CacheFigures:
     """
-    Trace l'inflation IPC annuelle (YoY) du Grand Alger
-    ainsi que les 8 éléments du panier (définis dans config/categories.json).
+    Cache LRU des figures construites, borné en nombre d'entrées et en
+    mémoire estimée (`_taille_figure`). L'entrée la moins récemment
+    utilisée est évincée dès qu'une des deux limites est dépassée.
     """
 
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
+    __slots__ = ("max_entrees", "max_octets", "octets", "hits", "misses", "_entrees")
 
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
+    def __init__(self, max_entrees: int = 32, max_octets: int = 64 * 1024 * 1024):
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+        self.octets = 0
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()  # clé -> (figure, taille)
 
-    # Les 8 éléments du panier
-    elements_panier = config.get("Grand_Alger", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
+    def __len__(self):
+        return len(self._entrees)
 
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="Grand_Alger",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, yoy)"] + [
-        f"Inflation_YoY (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
+    def lire(self, cle):
+        """Figure associée à `cle` (None si absente) ; l'entrée devient la plus récente."""
+        entree = self._entrees.get(cle)
+        if entree is None:
+            self.misses += 1
             return None
+        self._entrees.move_to_end(cle)
+        self.hits += 1
+        return entree[0]
 
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
+    def ajouter(self, cle, fig):
+        """Ajoute `fig` puis évince les entrées les plus anciennes au-delà des limites."""
+        if cle in self._entrees:
+            self.octets -= self._entrees.pop(cle)[1]
+        taille = _taille_figure(fig)
+        self._entrees[cle] = (fig, taille)
+        self.octets += taille
+        while self._entrees and (len(self._entrees) > self.max_entrees or self.octets > self.max_octets):
+            _, (_, taille_evincee) = self._entrees.popitem(last=False)
+            self.octets -= taille_evincee
 
-    # IPC global
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 8 éléments du panier
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_YoY (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i % len(couleurs)]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Composantes du Panier (YoY) - Grand Alger",
-        xaxis_title="Date",
-        yaxis_title="Inflation annuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
+    def vider(self):
+        self._entrees.clear()
+        self.octets = 0
 
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
 
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
+# Figures déjà construites, partagées par toutes les réexécutions Streamlit du processus
+_cache_figures = CacheFigures()
 
-    # --- 8. Affichage
-    st.plotly_chart(fig, use_container_width=True)
 
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_grand_alger_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
+def statistiques_figures() -> dict:
+    """Entrées, mémoire estimée et hits/misses du cache de figures."""
+    return {"entrees": len(_cache_figures), "octets": _cache_figures.octets,
+            "hit": _cache_figures.hits, "miss": _cache_figures.misses}
 
-    return fig
 
-def tracer_inflation_contributions_grand_alger_mom(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
+def _empreinte_resultats(nom_fichier: str) -> tuple:
     """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
+    Empreinte légère du classeur de résultats (taille, date de modification) :
+    un simple stat, sans relire le fichier. `pipeline_global` réécrit le
+    classeur, ce qui change l'empreinte.
     """
-
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    elements_panier = config.get("Grand_Alger", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
-
-    # --- 2. Construire chemin fichier enrichi
     base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="Grand_Alger",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Contrib_MoM_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
+    infos = os.stat(base + "_et_calculs" + ext)
+    return infos.st_size, infos.st_mtime_ns
 
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
 
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique
-    fig = go.Figure()
-
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_MoM_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - Grand Alger (MoM)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
-        template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_grand_alger_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
-    return fig
-
-def tracer_inflation_contributions_grand_alger_yoy(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
+def tracer_graphique(spec: SpecGraphique,
+                     nom_fichier: str,
+                     date_debut: str,
+                     date_fin: str,
+                     export_png: bool = True,
+                     feuilles=None):
     """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
+    Trace le graphique décrit par `spec`, l'affiche dans Streamlit et
+    enregistre une copie PNG dans `graphes/` si demandé.
+
+    La figure est servie par le cache LRU si la même vue (graphique,
+    feuilles, période) a déjà été construite sur la même version du
+    classeur de résultats et de la configuration : ni relecture, ni
+    reformatage des dates.
+
+    Args:
+        spec (SpecGraphique): description du graphique (voir GRAPHIQUES).
+        nom_fichier (str): classeur source ; les données viennent de `<base>_et_calculs`.
+        date_debut, date_fin (str): bornes de la période affichée ("AAAA-MM").
+        export_png (bool): exporter le graphique en PNG.
+        feuilles (tuple | None): remplace `spec.feuilles` (mêmes positions).
+
+    Returns:
+        go.Figure, ou None si une colonne ou une catégorie manque.
     """
+    import streamlit as st
 
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    elements_panier = config.get("Grand_Alger", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
+    fig = obtenir_figure(spec, nom_fichier, date_debut, date_fin, feuilles)
+    if fig is None:
         return None
 
-    # --- 2. Construire chemin fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="Grand_Alger",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, yoy)"] + [
-        f"Contrib_YoY_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
-
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique
-    fig = go.Figure()
-
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_YoY_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - Grand Alger (YoY)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
-        template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # --- 8. Affichage Streamlit
+    # --- Affichage Streamlit
     st.plotly_chart(fig, use_container_width=True)
 
-    # --- 9. Export PNG
+    # --- Export PNG pour rapport
     if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_grand_alger_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
+        exporter_png(spec, fig)
 
     return fig
 
 
-def tracer_inflation_national_mom(nom_fichier: str,
-                                     date_debut: str,
-                                     date_fin: str,
-                                     export_png: bool = True):
+def obtenir_figure(spec: SpecGraphique, nom_fichier: str, date_debut: str, date_fin: str, feuilles=None):
     """
-    Trace l'inflation IPC mensuelle (MoM) du National
-    ainsi que les 8 éléments du panier (définis dans config/categories.json).
+    `construire_figure`, servie par le cache LRU si la même vue (graphique,
+    feuilles, période) a déjà été construite sur la même version du
+    classeur de résultats et de la configuration.
     """
-
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    # Les 8 éléments du panier
-    elements_panier = config.get("national", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
-
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="national",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Inflation_MoM (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
-
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
-
-    # IPC global
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 8 éléments du panier
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_MoM (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i % len(couleurs)]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Composantes du Panier (MoM) - National",
-        xaxis_title="Date",
-        yaxis_title="Inflation mensuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
-
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
-
-    # --- 8. Affichage
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_national_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
+    feuilles = tuple(feuilles) if feuilles is not None else spec.feuilles
+    cle = (spec.nom, feuilles, str(date_debut), str(date_fin), os.path.abspath(nom_fichier),
+           _empreinte_resultats(nom_fichier), charger_config().empreinte)
+
+    fig = _cache_figures.lire(cle)
+    if fig is None:
+        fig = construire_figure(spec, nom_fichier, date_debut, date_fin, feuilles)
+        if fig is not None:
+            _cache_figures.ajouter(cle, fig)
     return fig
 
-def tracer_inflation_national_yoy(nom_fichier: str,
-                                     date_debut: str,
-                                     date_fin: str,
-                                     export_png: bool = True):
-    """
-    Trace l'inflation IPC annuelle (YoY) du National
-    ainsi que les 8 éléments du panier (définis dans config/categories.json).
-    """
-
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
 
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
+def exporter_png(spec: SpecGraphique, fig, dossier_graphes: str = "graphes") -> str:
+    """Enregistre `fig` dans `<dossier_graphes>/<spec.nom>.png` (1200 px de large) et retourne le chemin."""
+    os.makedirs(dossier_graphes, exist_ok=True)
+    output_png = os.path.join(dossier_graphes, f"{spec.nom}.png")
+    fig.write_image(output_png, width=1200, height=spec.hauteur, scale=2)
+    return output_png
 
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
 
-    # Les 8 éléments du panier
-    elements_panier = config.get("national", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
+# --- Inflation hors composantes (calculée à la volée sur le classeur source)
 
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="national",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, yoy)"] + [
-        f"Inflation_YoY (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
+def _empreinte_source(nom_fichier: str) -> tuple:
+    infos = os.stat(nom_fichier)
+    return infos.st_size, infos.st_mtime_ns, charger_config().empreinte
 
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
 
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
-
-    # IPC global
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 8 éléments du panier
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_YoY (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i % len(couleurs)]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Composantes du Panier (YoY) - National",
-        xaxis_title="Date",
-        yaxis_title="Inflation annuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
-
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
-
-    # --- 8. Affichage
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_national_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
-    return fig
-
-def tracer_inflation_contributions_national_mom(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
+def mesures_exclusion_disponibles(nom_fichier: str, panier: str) -> list:
     """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
+    Noms des mesures hors composantes du panier ("IPC", "hors <composante>"…),
+    tirés de l'arbre de weights.json sans calculer les mesures.
     """
+    from calculator import noms_mesures_exclusion
 
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
+    return noms_mesures_exclusion(nom_fichier, panier)
 
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    elements_panier = config.get("national", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
 
-    # --- 2. Construire chemin fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="national",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Contrib_MoM_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
+def _spec_exclusions(panier: str, mode: str) -> SpecGraphique:
+    """Nom, titre et hauteur du graphique hors composantes (pour le cache et l'export PNG)."""
+    m = "MoM" if mode == "mom" else "YoY"
+    return SpecGraphique(nom=f"inflation_exclusions_{panier}_{mode}",
+                         titre=f"Inflation IPC et hors composantes ({m}) - {panier}",
+                         feuilles=(panier,), traces=(), axe_y=dict(title=TITRE_AXE_Y[mode], ticksuffix=" %"),
+                         hauteur=600)
 
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique
-    fig = go.Figure()
 
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_MoM_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - National (MoM)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
-        template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_national_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
-    return fig
-
-def tracer_inflation_contributions_national_yoy(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
-    """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
+def construire_figure_exclusions(nom_fichier: str, panier: str, mode: str, date_debut: str, date_fin: str,
+                                 mesures=None):
     """
+    Inflation d'ensemble et hors composantes du panier (voir
+    `calculator.mesures_exclusion`), en lignes. Les mesures ne sont
+    calculées que sur la période affichée (et ses 12 mois de recul).
 
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    elements_panier = config.get("national", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
+    Args:
+        mesures (list | None): colonnes à tracer (défaut : "IPC" et l'exclusion
+            de chaque groupe du panier).
+    """
+    from calculator import mesures_exclusion
+
+    spec = _spec_exclusions(panier, mode)
+    df = mesures_exclusion(nom_fichier, panier, date_debut=date_debut, date_fin=date_fin)[f"inflation_{mode}"]
+    if mesures is None:
+        groupes = charger_config().panier(panier).composantes
+        mesures = ["IPC"] + [f"hors {g}" for g in groupes if f"hors {g}" in df.columns]
+    inconnues = [m for m in mesures if m not in df.columns]
+    if inconnues:
+        _alerter(f"❌ Mesure(s) inconnue(s) : {', '.join(inconnues)}")
         return None
 
-    # --- 2. Construire chemin fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="national",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Contrib_YoY_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
-
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-    x = df.index.to_period("M").to_timestamp(how="start")
+    df = df[list(mesures)]
+    x = df.index.to_timestamp(how="start")
     x_labels = x.strftime("%b %Y")
 
-    # --- 6. Graphique
     fig = go.Figure()
-
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = [
-        "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
-        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22"
-    ]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_YoY_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
+    for i, mesure in enumerate(mesures):
+        if mesure == "IPC":
+            ligne = dict(color=COULEUR_IPC, width=2.5)
+        else:
+            ligne = dict(color=PALETTE_PANIER[i % len(PALETTE_PANIER)], width=2.0, dash="dot")
+        fig.add_trace(go.Scatter(x=x, y=df[mesure], mode="lines", name=mesure, line=ligne,
+                                 hovertemplate=f"Date: %{{text}}<br>{mesure}: %{{y:.2f}} %", text=x_labels))
     fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - National (YOY)",
+        title=spec.titre,
         xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
+        yaxis=spec.axe_y,
         template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
+        legend=LEGENDE,
         hovermode="x unified",
-        height=700
+        height=spec.hauteur,
     )
-
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_national_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
     return fig
 
-def tracer_inflation_categories_mom(nom_fichier: str,
-                                    date_debut: str,
-                                    date_fin: str,
-                                    export_png: bool = True):
-    """
-    Trace l'inflation IPC mensuelle (MoM) du panier 'categories'
-    ainsi que ses 3 éléments (définis dans config/categories.json).
-    """
-
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    # Les 3 éléments du panier "categories"
-    elements_panier = config.get("categories", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json pour 'categories'")
-        return None
-
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="categories",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Inflation_MoM (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
 
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
-
-    # IPC global du panier "categories"
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 3 éléments du panier
-    couleurs = ["#e41a1c", "#377eb8", "#4daf4a"]  # palette spéciale 3 couleurs
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_MoM (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et des composantes par catégories (MoM)",
-        xaxis_title="Date",
-        yaxis_title="Inflation mensuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
-
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
-
-    # --- 8. Affichage
-    st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_catégories_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
-    return fig
-
-def tracer_inflation_categories_yoy(nom_fichier: str,
-                                    date_debut: str,
-                                    date_fin: str,
-                                    export_png: bool = True):
+def tracer_inflation_exclusions(nom_fichier: str, panier: str, mode: str, date_debut: str, date_fin: str,
+                                mesures=None, export_png: bool = True):
     """
-    Trace l'inflation IPC mensuelle (MoM) du panier 'categories'
-    ainsi que ses 3 éléments (définis dans config/categories.json).
+    Trace l'inflation hors composantes (`construire_figure_exclusions`),
+    servie par le cache de figures tant que le classeur source et la
+    configuration ne changent pas.
     """
-
-    # --- 1. Charger la config JSON (chemin intégré)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))  # remonte d'un dossier
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
-
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
-
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    # Les 3 éléments du panier "categories"
-    elements_panier = config.get("categories", [])
-
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json pour 'categories'")
-        return None
-
-    # --- 2. Construire le chemin du fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Lire les données Excel
-    df = pd.read_excel(fichier_calculs, sheet_name="categories",
-                       index_col=0, parse_dates=True)
-
-    # Vérification des colonnes
-    colonnes_requises = ["Inflation (%, yoy)"] + [
-        f"Inflation_YoY (%)_{cat}" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
+    import streamlit as st
+
+    spec = _spec_exclusions(panier, mode)
+    cle = (spec.nom, tuple(mesures) if mesures is not None else None, str(date_debut), str(date_fin),
+           os.path.abspath(nom_fichier), _empreinte_source(nom_fichier))
+    fig = _cache_figures.lire(cle)
+    if fig is None:
+        fig = construire_figure_exclusions(nom_fichier, panier, mode, date_debut, date_fin, mesures)
+        if fig is None:
             return None
+        _cache_figures.ajouter(cle, fig)
 
-    # --- 4. Gestion des bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
-
-    # --- 5. Axe X FR
-
-
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
-
-    # --- 6. Graphique interactif
-    fig = go.Figure()
-
-    # IPC global du panier "categories"
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Les 3 éléments du panier
-    couleurs = ["#e41a1c", "#377eb8", "#4daf4a"]  # palette spéciale 3 couleurs
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Inflation_YoY (%)_{cat}"
-        fig.add_trace(go.Scatter(
-            x=x, y=df[col_name],
-            mode="lines+markers",
-            name=cat,
-            line=dict(width=2.0, dash="dot", color=couleurs[i]),
-            hovertemplate=f"Date: %{{text}}<br>{cat}: %{{y:.2f}} %",
-            text=x_labels
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et des composantes par catégories (YoY)",
-        xaxis_title="Date",
-        yaxis_title="Inflation annuelle (%)",
-        template="plotly_white",
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
-
-    # Axe Y en pourcentage
-    fig.update_yaxes(ticksuffix=" %")
-
-    # Alléger l’axe X → 1 tick par trimestre
-    fig.update_xaxes(
-        tickmode="array",
-        tickvals=x[::3],
-        ticktext=x_labels[::3]
-    )
-
-    # --- 8. Affichage
     st.plotly_chart(fig, use_container_width=True)
-
-    # --- 9. Export PNG
     if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_catégories_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
-
+        exporter_png(spec, fig)
     return fig
 
-def tracer_inflation_contributions_categories_mom(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
-    """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
-    """
-
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
 
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
+# --- Graphiques des pages (enveloppes de `tracer_graphique`)
 
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
-
-    elements_panier = config.get("categories", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
+def tracer_inflation_dashboard_yoy(nom_fichier: str,
+                                   feuille_categories: str,
+                                   feuille_core: str,
+                                   feuille_non_core: str,
+                                   date_debut: str,
+                                   date_fin: str,
+                                   export_png: bool = True):
+    """Inflation IPC, Core et Non Core en glissement annuel (YoY), avec la cible de 4 %."""
+    return tracer_graphique(GRAPHIQUES["inflation_core_noncore_yoy"], nom_fichier, date_debut, date_fin,
+                            export_png, feuilles=(feuille_categories, feuille_core, feuille_non_core))
 
-    # --- 2. Construire chemin fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="categories",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, mom)"] + [
-        f"Contrib_MoM_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
 
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
+def tracer_inflation_dashboard_mom(nom_fichier: str,
+                                   feuille_categories: str,
+                                   feuille_core: str,
+                                   feuille_non_core: str,
+                                   date_debut: str,
+                                   date_fin: str,
+                                   export_png: bool = True):
+    """Inflation IPC, Core et Non Core en glissement mensuel (MoM)."""
+    return tracer_graphique(GRAPHIQUES["inflation_core_noncore_mom"], nom_fichier, date_debut, date_fin,
+                            export_png, feuilles=(feuille_categories, feuille_core, feuille_non_core))
 
-    # --- 5. Axe X FR
-    try:
-        locale.setlocale(locale.LC_TIME, "fr_FR.UTF-8")
-    except:
-        try:
-            locale.setlocale(locale.LC_TIME, "French_France.1252")
-        except:
-            st.warning("⚠️ Locale FR non dispo, mois en anglais.")
 
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
+def tracer_contributions_core_noncore_yoy(nom_fichier: str,
+                                          feuille_categories: str,
+                                          date_debut: str,
+                                          date_fin: str,
+                                          export_png: bool = True):
+    """Inflation IPC (YoY) + contributions Core / Non Core (barres)."""
+    return tracer_graphique(GRAPHIQUES["contributions_inflation_core_noncore_yoy"], nom_fichier,
+                            date_debut, date_fin, export_png, feuilles=(feuille_categories,))
 
-    # --- 6. Graphique
-    fig = go.Figure()
 
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, mom)"],
-        mode="lines+markers",
-        name="Inflation IPC (MoM)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC MoM: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = ["#e41a1c", "#377eb8", "#4daf4a"]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_MoM_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - Catégories (MoM)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
-        template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
+def tracer_contributions_core_noncore_mom(nom_fichier: str,
+                                          feuille_categories: str,
+                                          date_debut: str,
+                                          date_fin: str,
+                                          export_png: bool = True):
+    """Inflation IPC (MoM) + contributions Core / Non Core (barres)."""
+    return tracer_graphique(GRAPHIQUES["contributions_inflation_core_noncore_mom"], nom_fichier,
+                            date_debut, date_fin, export_png, feuilles=(feuille_categories,))
 
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
 
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_catégories_mom.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
+def tracer_inflation_grand_alger_mom(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC mensuelle (MoM) du Grand Alger et des éléments du panier."""
+    return tracer_graphique(GRAPHIQUES["inflation_grand_alger_mom"], nom_fichier, date_debut, date_fin, export_png)
 
-    return fig
 
-def tracer_inflation_contributions_categories_yoy(
-    nom_fichier: str,
-    date_debut: str,
-    date_fin: str,
-    export_png: bool = True
-):
-    """
-    Trace l'inflation IPC (MoM) + contributions des éléments du panier (barres).
-    """
+def tracer_inflation_grand_alger_yoy(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC annuelle (YoY) du Grand Alger et des éléments du panier."""
+    return tracer_graphique(GRAPHIQUES["inflation_grand_alger_yoy"], nom_fichier, date_debut, date_fin, export_png)
 
-    # --- 1. Charger config JSON (catégories)
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    chemin_json = os.path.join(base_dir, "config", "categories.json")
 
-    if not os.path.exists(chemin_json):
-        raise FileNotFoundError(f"❌ Fichier JSON introuvable : {chemin_json}")
+def tracer_inflation_contributions_grand_alger_mom(nom_fichier: str, date_debut: str, date_fin: str,
+                                                   export_png: bool = True):
+    """Inflation IPC (MoM) du Grand Alger + contributions des éléments du panier (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_grand_alger_mom"], nom_fichier,
+                            date_debut, date_fin, export_png)
 
-    with open(chemin_json, "r", encoding="utf-8") as f:
-        config = json.load(f)
 
-    elements_panier = config.get("categories", [])
-    if not elements_panier:
-        st.error("❌ Aucune catégorie trouvée dans config/categories.json")
-        return None
+def tracer_inflation_contributions_grand_alger_yoy(nom_fichier: str, date_debut: str, date_fin: str,
+                                                   export_png: bool = True):
+    """Inflation IPC (YoY) du Grand Alger + contributions des éléments du panier (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_grand_alger_yoy"], nom_fichier,
+                            date_debut, date_fin, export_png)
 
-    # --- 2. Construire chemin fichier enrichi
-    base, ext = os.path.splitext(nom_fichier)
-    fichier_calculs = base + "_et_calculs" + ext
-
-    # --- 3. Charger données
-    df = pd.read_excel(fichier_calculs, sheet_name="categories",
-                       index_col=0, parse_dates=True)
-
-    colonnes_requises = ["Inflation (%, yoy)"] + [
-        f"Contrib_YoY_{cat} (pp)" for cat in elements_panier
-    ]
-    for col in colonnes_requises:
-        if col not in df.columns:
-            st.error(f"❌ Colonne manquante dans Excel : {col}")
-            return None
 
-    # --- 4. Bornes temporelles
-    first_valid_date = df.first_valid_index()
-    date_debut_dt = pd.to_datetime(date_debut)
-    date_fin_dt = pd.to_datetime(date_fin) + pd.offsets.MonthEnd(1)
-    real_start = max(first_valid_date, date_debut_dt)
-    df = df.loc[real_start:date_fin_dt]
+def tracer_inflation_national_mom(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC mensuelle (MoM) nationale et des éléments du panier."""
+    return tracer_graphique(GRAPHIQUES["inflation_national_mom"], nom_fichier, date_debut, date_fin, export_png)
 
-    # --- 5. Axe X FR
 
-    x = df.index.to_period("M").to_timestamp(how="start")
-    x_labels = x.strftime("%b %Y")
+def tracer_inflation_national_yoy(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC annuelle (YoY) nationale et des éléments du panier."""
+    return tracer_graphique(GRAPHIQUES["inflation_national_yoy"], nom_fichier, date_debut, date_fin, export_png)
 
-    # --- 6. Graphique
-    fig = go.Figure()
 
-    # Ligne IPC
-    fig.add_trace(go.Scatter(
-        x=x, y=df["Inflation (%, yoy)"],
-        mode="lines+markers",
-        name="Inflation IPC (YoY)",
-        line=dict(color="#1f77b4", width=2.5),
-        hovertemplate="Date: %{text}<br>IPC YoY: %{y:.2f} %",
-        text=x_labels
-    ))
-
-    # Barres des contributions des 8 éléments
-    couleurs = ["#e41a1c", "#277eb8", "#4daf4a"]
-
-    for i, cat in enumerate(elements_panier):
-        col_name = f"Contrib_YoY_{cat} (pp)"
-        fig.add_trace(go.Bar(
-            x=x, y=df[col_name],
-            name=cat,
-            marker_color=couleurs[i % len(couleurs)],
-            hovertemplate=f"Date: %{{x|%b %Y}}<br>{cat}: %{{y:.2f}} pp"
-        ))
-
-    # --- 7. Layout
-    fig.update_layout(
-        title="Inflation IPC et Contributions des Composantes - Catégories (YoY)",
-        xaxis=dict(title="Date", tickmode="array", tickvals=x[::3], ticktext=x_labels[::3]),
-        yaxis=dict(title="Inflation & Contributions (pp / %)", ticksuffix=" %"),
-        template="plotly_white",
-        barmode="relative",  # empilement
-        legend=dict(title="", orientation="h", y=1.1, x=0.5, xanchor="center"),
-        hovermode="x unified",
-        height=700
-    )
+def tracer_inflation_contributions_national_mom(nom_fichier: str, date_debut: str, date_fin: str,
+                                                export_png: bool = True):
+    """Inflation IPC (MoM) nationale + contributions des éléments du panier (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_national_mom"], nom_fichier,
+                            date_debut, date_fin, export_png)
 
-    # --- 8. Affichage Streamlit
-    st.plotly_chart(fig, use_container_width=True)
 
-    # --- 9. Export PNG
-    if export_png:
-        dossier_graphes = "graphes"
-        os.makedirs(dossier_graphes, exist_ok=True)
-        output_png = os.path.join(dossier_graphes, "inflation_contributions_catégories_yoy.png")
-        fig.write_image(output_png, width=1200, height=700, scale=2)
+def tracer_inflation_contributions_national_yoy(nom_fichier: str, date_debut: str, date_fin: str,
+                                                export_png: bool = True):
+    """Inflation IPC (YoY) nationale + contributions des éléments du panier (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_national_yoy"], nom_fichier,
+                            date_debut, date_fin, export_png)
 
-    return fig
 
+def tracer_inflation_categories_mom(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC mensuelle (MoM) et des catégories."""
+    return tracer_graphique(GRAPHIQUES["inflation_catégories_mom"], nom_fichier, date_debut, date_fin, export_png)
 
-# --- Lancement direct ---
-if __name__ == "__main__":
-    # --- Paramètres de test ---
-    nom_fichier = "Fichier_de_donnes.xlsx"
-    date_debut = "2023-01"
-    date_fin = "2025-07"
 
-    # --- Appel de la fonction ---
-    fig = tracer_inflation_dashboard_yoy(
-        nom_fichier=nom_fichier,
-        date_debut=date_debut,
-        date_fin=date_fin,
-        export_png=True
-    )
+def tracer_inflation_categories_yoy(nom_fichier: str, date_debut: str, date_fin: str, export_png: bool = True):
+    """Inflation IPC annuelle (YoY) et des catégories."""
+    return tracer_graphique(GRAPHIQUES["inflation_catégories_yoy"], nom_fichier, date_debut, date_fin, export_png)
 
-    # Vérification retour
-    if fig:
-        print("✅ Graphe généré avec succès.")
-    else:
-        print("❌ Erreur lors de la génération du graphe.")
 
+def tracer_inflation_contributions_categories_mom(nom_fichier: str, date_debut: str, date_fin: str,
+                                                  export_png: bool = True):
+    """Inflation IPC (MoM) + contributions des catégories (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_catégories_mom"], nom_fichier,
+                            date_debut, date_fin, export_png)
 
 
+def tracer_inflation_contributions_categories_yoy(nom_fichier: str, date_debut: str, date_fin: str,
+                                                  export_png: bool = True):
+    """Inflation IPC (YoY) + contributions des catégories (barres)."""
+    return tracer_graphique(GRAPHIQUES["inflation_contributions_catégories_yoy"], nom_fichier,
+                            date_debut, date_fin, export_png)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Les modules de src/ s'importent à plat (`from load_data import ...`), comme dans l'application
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
@@ -0,0 +1,45 @@
+"""Fenêtres de dates des étapes calculer_* (recul de 1 / 12 mois)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import generer_jeu
+from calculator import calculer_ipc, calculer_inflation_yoy, calculer_contributions_pp_yoy
+from configuration import utiliser_config
+from load_data import charger_classeur, SessionMemoire
+
+DEBUT, FIN = "2002-01", "2004-12"
+FENETRE = ("2003-03", "2003-08")  # sous-période dont le recul de 12 mois commence avant elle
+
+
+@pytest.fixture(scope="module")
+def feuilles(tmp_path_factory):
+    chemins = generer_jeu(str(tmp_path_factory.mktemp("fenetre")), mois=36, composantes=4)
+    with utiliser_config(chemins["poids"], chemins["categories"]):
+        yield {"Grand_Alger": charger_classeur(chemins["classeur"]).feuille_wide("Grand_Alger")}
+
+
+def _ecrites(feuilles, date_debut, date_fin, *etapes) -> dict:
+    """{colonne: {période: valeur}} écrites par `etapes` sur [date_debut, date_fin], après l'IPC complet."""
+    session = SessionMemoire(feuilles)
+    calculer_ipc(None, "Grand_Alger", DEBUT, FIN, session=session)
+    session.journal.clear()
+    for fonction in etapes:
+        fonction(None, "Grand_Alger", date_debut, date_fin, session=session)
+    return {colonne: valeurs for _, colonne, valeurs, _ in session.journal}
+
+
+@pytest.mark.parametrize("etape", [calculer_inflation_yoy, calculer_contributions_pp_yoy])
+def test_sous_periode_egale_a_l_historique_complet(feuilles, etape):
+    complet = _ecrites(feuilles, DEBUT, FIN, etape)
+    fenetre = _ecrites(feuilles, *FENETRE, etape)
+    periodes = pd.period_range(*FENETRE, freq="M")
+
+    assert fenetre.keys() == complet.keys()
+    for colonne, valeurs in fenetre.items():
+        assert set(valeurs) == set(periodes), colonne
+        attendu = [complet[colonne][p] for p in periodes]
+        obtenu = [valeurs[p] for p in periodes]
+        # Les 12 mois de recul sont lus avant la fenêtre : aucune valeur manquante en tête
+        assert not np.isnan(obtenu).any(), colonne
+        np.testing.assert_array_equal(obtenu, attendu, err_msg=colonne)
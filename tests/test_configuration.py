@@ -0,0 +1,46 @@
+"""Arbre d'agrégation de weights.json (`ConfigIPC.arbre`)."""
+import json
+
+import numpy as np
+import pytest
+
+from configuration import charger_config
+
+
+@pytest.fixture
+def config(tmp_path):
+    # Le panier Q est une composante de P : P/Q a pour enfants les composantes de la feuille Q
+    poids = {"P": {"x": 1, "Q": 3, "absente": 5}, "Q": {"y": 1, "z": 2}}
+    categories = {"P": {"x": [], "Q": []}, "Q": {"y": [], "z": []}}
+    (tmp_path / "weights.json").write_text(json.dumps(poids), encoding="utf-8")
+    (tmp_path / "categories.json").write_text(json.dumps(categories), encoding="utf-8")
+    return charger_config(tmp_path / "weights.json", tmp_path / "categories.json")
+
+
+COLONNES = {"P": ["date", "x"], "Q": ["date", "y", "z"]}
+
+
+def test_arbre_developpe_les_sous_paniers(config):
+    arbre = config.arbre(COLONNES, racines=["P"])
+    # "absente" n'a ni colonne ni sous-panier : ignorée
+    assert arbre.noeuds == ("P", "P/x", "P/Q", "P/Q/y", "P/Q/z")
+    assert arbre.sources[arbre.index("P/Q/y")] == ("Q", "y")
+    assert arbre.sources[arbre.index("P/Q")] is None
+    # Parts : x = 1/4 ; Q = 3/4, réparti 1/3 - 2/3 entre y et z
+    np.testing.assert_allclose(arbre.parts(), [1.0, 0.25, 0.75, 0.25, 0.5])
+
+
+def test_arbre_agrege_de_bas_en_haut(config):
+    arbre = config.arbre(COLONNES, racines=["P"])
+    observees = np.full((1, len(arbre)), np.nan)
+    for noeud, valeur in (("P/x", 100.0), ("P/Q/y", 90.0), ("P/Q/z", 120.0)):
+        observees[0, arbre.index(noeud)] = valeur
+    valeurs = arbre.agreger(observees)
+    # Q = (90 + 2 * 120) / 3 = 110 ; P = (100 + 3 * 110) / 4 = 107.5
+    assert valeurs[0, arbre.index("P/Q")] == pytest.approx(110.0)
+    assert valeurs[0, arbre.index("P")] == pytest.approx(107.5)
+
+
+def test_arbre_panier_sans_feuille(config):
+    with pytest.raises(ValueError):
+        config.arbre({"Q": ["date", "y", "z"]}, racines=["P"])
@@ -0,0 +1,88 @@
+"""Moteurs de calcul contre la chaîne historique, sur un classeur synthétique."""
+import io
+import json
+import os
+import shutil
+from contextlib import redirect_stdout
+
+import pytest
+from openpyxl import load_workbook
+
+import load_data
+from benchmark import generer_jeu
+from calculator import pipeline_global, preparer_fichier_calculs, _chemin_etat
+from configuration import utiliser_config
+from equivalence import verifier, est_equivalent, instantane_classeur, comparer_instantanes
+
+
+@pytest.fixture(scope="module")
+def jeu(tmp_path_factory):
+    chemins = generer_jeu(str(tmp_path_factory.mktemp("jeu")), mois=30, composantes=5)
+    with utiliser_config(chemins["poids"], chemins["categories"]):
+        yield chemins
+
+
+def _executer(classeur, **options):
+    load_data._classeurs.clear()
+    with open(os.devnull, "w") as muet, redirect_stdout(muet):
+        pipeline_global(classeur, **options)
+    return instantane_classeur(preparer_fichier_calculs(classeur), classeur)
+
+
+def _copie(jeu, dossier):
+    classeur = str(dossier / "Fichier_de_donnes.xlsx")
+    os.makedirs(dossier)
+    shutil.copyfile(jeu["classeur"], classeur)
+    return classeur
+
+
+def test_moteurs_equivalents_a_la_chaine_historique(jeu):
+    resultats = verifier(jeu["classeur"], ["moteur", "global", "global_flux"])
+    assert [r["moteur"] for r in resultats] == ["historique", "moteur", "global", "global_flux"]
+    for r in resultats[1:]:
+        assert r["rapport"]["cellules"] > 0
+        assert est_equivalent(r["rapport"]), (r["moteur"], r["rapport"]["exemples"])
+
+
+def test_pipeline_incremental_egal_au_recalcul_complet(jeu, tmp_path):
+    classeur = _copie(jeu, tmp_path / "incremental")
+    _executer(classeur)
+
+    # Une valeur modifiée à l'avant-dernière période du classeur source
+    wb = load_workbook(classeur)
+    ws = wb["Grand_Alger"]
+    ws.cell(row=ws.max_row - 1, column=2).value *= 1.05
+    wb.save(classeur)
+    incremental = _executer(classeur, incremental=True)
+
+    complet = _copie({"classeur": classeur}, tmp_path / "complet")
+    rapport = comparer_instantanes(_executer(complet), incremental)
+    assert est_equivalent(rapport), rapport["exemples"]
+
+
+def test_pipeline_incremental_classeur_de_resultats_recree(jeu, tmp_path):
+    # Le classeur de résultats est supprimé après une exécution complète : il est
+    # recréé à partir du fichier source, sans colonne calculée, et tout est recalculé
+    classeur = _copie(jeu, tmp_path / "recree")
+    complet = _executer(classeur)
+    os.remove(preparer_fichier_calculs(classeur))
+    rapport = comparer_instantanes(complet, _executer(classeur, incremental=True))
+    assert est_equivalent(rapport), rapport["exemples"]
+
+
+def test_pipeline_incremental_colonnes_absentes(jeu, tmp_path):
+    # Comme après un changement de code qui ajoute des colonnes : l'état de la
+    # dernière exécution ne les mentionne pas, elles sont recalculées
+    classeur = _copie(jeu, tmp_path / "colonnes")
+    complet = _executer(classeur)
+    chemin_etat = _chemin_etat(preparer_fichier_calculs(classeur))
+    etat = json.loads(chemin_etat.read_text(encoding="utf-8"))
+    etat["entetes"]["Grand_Alger"].remove("IPC (%)")
+    chemin_etat.write_text(json.dumps(etat), encoding="utf-8")
+
+    sortie = io.StringIO()
+    with redirect_stdout(sortie):
+        pipeline_global(classeur, incremental=True)
+    assert "recalcul complet" in sortie.getvalue()
+    rapport = comparer_instantanes(complet, instantane_classeur(preparer_fichier_calculs(classeur), classeur))
+    assert est_equivalent(rapport), rapport["exemples"]
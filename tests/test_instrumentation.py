@@ -0,0 +1,41 @@
+"""Mesures par étape (`instrumentation`)."""
+import threading
+
+import pytest
+
+import instrumentation
+from instrumentation import etape, compter
+
+
+@pytest.fixture
+def mesures_actives(capsys):
+    instrumentation.activer()
+    instrumentation.reinitialiser()
+    yield
+    instrumentation.desactiver()
+    instrumentation.reinitialiser()
+
+
+def test_compteurs_reportes_sur_l_etape_englobante(mesures_actives):
+    with etape("pipeline"):
+        with etape("lecture"):
+            compter(lignes_lues=10)
+        compter(lignes_lues=5)
+    lignes = {l["etape"]: l for l in instrumentation.resume()}
+    assert lignes["pipeline/lecture"]["lignes_lues"] == 10
+    assert lignes["pipeline"]["lignes_lues"] == 15
+
+
+def test_pic_memoire_seulement_dans_le_thread_principal(mesures_actives):
+    def en_arriere_plan():
+        with etape("fond"):
+            _ = [0] * 100_000
+
+    with etape("principal"):
+        _ = [0] * 100_000
+        thread = threading.Thread(target=en_arriere_plan)
+        thread.start()
+        thread.join()
+    pics = {m.chemin: m.pic_octets for m in instrumentation.mesures()}
+    assert pics["fond"] is None
+    assert pics["principal"] >= 100_000 * 8
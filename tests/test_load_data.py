@@ -0,0 +1,99 @@
+"""Cache des classeurs (`charger_classeur`) et sessions d'écriture."""
+import hashlib
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import load_data
+from load_data import charger_classeur, statistiques_cache, SessionClasseur, DOSSIER_CACHE
+
+
+def _ecrire_classeur(chemin, valeurs):
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=len(valeurs), freq="MS"),
+                       "x": valeurs})
+    with pd.ExcelWriter(chemin, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Grand_Alger", index=False)
+
+
+@pytest.fixture(autouse=True)
+def cache_vide():
+    load_data._classeurs.clear()
+    yield
+    load_data._classeurs.clear()
+
+
+def test_charger_classeur_servi_depuis_la_memoire(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    assert charger_classeur(chemin) is charger_classeur(chemin)
+
+
+def test_charger_classeur_relu_apres_reecriture(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    avant = charger_classeur(chemin)
+    assert os.listdir(tmp_path / DOSSIER_CACHE)
+
+    # Réécriture ; la date de modification est avancée d'une seconde, quelle que
+    # soit la résolution des dates du système de fichiers
+    _ecrire_classeur(chemin, [100.0, 101.0, 999.0])
+    infos = os.stat(chemin)
+    os.utime(chemin, ns=(infos.st_atime_ns, infos.st_mtime_ns + 1_000_000_000))
+
+    apres = charger_classeur(chemin)
+    assert apres is not avant
+    assert apres.empreinte != avant.empreinte
+    assert apres.feuille_wide("Grand_Alger")["x"].tolist() == [100.0, 101.0, 999.0]
+
+    # La copie disque de l'ancienne version n'est pas relue, et a été remplacée
+    load_data._classeurs.clear()
+    assert charger_classeur(chemin).feuille_wide("Grand_Alger")["x"].tolist() == [100.0, 101.0, 999.0]
+    assert len(os.listdir(tmp_path / DOSSIER_CACHE)) == 1
+
+
+def test_charger_classeur_depuis_plusieurs_threads(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    charger_classeur(chemin)
+    avant = statistiques_cache()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        classeurs = list(pool.map(lambda _: charger_classeur(chemin), range(200)))
+    assert all(c is classeurs[0] for c in classeurs)
+    assert statistiques_cache()["hit"] - avant["hit"] == 200
+
+
+def test_charger_classeur_dans_un_zip(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    archive = str(tmp_path / "classeur.zip")
+    with zipfile.ZipFile(archive, "w") as z:
+        z.write(chemin, "donnees/classeur.xlsx")
+    assert charger_classeur(archive).feuille_wide("Grand_Alger")["x"].tolist() == [100.0, 101.0, 102.0]
+
+
+def test_session_fermer_sans_enregistrer(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    with open(chemin, "rb") as f:
+        contenu = hashlib.sha256(f.read()).hexdigest()
+
+    with SessionClasseur(chemin) as session:
+        session.lire_feuille("Grand_Alger")
+        session.ecrire_colonne("Grand_Alger", "IPC (%)", {pd.Period("2020-01", "M"): 1.0})
+        session.fermer(enregistrer=False)
+
+    with open(chemin, "rb") as f:
+        assert hashlib.sha256(f.read()).hexdigest() == contenu
+
+
+def test_session_enregistre_a_la_sortie(tmp_path):
+    chemin = str(tmp_path / "classeur.xlsx")
+    _ecrire_classeur(chemin, [100.0, 101.0, 102.0])
+    with SessionClasseur(chemin) as session:
+        session.lire_feuille("Grand_Alger")
+        session.ecrire_colonne("Grand_Alger", "IPC (%)", {pd.Period("2020-02", "M"): 1.5})
+
+    assert charger_classeur(chemin).feuille_wide("Grand_Alger")["IPC (%)"].tolist()[1] == 1.5
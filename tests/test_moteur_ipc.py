@@ -0,0 +1,98 @@
+"""Valeurs calculées à la main pour les mesures de moteur_ipc."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from moteur_ipc import (
+    PoidsCompiles, PanneauRegional, ResultatsFeuille, indice_pondere, contributions_pp,
+    calculer_tout, calculer_panneau, calculer_scenarios, calculer_exclusions,
+    mesures_tronquees, colonnes_tronquees, COUPES_TRONQUEES,
+)
+
+# Trois composantes de poids 1, 1, 2 (parts 0.25, 0.25, 0.5) sur deux mois :
+#   IPC = 0.25 * 100 + 0.25 * 200 + 0.5 * 400 = 275, puis 27.5 + 47.5 + 210 = 285
+PRIX = np.array([[100.0, 200.0, 400.0],
+                 [110.0, 190.0, 420.0]])
+POIDS = PoidsCompiles(["x", "y", "z"], [1.0, 1.0, 2.0])
+
+
+def _feuille(prix=PRIX):
+    index = pd.period_range("2020-01", periods=len(prix), freq="M")
+    return pd.DataFrame(prix, index=index, columns=list(POIDS.colonnes))
+
+
+def test_mesures_tronquees_periode_calculee_a_la_main():
+    # Variations triées : -2 (poids 1), 0 (2), 1 (3), 5 (4) ; parts cumulées 0.1, 0.3, 0.6, 1.0
+    #   5 %  : parts gardées 0.05, 0.20, 0.30, 0.35 -> (-0.1 + 0.3 + 1.75) / 0.9 = 2.1667
+    #   10 % : parts gardées 0,    0.20, 0.30, 0.30 -> (0.3 + 1.5) / 0.8        = 2.25
+    #   15 % : parts gardées 0,    0.15, 0.30, 0.25 -> (0.3 + 1.25) / 0.7       = 2.2143
+    #   médiane : première part cumulée >= 50 % -> 1
+    taux = np.array([[5.0, -2.0, 1.0, 0.0]])
+    poids = np.array([4.0, 1.0, 3.0, 2.0])
+    resultat = mesures_tronquees(taux, poids, COUPES_TRONQUEES)
+    assert resultat.shape == (1, len(colonnes_tronquees("mom")))
+    np.testing.assert_array_equal(resultat[0], [2.17, 2.25, 2.21, 1.0])
+
+
+def test_mesures_tronquees_composante_non_observee():
+    # Sans la variation 5 (NaN) : -2 (1), 0 (2), 1 (3) sur un total de 6
+    #   15 % : parts gardées 1/60, 1/3, 0.35 -> (-2/60 + 0.35) / 0.7 = 0.4524 ; médiane 0
+    taux = np.array([[np.nan, -2.0, 1.0, 0.0],
+                     [np.nan, np.nan, np.nan, np.nan]])
+    resultat = mesures_tronquees(taux, np.array([4.0, 1.0, 3.0, 2.0]), (0.15,))
+    np.testing.assert_array_equal(resultat[0], [0.45, 0.0])
+    assert np.isnan(resultat[1]).all()
+
+
+def test_indice_pondere():
+    np.testing.assert_allclose(indice_pondere(_feuille(), POIDS).to_numpy(), [275.0, 285.0])
+
+
+def test_contributions_pp_somment_a_l_inflation():
+    # x : +10 / 275 * 0.25 * 100 = 0.909 ; y : -10 / 275 * 0.25 * 100 = -0.909 ; z : +20 / 275 * 0.5 * 100 = 3.636
+    df = _feuille()
+    ipc = indice_pondere(df, POIDS)
+    contrib = contributions_pp(df, POIDS, ipc.shift(1), 1, "Contrib_MoM_")
+    assert list(contrib.columns) == ["Contrib_MoM_x (pp)", "Contrib_MoM_y (pp)", "Contrib_MoM_z (pp)"]
+    np.testing.assert_array_equal(contrib.iloc[0], [0.0, 0.0, 0.0])
+    np.testing.assert_array_equal(contrib.iloc[1], [0.909, -0.909, 3.636])
+
+
+def test_calculer_exclusions_hors_composante_et_ensemble():
+    # Hors x : (275 - 25) / 0.75 = 333.33 = (200 + 2 * 400) / 3 ; puis (285 - 27.5) / 0.75 = 343.33
+    # Hors {x, y} : ne reste que z (400, puis 420) ; hors {x, y, z} : plus rien, NaN
+    ipc = PRIX @ POIDS.vecteur / POIDS.total
+    parts = POIDS.vecteur / POIDS.total
+    res = calculer_exclusions(ipc, PRIX, parts, ensembles=[[1, 1, 0], [1, 1, 1]])
+    np.testing.assert_allclose(res.retirees, [0.25, 0.25, 0.5, 0.5, 1.0])
+    np.testing.assert_array_equal(res.ipc_arrondi[:, 0], [333.33, 343.33])
+    np.testing.assert_array_equal(res.ipc_arrondi[:, 3], [400.0, 420.0])
+    assert np.isnan(res.ipc[:, 4]).all()
+    np.testing.assert_array_equal(res.inflation_mom[1, [0, 3]], [3.0, 5.0])
+
+
+def test_calculer_scenarios():
+    # Scénario 0 : poids de base ; scénario 1 : x seul
+    res = calculer_scenarios(PRIX, POIDS.colonnes, [[1, 1, 2], [3, 0, 0]])
+    np.testing.assert_allclose(res.ipc, [[275.0, 100.0], [285.0, 110.0]])
+    np.testing.assert_array_equal(res.inflation_mom[1], [3.64, 10.0])
+    assert np.isnan(res.inflation_mom[0]).all()
+    with pytest.raises(ValueError):
+        calculer_scenarios(PRIX, POIDS.colonnes, [[0, 0, 0]])
+
+
+def test_calculer_panneau_identique_a_calculer_tout():
+    rng = np.random.default_rng(0)
+    regions = {r: _feuille(100 + rng.random((30, 3)).cumsum(axis=0)) for r in ("A", "B")}
+    poids = [POIDS, PoidsCompiles(POIDS.colonnes, [2.0, 5.0, 1.0])]
+    panneau = calculer_panneau(PanneauRegional.depuis_feuilles(regions, POIDS.colonnes),
+                               poids, POIDS.colonnes)
+    for (region, df), poids_region in zip(regions.items(), poids):
+        attendu = calculer_tout(df, poids_region, POIDS.colonnes)
+        obtenu = panneau.region(region)
+        for nom in ResultatsFeuille.__slots__:
+            a, b = getattr(attendu, nom), getattr(obtenu, nom)
+            if isinstance(a, pd.Series):
+                pd.testing.assert_series_equal(b, a, check_names=False)
+            else:
+                pd.testing.assert_frame_equal(b, a)